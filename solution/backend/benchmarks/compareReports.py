@@ -0,0 +1,93 @@
+"""
+Compares two benchmark reports written by runBenchmarks.py.
+
+Run from solution/backend, e.g.:
+
+    python -m benchmarks.compareReports old.json new.json
+"""
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[str, str, Optional[int]]
+
+
+def load_report(path: str) -> Dict[Key, Dict[str, Any]]:
+    """
+    Loads a report and indexes its results by (stage, case, level).
+
+    Args:
+        path (str): Path of the JSON report.
+
+    Returns:
+        Dict[Key, Dict[str, Any]]: Results by key.
+    """
+    with open(path, 'r') as f:
+        report = json.load(f)
+    return {(result['stage'], result['case'], result['level']): result
+            for result in report['results']}
+
+
+def compare(old: Dict[Key, Dict[str, Any]],
+            new: Dict[Key, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pairs the results present in both reports and computes the ratio of
+    their time and peak memory (new / old, below 1 is an improvement).
+
+    Args:
+        old (Dict[Key, Dict[str, Any]]): Baseline results.
+        new (Dict[Key, Dict[str, Any]]): Results to compare.
+
+    Returns:
+        List[Dict[str, Any]]: One row per shared result, in the order of
+        the new report.
+    """
+    rows = []
+    for key, result in new.items():
+        if key not in old:
+            continue
+        row: Dict[str, Any] = {"key": key}
+        for metric in ('seconds', 'peak_mb'):
+            before, after = old[key].get(metric), result.get(metric)
+            row[metric] = (before, after)
+            row[f"{metric}_ratio"] = after / before \
+                if before and after is not None else None
+        rows.append(row)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Prints the comparison of two reports.
+
+    Args:
+        argv (Optional[List[str]]): Command line, defaults to sys.argv.
+
+    Returns:
+        List[Dict[str, Any]]: Rows returned by compare.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    rows = compare(load_report(args.old), load_report(args.new))
+
+    def ratio(value: Optional[float]) -> str:
+        return f"{value:>8.2f}x" if value is not None else f"{'-':>9}"
+
+    print(f"{'stage':<55} {'old s':>9} {'new s':>9} {'time':>9} " +
+          f"{'memory':>9}")
+    for row in rows:
+        stage, case, level = row['key']
+        label = f"{stage}{'/' + case if case else ''}" + \
+            (f" level {level}" if level is not None else '')
+        before, after = row['seconds']
+        print(f"{label:<55} {before or 0:>9.4f} {after or 0:>9.4f} " +
+              f"{ratio(row['seconds_ratio'])} {ratio(row['peak_mb_ratio'])}")
+    return rows
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
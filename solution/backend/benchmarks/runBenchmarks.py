@@ -0,0 +1,796 @@
+"""
+Benchmarks the data loading, preprocessing and training pipeline on
+synthetic M5-shaped data and writes a JSON report.
+
+Run from solution/backend, e.g.:
+
+    python -m benchmarks.runBenchmarks --series 1000 \
+        --output benchmarks/report.json
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from benchmarks.syntheticData import write_dataset
+from src.infrastructure import dataLoader, cpuBudget, memoryBudget
+from src.infrastructure.resourceUsage import get_peak_rss_mb
+from src.domain import (validate, transform, preProcessing, configLoader,
+                        statisticalModels, inference)
+from src.domain.hierarchy import Hierarchy
+from src.domain.models.definitions import model_levels
+
+# Bump whenever the layout of the report changes
+REPORT_VERSION = 1
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_TRAINING = 28
+N_FORECAST = 28
+# Largest accepted difference between the numpy runtime and Keras, relative
+# to the largest Keras output, per weight precision
+INFERENCE_TOLERANCES = {'float32': 1e-4, 'float16': 1e-2, 'int8': 5e-2}
+
+
+def measure(fn: Callable[..., Any], *args,
+            repeat: int = 1, **kwargs) -> Tuple[Any, Dict[str, float]]:
+    """
+    Times a function and measures the peak memory it allocates.
+
+    The function runs repeat times untraced (the fastest run is kept) and
+    once more under tracemalloc, which sees Python and numpy allocations
+    but not memory-mapped pages or TensorFlow's own allocator.
+
+    Args:
+        fn (Callable[..., Any]): Function to benchmark.
+        *args: Positional arguments of fn.
+        repeat (int): Number of timed runs. Defaults to 1.
+        **kwargs: Keyword arguments of fn.
+
+    Returns:
+        Tuple[Any, Dict[str, float]]: Result of the last run, and the best
+        time in seconds and the traced peak in MB.
+    """
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = perf_counter()
+        fn(*args, **kwargs)
+        timings.append(perf_counter() - start)
+    tracemalloc.start()
+    try:
+        result = fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"seconds": round(min(timings), 6),
+                    "peak_mb": round(peak / 1024 ** 2, 3)}
+
+
+class Report:
+    """
+    Collects benchmark results and writes them as JSON. Each result is
+    identified by its stage, case and model level so that two reports can
+    be compared entry by entry (see compareReports.py).
+    """
+
+    def __init__(self, meta: Dict[str, Any]):
+        """
+        Args:
+            meta (Dict[str, Any]): Parameters and environment of the run.
+        """
+        self.meta = meta
+        self.results: List[Dict[str, Any]] = []
+
+    def add(self, stage: str, metrics: Dict[str, Any],
+            case: str = '', level: Optional[int] = None, **details) -> None:
+        """
+        Records one result and prints it.
+
+        Args:
+            stage (str): Benchmarked function, e.g. 'process'.
+            metrics (Dict[str, Any]): Metrics returned by measure.
+            case (str): Variant of the stage, e.g. the loaded file.
+            level (Optional[int]): Model level, if the stage depends on it.
+            **details: Extra values describing the input (sizes, counts).
+        """
+        result = {"stage": stage, "case": case, "level": level,
+                  **metrics, **details}
+        self.results.append(result)
+        label = f"{stage}{'/' + case if case else ''}" + \
+            (f" level {level}" if level is not None else '')
+        print(f"{label:<45} {metrics.get('seconds', 0):>10.4f}s " +
+              f"{metrics.get('peak_mb', 0):>10.1f} MB")
+
+    def write(self, path: str) -> None:
+        """
+        Writes the report.
+
+        Args:
+            path (str): Output JSON file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"version": REPORT_VERSION, "meta": self.meta,
+                       "results": self.results}, f, indent=2)
+
+
+def get_meta(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Describes the run: parameters, library versions, commit and CPU budget.
+
+    Args:
+        args (argparse.Namespace): Parsed command line.
+
+    Returns:
+        Dict[str, Any]: The report metadata.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    budget, source = cpuBudget.get_cpu_budget()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "params": vars(args),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_budget": budget,
+        "cpu_budget_source": source,
+    }
+
+
+# Imports the API the way uvicorn does and prints its start-up cost as JSON
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import main
+from src.infrastructure import resourceUsage
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "peak_mb": resourceUsage.get_peak_rss_mb(),
+                  "training_modules": resourceUsage.get_loaded_modules()}))
+"""
+
+
+def bench_startup(report: Report, repeat: int,
+                  max_seconds: Optional[float] = None,
+                  max_mb: Optional[float] = None) -> List[str]:
+    """
+    Measures the import time and peak RSS of the API process (import main)
+    in fresh interpreters, keeping the fastest run, and checks it against
+    the start-up budget.
+
+    Args:
+        report (Report): Report to add the result to.
+        repeat (int): Number of fresh interpreters.
+        max_seconds (Optional[float]): Largest accepted import time.
+        max_mb (Optional[float]): Largest accepted peak RSS.
+
+    Returns:
+        List[str]: Violations of the budget, empty if none. Loading any
+        of resourceUsage.TRAINING_MODULES is always a violation.
+    """
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR,
+               TF_CPP_MIN_LOG_LEVEL='3')
+    runs = []
+    for _ in range(max(1, repeat)):
+        completed = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT], cwd=BACKEND_DIR,
+            env=env, capture_output=True, text=True, check=True)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run['seconds'])
+    modules = sorted({module for run in runs
+                      for module in run['training_modules']})
+    report.add('startup', {"seconds": round(best['seconds'], 6),
+                           "peak_mb": round(best['peak_mb'], 3)},
+               case='import_main', training_modules=modules)
+
+    violations = []
+    if modules:
+        violations.append("the API process imports " + ", ".join(modules))
+    if max_seconds is not None and best['seconds'] > max_seconds:
+        violations.append(f"start-up took {best['seconds']:.2f}s, budget " +
+                          f"{max_seconds:.2f}s")
+    if max_mb is not None and best['peak_mb'] > max_mb:
+        violations.append(f"start-up peak RSS {best['peak_mb']:.1f} MB, " +
+                          f"budget {max_mb:.1f} MB")
+    return violations
+
+
+def bench_loading(report: Report, data_dir: str,
+                  repeat: int) -> Dict[str, pd.DataFrame]:
+    """
+    Benchmarks load_csv_data on each file: parsing the CSV, building the
+    columnar cache, and loading from the cache.
+
+    Args:
+        report (Report): Report receiving the results.
+        data_dir (str): Directory holding the CSV files.
+        repeat (int): Number of timed runs per case.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The loaded frames by file stem.
+    """
+    frames = {}
+    for filename in ['calendar.csv', 'sales_train.csv', 'sell_prices.csv']:
+        file_path = os.path.join(data_dir, filename)
+        shutil.rmtree(dataLoader.get_cache_dir(file_path), ignore_errors=True)
+        df, metrics = measure(dataLoader.load_csv_data, file_path,
+                              use_cache=False, repeat=repeat)
+        report.add('load_csv_data', metrics, case=f"{filename}/parse",
+                   rows=len(df), columns=len(df.columns),
+                   file_mb=round(os.path.getsize(file_path) / 1024 ** 2, 3))
+
+        start = perf_counter()
+        dataLoader.write_cache(file_path, df)
+        report.add('load_csv_data', {"seconds": perf_counter() - start},
+                   case=f"{filename}/write_cache")
+
+        df, metrics = measure(dataLoader.load_csv_data, file_path,
+                              repeat=repeat)
+        report.add('load_csv_data', metrics, case=f"{filename}/cached")
+        frames[os.path.splitext(filename)[0]] = df
+    return frames
+
+
+def get_largest_group_rows(sales_df: pd.DataFrame, level: int) -> np.ndarray:
+    """
+    Args:
+        sales_df (pd.DataFrame): Sales data.
+        level (int): Model level.
+
+    Returns:
+        np.ndarray: Row positions of the largest group of the level.
+    """
+    _, grouped = transform.get_model_details_per_level(
+        sales_df, configLoader.load_config_model(level))
+    group_rows = transform.get_group_rows(grouped)
+    _, rows = max(group_rows, key=lambda group: len(group[1]))
+    return rows
+
+
+def bench_level(report: Report, level: int, calendar_df: pd.DataFrame,
+                sales_df: pd.DataFrame, repeat: int,
+                include_keras: bool) -> None:
+    """
+    Benchmarks the per-group stages on the largest group of a level.
+
+    Args:
+        report (Report): Report receiving the results.
+        level (int): Model level.
+        calendar_df (pd.DataFrame): Calendar data.
+        sales_df (pd.DataFrame): Sales data.
+        repeat (int): Number of timed runs per stage.
+        include_keras (bool): Also benchmark evaluate_model, which loads
+        TensorFlow.
+    """
+    model_level = configLoader.load_config_model(level)
+
+    def group() -> List[Tuple[Any, np.ndarray]]:
+        _, grouped = transform.get_model_details_per_level(
+            sales_df, model_level)
+        return transform.get_group_rows(grouped)
+
+    group_rows, metrics = measure(group, repeat=repeat)
+    sizes = [len(rows) for _, rows in group_rows]
+    report.add('group', metrics, level=level, groups=len(group_rows),
+               largest_group=max(sizes), smallest_group=min(sizes))
+
+    _, rows = max(group_rows, key=lambda group: len(group[1]))
+    group_df = sales_df.iloc[rows]
+    details = {"series": len(group_df)}
+
+    merge = preProcessing.MergeExogenousFeatures(calendar_df=calendar_df)
+    _, metrics = measure(merge.fit_transform, group_df, repeat=repeat)
+    report.add('MergeExogenousFeatures.transform', metrics, level=level,
+               **details)
+
+    processed, metrics = measure(preProcessing.process, group_df,
+                                 calendar_df, n_training=N_TRAINING,
+                                 n_forecast=N_FORECAST, repeat=repeat)
+    report.add('process', metrics, level=level, **details)
+
+    (_, _, X_valid, _, n_outputs, scaler, valid_df_cols, fixed_cols, _,
+     valid_df_og, train_df, _) = processed
+    _, metrics = measure(preProcessing.get_sequences, train_df, 0,
+                         train_df.shape[0] - N_TRAINING, N_TRAINING,
+                         n_outputs, repeat=repeat)
+    report.add('get_sequences', metrics, level=level, **details)
+
+    if include_keras:
+        from src.domain import trainAndEvaluate
+
+        model = trainAndEvaluate.build_baseline_model(
+            n_products_stores=n_outputs, n_training=N_TRAINING,
+            n_outputs=n_outputs)
+        _, metrics = measure(trainAndEvaluate.evaluate_model, model, X_valid,
+                             scaler, N_TRAINING, n_outputs, valid_df_cols,
+                             fixed_cols, valid_df_og, repeat=repeat)
+        report.add('evaluate_model', metrics, level=level, **details)
+
+
+def bench_hierarchy(report: Report, sales_df: pd.DataFrame,
+                    repeat: int) -> None:
+    """
+    Benchmarks the aggregated series of all 12 levels: one pandas groupby
+    sum per level against the summing matrix of Hierarchy (built once, then
+    one sparse product).
+
+    Args:
+        report (Report): Report receiving the results.
+        sales_df (pd.DataFrame): Sales data.
+        repeat (int): Number of timed runs per stage.
+    """
+    day_cols = [col for col in sales_df.columns if col.startswith('d_')]
+
+    def groupby_all_levels() -> None:
+        for model_level in model_levels:
+            _, grouped = transform.get_model_details_per_level(
+                sales_df, model_level)
+            grouped[day_cols].sum()
+
+    _, metrics = measure(groupby_all_levels, repeat=repeat)
+    report.add('aggregate_levels', metrics, case='groupby',
+               levels=len(model_levels))
+
+    hierarchy, metrics = measure(Hierarchy, sales_df, repeat=repeat)
+    report.add('aggregate_levels', metrics, case='summing_matrix/build',
+               series=hierarchy.summing_matrix.shape[0])
+
+    def aggregate() -> Dict[int, np.ndarray]:
+        return {level_id: hierarchy.aggregate(level_id)
+                for level_id in hierarchy.get_level_ids()}
+
+    _, metrics = measure(aggregate, repeat=repeat)
+    report.add('aggregate_levels', metrics, case='summing_matrix/aggregate',
+               series=hierarchy.summing_matrix.shape[0])
+
+
+def bench_engines(report: Report, level: int, calendar_df: pd.DataFrame,
+                  sales_df: pd.DataFrame, repeat: int, epochs: int,
+                  include_keras: bool) -> None:
+    """
+    Compares the throughput (series fitted and evaluated per second) of the
+    vectorized engines of statisticalModels with the Keras model, on the
+    largest group of a level. The vectorized engines are also timed on
+    every series at once, as run_statistical_models batches groups.
+
+    Args:
+        report (Report): Report receiving the results.
+        level (int): Model level whose largest group is used.
+        calendar_df (pd.DataFrame): Calendar data.
+        sales_df (pd.DataFrame): Sales data.
+        repeat (int): Number of timed runs per engine.
+        epochs (int): Number of epochs of the Keras model.
+        include_keras (bool): Also train the Keras model, which loads
+        TensorFlow.
+    """
+    rows = get_largest_group_rows(sales_df, level)
+    day_cols = [col for col in sales_df.columns if col.startswith('d_')]
+    exogenous = preProcessing.take_exogenous(
+        preProcessing.get_exogenous_by_day(calendar_df), day_cols)
+
+    cases = {'group': rows, 'all': np.arange(len(sales_df))}
+    for case, case_rows in cases.items():
+        sales = sales_df[day_cols].iloc[case_rows].to_numpy(
+            dtype=np.float64).T
+        for model_type in statisticalModels.ENGINES:
+            _, metrics = measure(statisticalModels.predict_validation,
+                                 model_type, sales, exogenous, N_FORECAST,
+                                 repeat=repeat)
+            report.add('engine', metrics, case=f"{model_type}/{case}",
+                       level=level, series=len(case_rows),
+                       series_per_second=round(
+                           len(case_rows) / metrics['seconds'], 1))
+
+    if include_keras:
+        from src.domain import trainAndEvaluate
+
+        group_df = sales_df.iloc[rows]
+
+        def train_keras() -> None:
+            (X_train, y_train, X_valid, y_valid, n_outputs, scaler,
+             valid_df_cols, fixed_cols, _, valid_df_og, _, _) = \
+                preProcessing.process(group_df, calendar_df,
+                                      n_training=N_TRAINING,
+                                      n_forecast=N_FORECAST)
+            trainAndEvaluate.train_and_evaluate(
+                n_outputs=n_outputs, X_train=X_train, y_train=y_train,
+                X_valid=X_valid, y_valid=y_valid, epochs=epochs,
+                batch_size=10, n_training=N_TRAINING,
+                train_df_og=valid_df_og, scaler=scaler,
+                valid_df_cols=valid_df_cols, fixed_cols=fixed_cols,
+                log_directory=os.path.join('results', 'tb_logs'))
+
+        # Training is slow enough that a single run is representative
+        _, metrics = measure(train_keras, repeat=1)
+        report.add('engine', metrics, case='keras/group', level=level,
+                   series=len(rows), epochs=epochs,
+                   series_per_second=round(len(rows) / metrics['seconds'], 1))
+
+
+def bench_inference(report: Report, level: int,
+                    calendar_df: pd.DataFrame, sales_df: pd.DataFrame,
+                    repeat: int, epochs: int) -> List[str]:
+    """
+    Trains the Keras model on the largest group of a level, exports it for
+    the numpy runtime of domain/inference.py with each weight precision,
+    and compares the two on the validation windows: agreement of the
+    outputs, and the latency of one forecast step and of the whole batch.
+
+    Args:
+        report (Report): Report receiving the results.
+        level (int): Model level whose largest group is used.
+        calendar_df (pd.DataFrame): Calendar data.
+        sales_df (pd.DataFrame): Sales data.
+        repeat (int): Number of timed runs per case.
+        epochs (int): Number of epochs of the Keras model.
+
+    Returns:
+        List[str]: Precisions whose outputs differ from Keras by more than
+        INFERENCE_TOLERANCES, empty if none.
+    """
+    from src.domain import trainAndEvaluate
+
+    rows = get_largest_group_rows(sales_df, level)
+    group_df = sales_df.iloc[rows]
+    (X_train, y_train, X_valid, y_valid, n_outputs, scaler, valid_df_cols,
+     fixed_cols, _, valid_df_og, _, _) = preProcessing.process(
+        group_df, calendar_df, n_training=N_TRAINING, n_forecast=N_FORECAST)
+    model, _ = trainAndEvaluate.train_and_evaluate(
+        n_outputs=n_outputs, X_train=X_train, y_train=y_train,
+        X_valid=X_valid, y_valid=y_valid, epochs=epochs, batch_size=10,
+        n_training=N_TRAINING, train_df_og=valid_df_og, scaler=scaler,
+        valid_df_cols=valid_df_cols, fixed_cols=fixed_cols,
+        log_directory=os.path.join('results', 'tb_logs'))
+    X_valid = X_valid.astype(np.float32)
+
+    expected, metrics = measure(model.predict_on_batch, X_valid,
+                                repeat=repeat)
+    expected = np.array(expected)
+    report.add('inference', metrics, case='keras/batch', level=level,
+               windows=len(X_valid))
+    _, metrics = measure(model.predict_on_batch, X_valid[:1], repeat=repeat)
+    report.add('inference', metrics, case='keras/step', level=level)
+
+    violations = []
+    for quantization, tolerance in INFERENCE_TOLERANCES.items():
+        path = os.path.join('results', f"weights_{quantization}.npz")
+        weights_bytes = inference.export_model(model, path, quantization)
+        numpy_model = inference.load_model(path)
+        actual, metrics = measure(numpy_model.predict, X_valid,
+                                  repeat=repeat)
+        max_error, relative_error = inference.compare_outputs(expected,
+                                                              actual)
+        report.add('inference', metrics, case=f"{quantization}/batch",
+                   level=level, windows=len(X_valid),
+                   weights_mb=round(weights_bytes / 1024 ** 2, 3),
+                   max_error=max_error, relative_error=relative_error)
+        _, metrics = measure(numpy_model.predict, X_valid[:1],
+                             repeat=repeat)
+        report.add('inference', metrics, case=f"{quantization}/step",
+                   level=level)
+        if relative_error > tolerance:
+            violations.append(f"{quantization} inference differs from " +
+                              f"Keras by {relative_error:.2e}, tolerance " +
+                              f"{tolerance:.0e}")
+    return violations
+
+
+def run_in_worker(fn: Callable[..., Any], *args) -> Any:
+    """
+    Runs a function in a fresh spawned process limited to one thread per
+    pool, like a training worker, so that its peak RSS is its own.
+
+    Args:
+        fn (Callable[..., Any]): Module-level function to run.
+        *args: Its arguments.
+
+    Returns:
+        Any: Its result.
+    """
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=cpuBudget.limit_threads,
+                             initargs=(1,)) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def train_group_peak_mb(group_name: str, group_df: pd.DataFrame,
+                        calendar_df: pd.DataFrame, epochs: int) -> float:
+    """
+    Trains, evaluates and saves a group's Keras model with run_model.
+
+    Returns:
+        float: Peak RSS (VmHWM) of the process in MB.
+    """
+    from src.application import workflow
+
+    workflow.run_model(group_name, group_df, calendar_df, epochs)
+    return get_peak_rss_mb()
+
+
+def bench_memory(report: Report, level: int, calendar_df: pd.DataFrame,
+                 sales_df: pd.DataFrame,
+                 epochs: int) -> List[Tuple[int, int, float]]:
+    """
+    Measures the memory a group's Keras model adds to a worker, to check
+    and calibrate the estimate of memoryBudget.estimate_group_mb: every
+    group of the level is trained in a fresh worker over all the days and
+    over the last half of them, and the peak RSS of an idle worker
+    (workflow.probe_worker) is subtracted from the worker's peak RSS.
+
+    Args:
+        report (Report): Report receiving the results.
+        level (int): Model level whose groups are trained.
+        calendar_df (pd.DataFrame): Calendar data.
+        sales_df (pd.DataFrame): Sales data.
+        epochs (int): Number of epochs per model.
+
+    Returns:
+        List[Tuple[int, int, float]]: Series, days and measured MB of every
+        run, see fit_memory_model.
+    """
+    from src.application import workflow
+
+    base_mb = run_in_worker(workflow.probe_worker)
+    report.add('worker_memory', {"peak_mb": round(base_mb, 3)},
+               case='idle', level=level)
+    id_cols = [col for col in sales_df.columns if not col.startswith('d_')]
+    day_cols = [col for col in sales_df.columns if col.startswith('d_')]
+    samples = []
+    _, grouped = transform.get_model_details_per_level(
+        sales_df, configLoader.load_config_model(level))
+    for group_name, rows in transform.get_group_rows(grouped):
+        for n_days in [len(day_cols), len(day_cols) // 2]:
+            group_df = sales_df.iloc[rows][id_cols + day_cols[-n_days:]]
+            start = perf_counter()
+            peak_mb = run_in_worker(train_group_peak_mb, str(group_name),
+                                    group_df, calendar_df, epochs)
+            estimate_mb = memoryBudget.estimate_group_mb(len(rows), n_days)
+            report.add('worker_memory',
+                       {"seconds": round(perf_counter() - start, 6),
+                        "peak_mb": round(peak_mb, 3)},
+                       case=f"{group_name}/{n_days}d", level=level,
+                       series=len(rows), days=n_days,
+                       group_mb=round(peak_mb - base_mb, 1),
+                       estimate_mb=round(estimate_mb, 1))
+            samples.append((len(rows), n_days, peak_mb - base_mb))
+    return samples
+
+
+def fit_memory_model(report: Report,
+                     samples: List[Tuple[int, int, float]]) -> None:
+    """
+    Fits GROUP_BYTES, SERIES_DAY_BYTES and SERIES_BYTES of memoryBudget to
+    the runs of bench_memory by least squares.
+
+    Args:
+        report (Report): Report receiving the fitted constants.
+        samples (List[Tuple[int, int, float]]): Series, days and measured
+        MB of every run.
+    """
+    series, days, group_mb = map(np.array, zip(*samples))
+    (series_day_bytes, series_bytes, group_bytes), *_ = np.linalg.lstsq(
+        np.column_stack([series * days, series,
+                         np.ones(len(series))]).astype(np.float64),
+        group_mb * 1024 ** 2, rcond=None)
+    report.add('memory_fit', {}, runs=len(samples),
+               group_mb=round(float(group_bytes) / 1024 ** 2, 1),
+               series_day_bytes=round(float(series_day_bytes), 1),
+               series_bytes=round(float(series_bytes)))
+
+
+def bench_training(report: Report, level: int, epochs: int,
+                   model_type: str = 'keras',
+                   training_mode: str = 'per_group') -> None:
+    """
+    Benchmarks run_multiple_model for a level from an empty results
+    directory. Memory is the peak RSS of the largest training worker so far,
+    since the workers are separate processes.
+
+    Args:
+        report (Report): Report receiving the results.
+        level (int): Model level.
+        epochs (int): Number of epochs per model.
+        model_type (str): Model type to train. Defaults to 'keras'.
+        training_mode (str): Keras training mode. Defaults to 'per_group'.
+    """
+    from src.application import workflow
+
+    shutil.rmtree('./results', ignore_errors=True)
+    os.makedirs('./results')
+    start = perf_counter()
+    workflow.run_multiple_model(model_level=level, epochs=epochs,
+                                model_type=model_type,
+                                training_mode=training_mode)
+    if model_type != 'keras':
+        case = model_type
+    else:
+        case = '' if training_mode == 'per_group' else training_mode
+    report.add('run_multiple_model',
+               {"seconds": round(perf_counter() - start, 6),
+                "peak_mb": round(get_peak_rss_mb(include_children=True), 3)},
+               case=case, level=level, epochs=epochs)
+
+
+def parse_levels(value: str) -> List[int]:
+    """
+    Parses a comma separated list of levels, e.g. '1,4,12' or '1-12'.
+
+    Args:
+        value (str): The list.
+
+    Returns:
+        List[int]: The levels.
+    """
+    levels: List[int] = []
+    for part in filter(None, value.split(',')):
+        if '-' in part:
+            first, last = part.split('-')
+            levels += list(range(int(first), int(last) + 1))
+        else:
+            levels.append(int(part))
+    return levels
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Generates the data, runs the benchmarks and writes the report.
+
+    Args:
+        argv (Optional[List[str]]): Command line, defaults to sys.argv.
+
+    Returns:
+        Dict[str, Any]: The written report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--series', type=int, default=1000,
+                        help='number of series (multiple of 10 stores)')
+    parser.add_argument('--days', type=int, default=1913,
+                        help='number of sales days')
+    parser.add_argument('--zero-rate', type=float, default=0.6,
+                        help='share of days without sales')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--levels', type=parse_levels, default='1-12',
+                        help="levels of the per-group stages, e.g. '1-12'")
+    parser.add_argument('--train-levels', type=parse_levels, default='',
+                        help='levels for which run_multiple_model is run')
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--engine-levels', type=parse_levels, default='',
+                        help='levels whose largest group compares the ' +
+                        'model engines')
+    parser.add_argument('--inference-levels', type=parse_levels, default='',
+                        help='levels whose largest group compares the ' +
+                        'numpy inference runtime with Keras')
+    parser.add_argument('--memory-levels', type=parse_levels, default='',
+                        help='levels whose groups are trained one per ' +
+                        'worker to measure and fit the memory estimate')
+    parser.add_argument('--model-type', default='keras',
+                        choices=statisticalModels.MODEL_TYPES,
+                        help='model type trained by --train-levels')
+    parser.add_argument('--training-mode', default='per_group',
+                        choices=['per_group', 'global'],
+                        help='Keras training mode of --train-levels')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per stage, the best is kept')
+    parser.add_argument('--no-hierarchy', action='store_true',
+                        help='skip the aggregation of all 12 levels')
+    parser.add_argument('--no-keras', action='store_true',
+                        help='skip evaluate_model (avoids TensorFlow)')
+    parser.add_argument('--max-startup-seconds', type=float, default=None,
+                        help='fail if importing the API takes longer')
+    parser.add_argument('--max-startup-mb', type=float, default=None,
+                        help='fail if the API process peaks above this RSS')
+    parser.add_argument('--startup-only', action='store_true',
+                        help='only measure the API start-up')
+    parser.add_argument('--workspace', default=None,
+                        help='directory for data/ and results/, ' +
+                        'defaults to a temporary directory')
+    parser.add_argument('--output', default='benchmarks/report.json')
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    report = Report(get_meta(args))
+    violations = bench_startup(report, args.repeat, args.max_startup_seconds,
+                               args.max_startup_mb)
+    if args.startup_only:
+        return finish(report, output, violations)
+
+    workspace = args.workspace or tempfile.mkdtemp(prefix='m5-benchmark-')
+    os.makedirs(workspace, exist_ok=True)
+    shutil.copy(os.path.join(BACKEND_DIR, 'config.yaml'),
+                os.path.join(workspace, 'config.yaml'))
+    cwd = os.getcwd()
+    # The pipeline reads ./data, ./results and ./config.yaml
+    os.chdir(workspace)
+    try:
+        _, metrics = measure(write_dataset, './data', n_series=args.series,
+                             n_days=args.days, zero_rate=args.zero_rate,
+                             seed=args.seed)
+        report.add('generate', metrics)
+
+        frames = bench_loading(report, './data', args.repeat)
+        calendar_df = frames['calendar']
+        sales_df = frames['sales_train']
+        sell_prices_df = frames['sell_prices']
+
+        try:
+            _, metrics = measure(validate.validate, calendar_df, sales_df,
+                                 sell_prices_df, repeat=args.repeat)
+            report.add('validate', metrics)
+        except Exception as exc:
+            report.add('validate', {}, error=str(exc)[:200])
+
+        if not args.no_hierarchy:
+            bench_hierarchy(report, sales_df, args.repeat)
+        for level in args.levels:
+            bench_level(report, level, calendar_df, sales_df, args.repeat,
+                        include_keras=not args.no_keras)
+        for level in args.engine_levels:
+            bench_engines(report, level, calendar_df, sales_df, args.repeat,
+                          args.epochs, include_keras=not args.no_keras)
+        if not args.no_keras:
+            for level in args.inference_levels:
+                violations += bench_inference(report, level, calendar_df,
+                                              sales_df, args.repeat,
+                                              args.epochs)
+        if not args.no_keras and args.memory_levels:
+            samples = []
+            for level in args.memory_levels:
+                samples += bench_memory(report, level, calendar_df, sales_df,
+                                        args.epochs)
+            fit_memory_model(report, samples)
+        for level in args.train_levels:
+            bench_training(report, level, args.epochs, args.model_type,
+                           args.training_mode)
+    finally:
+        os.chdir(cwd)
+        if args.workspace is None:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return finish(report, output, violations)
+
+
+def finish(report: Report, output: str,
+           violations: List[str]) -> Dict[str, Any]:
+    """
+    Writes the report, then fails the run if the start-up budget was
+    exceeded or the inference runtime disagrees with Keras, so that the
+    benchmark can guard a CI job.
+
+    Args:
+        report (Report): The report.
+        output (str): Output JSON file.
+        violations (List[str]): Violations returned by bench_startup and
+        bench_inference.
+
+    Returns:
+        Dict[str, Any]: The written report.
+
+    Raises:
+        SystemExit: With status 1 if there are violations.
+    """
+    report.write(output)
+    print(f"Report written to {output}")
+    if violations:
+        raise SystemExit("Benchmark regression: " + "; ".join(violations))
+    return {"meta": report.meta, "results": report.results}
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,193 @@
+import os
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+# Store and department hierarchy of the M5 data: 10 stores in 3 states and
+# 7 departments in 3 categories
+STORES: Dict[str, List[str]] = {
+    'CA': ['CA_1', 'CA_2', 'CA_3', 'CA_4'],
+    'TX': ['TX_1', 'TX_2', 'TX_3'],
+    'WI': ['WI_1', 'WI_2', 'WI_3'],
+}
+DEPARTMENTS: Dict[str, List[str]] = {
+    'FOODS': ['FOODS_1', 'FOODS_2', 'FOODS_3'],
+    'HOBBIES': ['HOBBIES_1', 'HOBBIES_2'],
+    'HOUSEHOLD': ['HOUSEHOLD_1', 'HOUSEHOLD_2'],
+}
+# First day of the M5 data (d_1)
+START_DATE = '2011-01-29'
+# Days of calendar after the last sales day, as in the M5 calendar
+CALENDAR_EXTRA_DAYS = 56
+EVENT_TYPES = ['Sporting', 'Cultural', 'National', 'Religious']
+
+
+def get_series_ids(n_series: int) -> DataFrame:
+    """
+    Builds the identifier columns of the sales table. As in the M5 data
+    every item is sold in every store, so the number of series is rounded
+    to a multiple of the 10 stores, with at least one item per department.
+
+    Args:
+        n_series (int): Requested number of series.
+
+    Returns:
+        DataFrame: id, item_id, dept_id, cat_id, store_id and state_id.
+    """
+    departments = [(cat, dept) for cat, depts in DEPARTMENTS.items()
+                   for dept in depts]
+    stores = [(state, store) for state, names in STORES.items()
+              for store in names]
+    n_items = max(len(departments), math.ceil(n_series / len(stores)))
+
+    items = []
+    for i in range(n_items):
+        cat, dept = departments[i % len(departments)]
+        items.append((f"{dept}_{i // len(departments) + 1:03d}", dept, cat))
+
+    rows = [(f"{item}_{store}_validation", item, dept, cat, store, state)
+            for item, dept, cat in items for state, store in stores]
+    return DataFrame(rows, columns=['id', 'item_id', 'dept_id', 'cat_id',
+                                    'store_id', 'state_id'])
+
+
+def generate_calendar(n_days: int, rng: np.random.Generator) -> DataFrame:
+    """
+    Generates the calendar table for n_days of sales plus the days after
+    them.
+
+    Args:
+        n_days (int): Number of sales days.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        DataFrame: The calendar, with the columns of the M5 calendar.
+    """
+    n_calendar_days = n_days + CALENDAR_EXTRA_DAYS
+    dates = pd.date_range(START_DATE, periods=n_calendar_days)
+    # Walmart weeks start on Saturday, as does d_1
+    weeks = np.arange(n_calendar_days) // 7
+    event_1 = rng.random(n_calendar_days) < 0.08
+    event_2 = event_1 & (rng.random(n_calendar_days) < 0.05)
+    event_types = np.array(EVENT_TYPES, dtype=object)
+    return DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'wm_yr_wk': 11101 + weeks,
+        'weekday': dates.day_name(),
+        'wday': np.arange(n_calendar_days) % 7 + 1,
+        'month': dates.month,
+        'year': dates.year,
+        'd': [f"d_{i}" for i in range(1, n_calendar_days + 1)],
+        'event_name_1': np.where(event_1, 'Event', None),
+        'event_type_1': np.where(
+            event_1, event_types[rng.integers(0, 4, n_calendar_days)], None),
+        'event_name_2': np.where(event_2, 'SecondEvent', None),
+        'event_type_2': np.where(
+            event_2, event_types[rng.integers(0, 4, n_calendar_days)], None),
+        'snap_CA': (dates.day <= 10).astype(np.int64),
+        'snap_TX': ((dates.day >= 3) & (dates.day <= 15)).astype(np.int64),
+        'snap_WI': ((dates.day >= 2) & (dates.day <= 14)).astype(np.int64),
+    })
+
+
+def generate_sales(ids: DataFrame, n_days: int, zero_rate: float,
+                   rng: np.random.Generator) -> DataFrame:
+    """
+    Generates daily unit sales: Poisson counts around a per-series level
+    with a weekly pattern, with a share of the days forced to zero to mimic
+    the intermittent demand of the M5 data.
+
+    Args:
+        ids (DataFrame): Identifier columns from get_series_ids.
+        n_days (int): Number of sales days.
+        zero_rate (float): Probability that a day has no sales.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        DataFrame: The sales table (ids then d_1 ... d_<n_days>).
+    """
+    levels = rng.gamma(shape=1.5, scale=2.0, size=(len(ids), 1))
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * np.arange(n_days) / 7)
+    units = rng.poisson(levels * weekly).astype(np.int16)
+    units[rng.random(units.shape) < zero_rate] = 0
+    days = DataFrame(units, columns=[f"d_{i}" for i in range(1, n_days + 1)])
+    return pd.concat([ids, days], axis=1)
+
+
+def generate_sell_prices(ids: DataFrame, calendar_df: DataFrame,
+                         rng: np.random.Generator) -> DataFrame:
+    """
+    Generates one weekly price per item and store.
+
+    Args:
+        ids (DataFrame): Identifier columns from get_series_ids.
+        calendar_df (DataFrame): Calendar from generate_calendar.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        DataFrame: store_id, item_id, wm_yr_wk and sell_price.
+    """
+    weeks = calendar_df['wm_yr_wk'].unique()
+    base = rng.uniform(0.5, 20.0, size=len(ids))
+    noise = rng.normal(1.0, 0.02, size=(len(ids), len(weeks)))
+    return DataFrame({
+        'store_id': np.repeat(ids['store_id'].to_numpy(), len(weeks)),
+        'item_id': np.repeat(ids['item_id'].to_numpy(), len(weeks)),
+        'wm_yr_wk': np.tile(weeks, len(ids)),
+        'sell_price': np.round(base[:, np.newaxis] * noise, 2).ravel(),
+    })
+
+
+def generate_dataset(n_series: int = 1000,
+                     n_days: int = 1913,
+                     zero_rate: float = 0.6,
+                     seed: int = 0) -> Tuple[DataFrame, DataFrame, DataFrame]:
+    """
+    Generates calendar, sales and sell prices tables shaped like the M5
+    data (see domain/models/definitions.py).
+
+    Args:
+        n_series (int): Number of series, rounded up to a multiple of the
+        10 stores. Defaults to 1000.
+        n_days (int): Number of sales days. Defaults to 1913, the length of
+        the M5 training data expected by the validation.
+        zero_rate (float): Share of days without sales. Defaults to 0.6.
+        seed (int): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        Tuple[DataFrame, DataFrame, DataFrame]: Calendar, sales and sell
+        prices.
+    """
+    rng = np.random.default_rng(seed)
+    ids = get_series_ids(n_series)
+    calendar_df = generate_calendar(n_days, rng)
+    sales_df = generate_sales(ids, n_days, zero_rate, rng)
+    sell_prices_df = generate_sell_prices(ids, calendar_df, rng)
+    return calendar_df, sales_df, sell_prices_df
+
+
+def write_dataset(directory: str, **kwargs) -> Dict[str, str]:
+    """
+    Generates a dataset and writes it as the CSV files read by
+    workflow.get_data.
+
+    Args:
+        directory (str): Output directory, e.g. <workspace>/data.
+        **kwargs: Parameters of generate_dataset.
+
+    Returns:
+        Dict[str, str]: Path of each written file by table name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    calendar_df, sales_df, sell_prices_df = generate_dataset(**kwargs)
+    paths = {
+        'calendar': os.path.join(directory, 'calendar.csv'),
+        'sales': os.path.join(directory, 'sales_train.csv'),
+        'sell_prices': os.path.join(directory, 'sell_prices.csv'),
+    }
+    calendar_df.to_csv(paths['calendar'], index=False)
+    sales_df.to_csv(paths['sales'], index=False)
+    sell_prices_df.to_csv(paths['sell_prices'], index=False)
+    return paths
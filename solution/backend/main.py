@@ -1,26 +1,66 @@
+# Start-up time is measured from the first import, see lifespan
+import time
+import_start = time.perf_counter()
+
+from contextlib import asynccontextmanager  # noqa: E402
+
 # Import FastAPI for creating the web application and API
-from fastapi import FastAPI
+from fastapi import FastAPI, Request  # noqa: E402
+
+# Import modules from the project structure. None of them may import
+# TensorFlow or scikit-learn at module level: training code is imported by
+# the training workers only (see benchmarks/runBenchmarks.py, stage startup)
+from src.infrastructure import healthCheck, metrics  # noqa: E402
+from src.infrastructure.resourceUsage import report_startup  # noqa: E402
+from src.domain import configLoader  # noqa: E402
+from src.application import workflow, trainingJobs  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start training in the background once the server is up, so that the
+    API (including /api/healthCheck) is served while the models train.
+    Set 'train_on_startup: false' in config.yaml to only train through
+    POST /api/trainingJobs. The import time, peak RSS and any training
+    module loaded by the API process are printed first.
+    """
+    report_startup(startup_seconds)
+    if configLoader.load_config().get('train_on_startup', True):
+        trainingJobs.start_job()
+    yield
 
-# Import modules from the project structure
-from src.infrastructure import healthCheck, cleanResults
-from src.domain import configLoader
-from src.application import workflow
 
 # Initialize the FastAPI app with metadata about the API
 app = FastAPI(
     title="Backend APIs For Walmart Scale Up Project",
     description="This is just a test api",
     version="0.1.0",
+    lifespan=lifespan,
     # Uncomment the lines below if you want to customize the docs URL or the
     # OpenAPI spec location
     # docs_url=None,
     # openapi_url="/api/openapi.json"
 )
 
-# Call the function to clean results at the start-up of the application.
-# This ensures that any previous state or data is cleaned before the
-# application starts serving new requests.
-cleanResults.clean()
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """
+    Record the latency of every request by route template and status code,
+    exposed by /api/metrics.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        metrics.record_request(request.method, getattr(route, 'path', None),
+                               status, time.perf_counter() - start)
+
 
 # Include routers from different parts of the application.
 # This modular approach helps in organizing different API endpoints and
@@ -35,7 +75,11 @@ app.include_router(configLoader.router)
 # Workflow router for managing the main workflow of the application
 app.include_router(workflow.router)
 
-# Uncomment the line below if you want to run the workflow when the
-# application starts.
-# This might be used for initialization tasks or preloading models/data.
-workflow.run_multiple_model()
+# Training jobs router for starting, following and cancelling training runs
+app.include_router(trainingJobs.router)
+
+# Metrics router exposing stage timings and request latencies to Prometheus
+app.include_router(metrics.router)
+
+# Time spent importing the application and building its routes
+startup_seconds = time.perf_counter() - import_start
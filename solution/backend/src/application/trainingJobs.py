@@ -0,0 +1,433 @@
+import uuid
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException
+from src.application import workflow
+from src.domain import configLoader
+from src.infrastructure import cleanResults, metrics
+
+router = APIRouter()
+
+# States of a job; a job is active while pending or running
+JOB_STATES = ['pending', 'running', 'completed', 'failed', 'cancelled']
+# States of a group within a job
+GROUP_STATES = ['queued', 'skipped', 'running', 'completed', 'degraded',
+                'failed', 'cancelled']
+# Group states counted by metrics.GROUPS; a group reaches one of them once
+FINAL_GROUP_STATES = ['skipped', 'completed', 'degraded', 'failed',
+                      'cancelled']
+# Number of finished jobs kept for the status endpoints
+MAX_FINISHED_JOBS = 20
+
+# Every known job by id, oldest first
+jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+jobs_lock = threading.Lock()
+
+
+def now() -> str:
+    """
+    Returns the current UTC time as an ISO 8601 string.
+
+    Returns:
+        str: The timestamp.
+    """
+    return datetime.now(timezone.utc).isoformat()
+
+
+class TrainingJob:
+    """
+    A training run of every group of one model level, executed in a
+    background thread. The workflow reports the progress of each group to
+    the job and polls it for cancellation.
+    """
+
+    def __init__(self, model_level: int, epochs: int,
+                 model_type: str = 'keras',
+                 training_mode: str = 'per_group',
+                 force: bool = False):
+        """
+        Args:
+            model_level (int): Model level whose groups are trained.
+            epochs (int): Number of epochs per model.
+            model_type (str): Model type trained for every group.
+            training_mode (str): Keras models per group or one global
+            model.
+            force (bool): Remove every stored result, model and checkpoint
+            first, so that no group is skipped or resumed.
+        """
+        self.job_id = uuid.uuid4().hex[:12]
+        self.model_level = model_level
+        self.epochs = epochs
+        self.model_type = model_type
+        self.training_mode = training_mode
+        self.force = force
+        self.state = 'pending'
+        self.error: Optional[str] = None
+        self.created_at = now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.groups: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.plan: Optional[Dict[str, Any]] = None
+        # Seconds per stage, summed over the run and all of its groups
+        self.stage_seconds: Dict[str, float] = {}
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def set_groups(self, group_names: List[str]) -> None:
+        """
+        Registers the groups the job is going to train.
+
+        Args:
+            group_names (List[str]): Names of the groups.
+        """
+        with self.lock:
+            for group_name in group_names:
+                self.groups[str(group_name)] = {
+                    "state": 'queued', "error": None}
+
+    def set_plan(self, plan: Dict[str, Any]) -> None:
+        """
+        Records the worker plan chosen for the run.
+
+        Args:
+            plan (Dict[str, Any]): Plan returned by cpuBudget.plan_workers.
+        """
+        self.plan = plan
+
+    def update_group(self, group_name: str, state: str,
+                     error: Optional[str] = None) -> None:
+        """
+        Records the state of a group.
+
+        Args:
+            group_name (str): Name of the group.
+            state (str): One of GROUP_STATES.
+            error (Optional[str]): Error message of a failed group.
+        """
+        with self.lock:
+            # Keeps the stage timings of the group
+            self.groups[str(group_name)] = {
+                **self.groups.get(str(group_name), {}),
+                "state": state, "error": error}
+        if state in FINAL_GROUP_STATES:
+            metrics.GROUPS.inc(state=state)
+
+    def record_stages(self, stages: Dict[str, float],
+                      group_name: Optional[str] = None) -> None:
+        """
+        Records the time spent in the stages of the run or of one group.
+
+        Args:
+            stages (Dict[str, float]): Seconds per stage.
+            group_name (Optional[str]): Group the timings belong to; None
+            for the stages of the whole run.
+        """
+        with self.lock:
+            for stage, seconds in stages.items():
+                self.stage_seconds[stage] = \
+                    self.stage_seconds.get(stage, 0.0) + seconds
+            if group_name is not None:
+                group = self.groups.setdefault(
+                    str(group_name), {"state": 'running', "error": None})
+                group["stages"] = {stage: round(seconds, 3)
+                                   for stage, seconds in stages.items()}
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns:
+            bool: True once cancellation has been requested.
+        """
+        return self.cancel_event.is_set()
+
+    def is_active(self) -> bool:
+        """
+        Returns:
+            bool: True while the job is pending or running.
+        """
+        with self.lock:
+            return self.state in ('pending', 'running')
+
+    def cancel(self) -> None:
+        """
+        Requests cancellation. Groups not yet started are dropped; groups
+        already training run to completion.
+        """
+        self.cancel_event.set()
+
+    def run(self) -> None:
+        """
+        Trains every group of the job's model level. Runs in the job's
+        background thread.
+        """
+        with self.lock:
+            self.state = 'running'
+            self.started_at = now()
+        try:
+            if self.force:
+                cleanResults.clean()
+            workflow.run_multiple_model(model_level=self.model_level,
+                                        epochs=self.epochs, job=self,
+                                        model_type=self.model_type,
+                                        training_mode=self.training_mode)
+            with self.lock:
+                self.state = 'cancelled' if self.is_cancelled() \
+                    else 'completed'
+        except Exception as exc:
+            traceback.print_exc()
+            with self.lock:
+                self.error = str(exc)
+                self.state = 'failed'
+        finally:
+            with self.lock:
+                self.finished_at = now()
+            # Forecasts must reload the models written by this run
+            if workflow.model_cache is not None:
+                workflow.model_cache.clear()
+            metrics.JOBS.inc(state=self.state)
+            print(f"Training job {self.job_id} {self.state}")
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Returns the number of groups in each state.
+
+        Returns:
+            Dict[str, int]: Total and per-state group counts.
+        """
+        with self.lock:
+            states = [group['state'] for group in self.groups.values()]
+        counts = {state: states.count(state) for state in GROUP_STATES}
+        return {"total": len(states), **counts}
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Returns the job's state, parameters, timestamps, worker plan,
+        progress and time spent per stage.
+
+        Returns:
+            Dict[str, Any]: The job status.
+        """
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "model_level": self.model_level,
+            "epochs": self.epochs,
+            "model_type": self.model_type,
+            "training_mode": self.training_mode,
+            "force": self.force,
+            "cancel_requested": self.is_cancelled(),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "plan": self.plan,
+            "progress": self.progress(),
+            "stage_seconds": self.get_stage_seconds(),
+        }
+
+    def get_stage_seconds(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Seconds per stage, summed over the run and
+            all of its groups.
+        """
+        with self.lock:
+            return {stage: round(seconds, 3)
+                    for stage, seconds in self.stage_seconds.items()}
+
+    def group_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the state of every group of the job.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: State, error message and, once
+            trained, seconds per stage of every group.
+        """
+        with self.lock:
+            return {name: dict(group) for name, group in self.groups.items()}
+
+
+def start_job(model_level: Optional[int] = None,
+              epochs: Optional[int] = None,
+              model_type: Optional[str] = None,
+              training_mode: Optional[str] = None,
+              force: bool = False) -> TrainingJob:
+    """
+    Starts a training job in a background thread.
+
+    Args:
+        model_level (Optional[int]): Model level to train. Defaults to the
+        'model_level' of config.yaml.
+        epochs (Optional[int]): Number of epochs per model. Defaults to the
+        'epochs' of config.yaml.
+        model_type (Optional[str]): Model type to train. Defaults to the
+        'model_type' of config.yaml.
+        training_mode (Optional[str]): Keras training mode. Defaults to the
+        'training_mode' of config.yaml.
+        force (bool): Retrain every group, removing the stored results
+        first (see cleanResults.clean). Defaults to False.
+
+    Raises:
+        RuntimeError: If another job is still active; runs of different
+        levels would write to the same results directory.
+
+    Returns:
+        TrainingJob: The started job.
+    """
+    config_dict = configLoader.load_config()
+    if model_level is None:
+        model_level = config_dict['model_level']
+    if epochs is None:
+        epochs = config_dict['epochs']
+    model_type = workflow.get_model_type(model_type)
+    training_mode = workflow.get_training_mode(training_mode)
+
+    with jobs_lock:
+        active = [job for job in jobs.values() if job.is_active()]
+        if active:
+            raise RuntimeError(
+                f"Training job {active[0].job_id} is still {active[0].state}")
+        job = TrainingJob(model_level, epochs, model_type, training_mode,
+                          force)
+        jobs[job.job_id] = job
+        finished = [job_id for job_id, known in jobs.items()
+                    if not known.is_active()]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            del jobs[job_id]
+
+    thread = threading.Thread(target=job.run, daemon=True,
+                              name=f"training-job-{job.job_id}")
+    thread.start()
+    print(f"Started training job {job.job_id} " +
+          f"(level {model_level}, {epochs} epochs, {model_type}, " +
+          f"{training_mode}{', forced' if force else ''})")
+    return job
+
+
+def get_job(job_id: str) -> TrainingJob:
+    """
+    Returns a known job.
+
+    Args:
+        job_id (str): Id of the job.
+
+    Raises:
+        HTTPException: 404 if the job is unknown.
+
+    Returns:
+        TrainingJob: The job.
+    """
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
+
+
+@router.post("/api/trainingJobs")
+def create_training_job(model_level: Optional[int] = None,
+                        epochs: Optional[int] = None,
+                        model_type: Optional[str] = None,
+                        training_mode: Optional[str] = None,
+                        force: bool = False) -> Dict[str, Any]:
+    """
+    Start training every group of a model level in the background.
+
+    Parameters:
+    - model_level: Model level to train, defaults to config.yaml
+    - epochs: Number of epochs per model, defaults to config.yaml
+    - model_type: Model type to train ('keras' or a vectorized engine),
+    defaults to config.yaml
+    - training_mode: 'per_group' or 'global' Keras models, defaults to
+    config.yaml
+    - force: Remove every stored result, model and checkpoint first, so
+    that every group retrains instead of being skipped or resumed
+
+    Returns:
+    Dict[str, Any]: Status of the started job.
+    """
+    if model_level is not None:
+        try:
+            configLoader.load_config_model(model_level)
+        except Exception as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+    if epochs is not None and epochs < 1:
+        raise HTTPException(status_code=422,
+                            detail="epochs must be at least 1")
+    try:
+        model_type = workflow.get_model_type(model_type)
+        training_mode = workflow.get_training_mode(training_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    try:
+        job = start_job(model_level, epochs, model_type, training_mode,
+                        force)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return job.status()
+
+
+@router.get("/api/trainingJobs")
+def list_training_jobs() -> List[Dict[str, Any]]:
+    """
+    Return the status of every known training job, oldest first.
+
+    Returns:
+    List[Dict[str, Any]]: Job statuses.
+    """
+    with jobs_lock:
+        known = list(jobs.values())
+    return [job.status() for job in known]
+
+
+@router.get("/api/trainingJobs/{job_id}")
+def fetch_training_job(job_id: str) -> Dict[str, Any]:
+    """
+    Return the status and progress of a training job.
+
+    Parameters:
+    - job_id: Id of the job
+
+    Returns:
+    Dict[str, Any]: Job status.
+    """
+    return get_job(job_id).status()
+
+
+@router.get("/api/trainingJobs/{job_id}/groups")
+def fetch_training_job_groups(job_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the state of every group of a training job.
+
+    Parameters:
+    - job_id: Id of the job
+
+    Returns:
+    Dict[str, Dict[str, Any]]: State ('queued', 'skipped', 'running',
+    'completed', 'degraded', 'failed' or 'cancelled'), error message and,
+    once trained, seconds per stage of every group.
+    Skipped groups already have a model trained on identical inputs.
+    Degraded groups were fitted with a vectorized engine because their
+    Keras model does not fit the memory budget.
+    """
+    return get_job(job_id).group_status()
+
+
+@router.delete("/api/trainingJobs/{job_id}")
+def cancel_training_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancel a training job. Groups that have not started are dropped, groups
+    already training finish and keep their results.
+
+    Parameters:
+    - job_id: Id of the job
+
+    Returns:
+    Dict[str, Any]: Job status.
+    """
+    job = get_job(job_id)
+    if job.is_active():
+        job.cancel()
+    return job.status()
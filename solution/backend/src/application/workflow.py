@@ -1,73 +1,1214 @@
 import os
 import json
-import re
-from typing import Tuple, Dict, Any, List
+import time
+import threading
+import multiprocessing
+from typing import (Tuple, Dict, Any, List, Optional, Callable, Iterator,
+                    Union)
+import numpy as np
 from pandas import DataFrame
-from fastapi import APIRouter
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from concurrent.futures import (Future, ProcessPoolExecutor, wait,
+                                FIRST_COMPLETED)
 from src.infrastructure.dataLoader import load_csv_data
-from src.domain import (validate, transform, preProcessing,
-                        trainAndEvaluate, configLoader)
+from src.infrastructure.resourceUsage import (get_peak_rss_mb,
+                                              get_private_rss_mb,
+                                              report_peak_rss)
+from src.infrastructure import (modelStore, resultsStore, sharedFrames,
+                                cpuBudget, checkpointStore, metrics,
+                                memoryBudget)
+from src.infrastructure.latencyTracker import LatencyTracker
+from src.infrastructure.responseCache import (ResponseCache, etag_matches,
+                                              get_etag, get_signature)
+# preProcessing and trainAndEvaluate are imported where they are used: they
+# load scikit-learn and TensorFlow, which would otherwise delay the API
+# start-up by several seconds
+from src.domain import (validate, transform, configLoader, trainingKey,
+                        statisticalModels, downsampling, inference,
+                        calendarFeatures)
+from src.domain.hierarchy import Hierarchy
 
 router = APIRouter()
 
+# Loaded models are shared by all forecast requests, see get_model_cache
+model_cache: Optional[modelStore.ModelCache] = None
+forecast_latency = LatencyTracker()
+# Rendered results responses, see get_response_cache
+response_cache: Optional[ResponseCache] = None
+# Aggregation hierarchy of the sales data with the stat of the sales file
+# it was built from, see get_hierarchy
+hierarchy_cache: Optional[Tuple[Tuple[int, int], Hierarchy]] = None
+hierarchy_lock = threading.Lock()
+# Date of every calendar day with the stat of the calendar file, see
+# get_day_dates
+day_dates_cache: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+# Measured memory of an idle training worker, see get_worker_base_mb
+worker_base_cache: Optional[float] = None
 
-def get_data() -> Tuple[DataFrame, DataFrame, int]:
+SALES_PATH = './data/sales_train.csv'
+# Checkpoint name of the global model, which trains every group at once
+GLOBAL_CHECKPOINT = 'global'
+CALENDAR_PATH = './data/calendar.csv'
+
+# Days of input and of forecast per training window
+N_TRAINING = 28
+N_FORECAST = 28
+
+# How often (seconds) run_multiple_model checks for cancellation
+POLL_INTERVAL = 1.0
+
+# Series fitted together by the vectorized engines, across groups
+STATISTICAL_BATCH_SERIES = 4096
+
+# 'per_group' trains one Keras model per group, 'global' one Keras model
+# over every series of the level (see domain/globalModel.py)
+TRAINING_MODES = ['per_group', 'global']
+
+# What happens to a group whose Keras model can never fit the memory budget
+# (config 'oversized_groups'), besides fitting a vectorized engine instead
+OVERSIZED_POLICIES = ['reject', 'train']
+
+# Set in each pool worker by init_worker
+shared_sales_df: Optional[DataFrame] = None
+shared_calendar_df: Optional[DataFrame] = None
+shared_exogenous: Optional[np.ndarray] = None
+
+
+def get_data(model_level: Optional[int] = None,
+             timer: Optional[metrics.StageTimer] = None) -> Tuple[
+        DataFrame, DataFrame, int]:
     """
     Load and preprocess data, then return transformed data frames and 
     desired model level.
 
+    The CSV files are parsed in row chunks into compact dtypes (see
+    dataLoader), so the full sales history is loaded without ever holding
+    it as int64. The peak RSS after loading is reported.
+
+    Parameters:
+    - model_level: Model level to use instead of the one in config.yaml.
+    - timer: Receives the time spent in the 'load_csv', 'validate' and
+    'transform' stages.
+
     Returns:
     Tuple[DataFrame, DataFrame, int]: Calendar data frame, sales data frame, 
     and desired model level.
     """
-    raw_calendar_df = load_csv_data('./data/calendar.csv')
-    # TODO: Remove this iloc
-    raw_sales_df = load_csv_data('./data/sales_train.csv').iloc[0:10000]
-    raw_sell_prices_df = load_csv_data('./data/sell_prices.csv')
+    timer = timer or metrics.StageTimer()
+    with timer.time('load_csv'):
+        raw_calendar_df = load_csv_data(CALENDAR_PATH)
+        raw_sales_df = load_csv_data(SALES_PATH)
+        raw_sell_prices_df = load_csv_data('./data/sell_prices.csv')
+    report_peak_rss('loading data')
 
-    validate.validate(raw_calendar_df, raw_sales_df, raw_sell_prices_df)
-    calender, sales, _, desired_model_level = transform.transform(
-        raw_calendar_df, raw_sales_df, raw_sell_prices_df)
+    with timer.time('validate'):
+        validate.validate(raw_calendar_df, raw_sales_df, raw_sell_prices_df)
+    with timer.time('transform'):
+        calender, sales, _, desired_model_level = transform.transform(
+            raw_calendar_df, raw_sales_df, raw_sell_prices_df, model_level)
     return calender, sales, desired_model_level
 
 
-def run_multiple_model() -> None:
+def get_hierarchy(sales_df: Optional[DataFrame] = None) -> Hierarchy:
+    """
+    Returns the aggregation hierarchy (summing matrix of all 12 levels) of
+    the current sales data, shared by training and the API. It is rebuilt
+    when the sales file changes (mtime or size).
+
+    Parameters:
+    - sales_df: Sales data just loaded by the caller, used instead of
+    loading the data again when the cached hierarchy is stale.
+
+    Returns:
+    Hierarchy: The hierarchy of the sales data.
+    """
+    global hierarchy_cache
+    stat = os.stat(SALES_PATH)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with hierarchy_lock:
+        if hierarchy_cache is None or hierarchy_cache[0] != version:
+            if sales_df is None:
+                _, sales_df, _ = get_data()
+            start_time = time.perf_counter()
+            hierarchy_cache = (version, Hierarchy(sales_df))
+            print("Built the summing matrix of " +
+                  f"{hierarchy_cache[1].summing_matrix.shape[0]} series in " +
+                  f"{time.perf_counter() - start_time:.2f}s")
+        return hierarchy_cache[1]
+
+
+def get_served_hierarchy() -> Hierarchy:
+    """
+    Returns the hierarchy for an API request (see get_hierarchy).
+
+    Returns:
+    Hierarchy: The hierarchy of the sales data.
+
+    Raises:
+    HTTPException: 503 if a data file is missing, e.g. before the data
+    volume is mounted.
+    """
+    try:
+        return get_hierarchy()
+    except FileNotFoundError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Sales data not available: {exc.filename}") from exc
+
+
+def attach_shared_data(sales_handle: Dict[str, Any],
+                       calendar_handle: Dict[str, Any]) -> None:
+    """
+    Pool worker initializer: attach the shared sales and calendar frames
+    once per worker process.
+
+    Parameters:
+    - sales_handle: Handle of the shared sales frame.
+    - calendar_handle: Handle of the shared calendar frame.
+    """
+    global shared_sales_df, shared_calendar_df
+    shared_sales_df = sharedFrames.attach_frame(sales_handle)
+    shared_calendar_df = sharedFrames.attach_frame(calendar_handle)
+
+
+def init_worker(sales_handle: Dict[str, Any],
+                calendar_handle: Dict[str, Any],
+                exogenous_by_day: np.ndarray,
+                threads_per_worker: int) -> None:
+    """
+    Pool worker initializer: cap the worker's TensorFlow and BLAS thread
+    pools (before TensorFlow is imported by run_model) and attach the
+    shared data.
+
+    Parameters:
+    - sales_handle: Handle of the shared sales frame.
+    - calendar_handle: Handle of the shared calendar frame.
+    - exogenous_by_day: Exogenous features of every day, computed once per
+    run (a few KB, sent once per worker).
+    - threads_per_worker: Threads allowed per pool in this worker.
+    """
+    global shared_exogenous
+    cpuBudget.limit_threads(threads_per_worker)
+    attach_shared_data(sales_handle, calendar_handle)
+    shared_exogenous = exogenous_by_day
+
+
+def run_shared_model(group_name: str,
+                     start: int,
+                     stop: int,
+                     epochs: int,
+                     training_key: str) -> Dict[str, float]:
+    """
+    Run a model on rows [start, stop) of the shared sales frame, which hold
+    exactly one group. Only these few integers are pickled per task.
+
+    Parameters:
+    - group_name: The name of the group for which the model is being run.
+    - start: First row of the group in the shared sales frame.
+    - stop: Row after the last row of the group.
+    - epochs: Number of epochs to train the model.
+    - training_key: Content address of the group's inputs.
+
+    Returns:
+    Dict[str, float]: Seconds spent in each stage, see run_model.
+    """
+    return run_model(group_name, shared_sales_df.iloc[start:stop],
+                     shared_calendar_df, epochs, training_key,
+                     shared_exogenous)
+
+
+def run_shared_global_model(group_sizes: List[Tuple[Any, int]],
+                            epochs: int,
+                            training_key: str) -> Dict[str, float]:
+    """
+    Run the global model on every row of the shared sales frame, whose
+    consecutive row ranges hold the given groups.
+
+    Parameters:
+    - group_sizes: Name and number of rows of every group, in row order.
+    - epochs: Number of epochs to train the model.
+    - training_key: Content address of the level's inputs.
+
+    Returns:
+    Dict[str, float]: Seconds spent in each stage, see run_global_model.
+    """
+    return run_global_model(group_sizes, shared_sales_df, shared_calendar_df,
+                            epochs, training_key, shared_exogenous)
+
+
+def is_trained(group_name: str, training_key: str,
+               model_type: str = 'keras') -> bool:
+    """
+    Check whether a group's stored model and results were trained on
+    exactly the inputs identified by training_key.
+
+    Parameters:
+    - group_name: The name of the group.
+    - training_key: Content address of the group's current inputs.
+    - model_type: Model type of the key; only Keras models are persisted
+    next to the results.
+
+    Returns:
+    bool: True if the group does not need to be retrained.
+    """
+    if resultsStore.get_training_key(group_name) != training_key:
+        return False
+    return model_type != 'keras' or \
+        modelStore.get_training_key(group_name) == training_key
+
+
+def get_training_mode(training_mode: Optional[str] = None) -> str:
+    """
+    Returns the Keras training mode, checked against the known modes.
+
+    Parameters:
+    - training_mode: Training mode to use instead of the one in config.yaml.
+
+    Returns:
+    str: One of TRAINING_MODES.
+    """
+    if training_mode is None:
+        training_mode = configLoader.load_config().get('training_mode',
+                                                       'per_group')
+    if training_mode not in TRAINING_MODES:
+        raise ValueError(f"Invalid training_mode {training_mode}, expected " +
+                         f"one of {TRAINING_MODES}")
+    return training_mode
+
+
+def get_model_type(model_type: Optional[str] = None) -> str:
+    """
+    Returns the model type to train, checked against the known types.
+
+    Parameters:
+    - model_type: Model type to use instead of the one in config.yaml.
+
+    Returns:
+    str: One of statisticalModels.MODEL_TYPES.
+    """
+    if model_type is None:
+        model_type = configLoader.load_config().get('model_type', 'keras')
+    if model_type not in statisticalModels.MODEL_TYPES:
+        raise ValueError(f"Invalid model_type {model_type}, expected one " +
+                         f"of {statisticalModels.MODEL_TYPES}")
+    return model_type
+
+
+def record_stages(stages: Dict[str, float], model_type: str,
+                  job: Optional[Any] = None,
+                  group_name: Optional[Any] = None) -> None:
+    """
+    Record the stage timings of a run or of one group in the process-wide
+    metrics (see /api/metrics) and in the training job, if any.
+
+    Parameters:
+    - stages: Seconds spent in each stage, see metrics.StageTimer.
+    - model_type: Model type of the run, a label of the metrics.
+    - job: Optional trainingJobs.TrainingJob of the run.
+    - group_name: Group the timings belong to; None for the stages of the
+    whole run.
+    """
+    metrics.record_stages(stages, model_type)
+    if job is not None:
+        job.record_stages(stages, group_name)
+
+
+def get_oversized_policy(policy: Optional[str] = None) -> str:
+    """
+    Returns what to do with groups that can never fit the memory budget,
+    checked against the known policies.
+
+    Parameters:
+    - policy: Policy to use instead of 'oversized_groups' in config.yaml.
+
+    Returns:
+    str: A vectorized engine fitted instead of the Keras model (see
+    statisticalModels.ENGINES), 'reject' or 'train'.
+    """
+    if policy is None:
+        policy = configLoader.load_config().get('oversized_groups', 'ridge')
+    if policy not in list(statisticalModels.ENGINES) + OVERSIZED_POLICIES:
+        raise ValueError(f"Invalid oversized_groups {policy}, expected one " +
+                         f"of {list(statisticalModels.ENGINES)} or " +
+                         f"{OVERSIZED_POLICIES}")
+    return policy
+
+
+def probe_worker() -> float:
+    """
+    Measure the fixed memory of a training worker: import TensorFlow, then
+    build, fit and predict the model of a single series on one batch, so
+    that the runtime state TensorFlow allocates on first use (thread pools,
+    traced functions, optimizer) is counted too. Runs in a spawned process
+    (see get_worker_base_mb).
+
+    Returns:
+    float: Peak RSS (VmHWM) of the process in MB.
+    """
+    from src.domain import trainAndEvaluate
+
+    model = trainAndEvaluate.build_baseline_model(1, N_TRAINING, 1)
+    X = np.zeros((10,) + tuple(model.input_shape[1:]), dtype=np.float32)
+    model.fit(X, np.zeros((10, 1), dtype=np.float32), epochs=1,
+              batch_size=10, verbose=0)
+    model.predict(X, verbose=0)
+    return get_peak_rss_mb()
+
+
+def get_worker_base_mb(worker_base_mb: Union[int, str] = 'auto',
+                       threads_per_worker: int = 1) -> float:
+    """
+    Return the memory counted for every training worker before its group.
+    With 'auto' it is measured once per process by probe_worker in a fresh
+    spawned worker, with the same thread limit as the training workers,
+    and falls back to memoryBudget.DEFAULT_WORKER_BASE_MB if the probe
+    fails.
+
+    Parameters:
+    - worker_base_mb: 'worker_base_mb' in config.yaml, a number of MB or
+    'auto'.
+    - threads_per_worker: Threads allowed per pool in a worker.
+
+    Returns:
+    float: The memory of an idle worker in MB.
+    """
+    global worker_base_cache
+    if worker_base_mb != 'auto':
+        return float(worker_base_mb)
+    if worker_base_cache is None:
+        start_time = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=cpuBudget.limit_threads,
+                    initargs=(threads_per_worker,)) as executor:
+                worker_base_cache = executor.submit(probe_worker).result()
+            print(f"Measured an idle worker at {worker_base_cache:.0f} MB " +
+                  f"in {time.perf_counter() - start_time:.2f}s")
+        except Exception as exc:
+            print(f"Could not measure an idle worker ({exc}), assuming " +
+                  f"{memoryBudget.DEFAULT_WORKER_BASE_MB} MB")
+            return float(memoryBudget.DEFAULT_WORKER_BASE_MB)
+    return worker_base_cache
+
+
+def plan_memory(group_rows: List[Tuple[Any, np.ndarray]],
+                n_days: int,
+                plan: Dict[str, Any]) -> Tuple[
+                    memoryBudget.MemoryAdmission, Dict[Any, float]]:
+    """
+    Prepare the memory admission of the per-group Keras models: the
+    budget ('memory_budget_mb' in config.yaml, the container's memory limit
+    by default), the part reserved for this process ('memory_reserve_mb'
+    on top of its current private RSS), the cost of a worker
+    ('worker_base_mb', measured by default, see get_worker_base_mb) and the
+    estimated peak of every group. The budget is added to the worker plan.
+
+    Parameters:
+    - group_rows: Name and rows of every group to train.
+    - n_days: Number of sales days.
+    - plan: Worker plan returned by cpuBudget.plan_workers.
+
+    Returns:
+    Tuple[memoryBudget.MemoryAdmission, Dict[Any, float]]: The admission
+    control and the estimate in MB of every group.
+    """
+    config_dict = configLoader.load_config()
+    budget_mb, source = memoryBudget.get_memory_budget(
+        config_dict.get('memory_budget_mb', 'auto'))
+    reserved_mb = get_private_rss_mb() + \
+        config_dict.get('memory_reserve_mb', 50)
+    worker_base_mb = get_worker_base_mb(
+        config_dict.get('worker_base_mb', 'auto'),
+        plan['threads_per_worker'])
+    admission = memoryBudget.MemoryAdmission(
+        budget_mb, reserved_mb, worker_base_mb, plan['workers'])
+    estimates = {group_name: memoryBudget.estimate_group_mb(len(rows), n_days)
+                 for group_name, rows in group_rows}
+    plan.update({
+        "memory_budget_mb": round(budget_mb),
+        "memory_budget_source": source,
+        "memory_reserved_mb": round(reserved_mb),
+        "worker_base_mb": round(worker_base_mb),
+        "largest_group_mb": round(max(estimates.values(), default=0)),
+    })
+    print(f"Memory budget: {budget_mb:.0f} MB ({source}), " +
+          f"{reserved_mb:.0f} MB reserved, {worker_base_mb:.0f} MB " +
+          "per worker, largest group estimated at " +
+          f"{plan['largest_group_mb']} MB")
+    return admission, estimates
+
+
+def prune_other_levels(model_level: int, group_names: List[str]) -> None:
+    """
+    Record the level being trained and remove the results, models and
+    checkpoints of groups that do not belong to it, e.g. after
+    'model_level' changed. Results are no longer wiped at start-up (see
+    trainingKey), so without this the groups of every level trained so far
+    would be listed together.
+
+    Parameters:
+    - model_level: The level being trained.
+    - group_names: Names of every group of the level.
+    """
+    resultsStore.save_level(model_level, group_names)
+    current = set(group_names)
+    stale = {
+        "results": [name for name in resultsStore.list_groups(all_levels=True)
+                    if name not in current],
+        "models": [name for name in modelStore.list_models()
+                   if name not in current],
+        # The global checkpoint is discarded by its training key instead
+        "checkpoints": [name for name in checkpointStore.list_checkpoints()
+                        if name not in current and name != GLOBAL_CHECKPOINT],
+    }
+    for name in stale['results']:
+        resultsStore.remove_results(name)
+    for name in stale['models']:
+        modelStore.remove_model(name)
+    for name in stale['checkpoints']:
+        checkpointStore.remove_checkpoint(name)
+    if any(stale.values()):
+        print("Removed the groups of other levels: " +
+              ", ".join(f"{len(names)} {kind}"
+                        for kind, names in stale.items()))
+        if model_cache is not None:
+            model_cache.clear()
+
+
+def run_multiple_model(model_level: Optional[int] = None,
+                       epochs: Optional[int] = None,
+                       job: Optional[Any] = None,
+                       model_type: Optional[str] = None,
+                       training_mode: Optional[str] = None) -> None:
     """
     Load configuration, get data, and execute model training in 
     parallel processes.
+
+    The sales rows (ordered so that every group is a contiguous range) and
+    the calendar are written once to memory-mapped files which the workers
+    attach to, instead of pickling the calendar and each group through the
+    pool pipe.
+
+    The number of workers and the threads of each worker follow the CPU
+    quota of the container (see cpuBudget), overridable with 'workers' and
+    'threads_per_worker' in config.yaml. Groups are submitted largest
+    first so that the biggest model does not start last.
+
+    Per-group models are also admitted against the memory budget (see
+    plan_memory): a group only starts when its estimated peak fits next to
+    the running groups and the live private RSS of the workers, smaller
+    groups filling the memory a larger one leaves. Groups that can never
+    fit, even alone, are fitted with the vectorized engine named by
+    'oversized_groups' in config.yaml ('degraded'), rejected ('failed'),
+    or trained anyway one at a time ('train'); a warning is printed when
+    this is the case of every group.
+
+    Groups are content-addressed (see trainingKey): a group whose stored
+    model and results carry the key of its current sales rows, calendar,
+    window sizes, epochs and model architecture is skipped.
+    The results, models and checkpoints of groups from other levels are
+    removed first (see prune_other_levels).
+
+    The time spent in each stage is recorded for the run (loading,
+    validating and transforming the data, training keys, sharing, training)
+    and for every group (as returned by the workers), see record_stages.
+
+    With a model_type other than 'keras' the groups are fitted in this
+    process by the vectorized engines instead (see run_statistical_models).
+    With the 'global' training_mode a single Keras model is trained over
+    every series of the level in one worker (see run_global_model); its
+    key covers every group, so the level is retrained as a whole.
+
+    Parameters:
+    - model_level: Model level to train, defaults to config.yaml.
+    - epochs: Number of epochs per model, defaults to config.yaml.
+    - job: Optional trainingJobs.TrainingJob receiving the state of each
+    group. Once it is cancelled, groups that have not started are dropped
+    and groups already training run to completion.
+    - model_type: Model type to train, defaults to config.yaml.
+    - training_mode: Keras training mode, defaults to config.yaml.
     """
     config_dict = configLoader.load_config()
-    epochs = config_dict['epochs']
-    calender_df, sales_df, desired_model_level = get_data()
-    _, d2 = transform.get_model_details_per_level(
-        sales_df, desired_model_level)
-
-    # Using a ProcessPoolExecutor to run models in parallel
-    with ProcessPoolExecutor(max_workers=os.cpu_count()-1) as executor:
-        # Dictionary to hold futures
-        futures = {}
-
-        for group_name, group_df in d2:
-            # Submitting the run_model function to the executor
-            # Pass additional arguments as needed
-            future = executor.submit(
-                run_model, group_name, group_df, calender_df, epochs)
-            futures[future] = group_name
-
-        # As each future completes, get the result and populate temp_models
-        for future in as_completed(futures):
-            group_name = futures[future]
+    model_type = get_model_type(model_type)
+    is_global = model_type == 'keras' and \
+        get_training_mode(training_mode) == 'global'
+    # The global model's architecture is part of its keys
+    key_model_type = 'keras_global' if is_global else model_type
+    if epochs is None:
+        epochs = config_dict['epochs']
+    if model_type != 'keras':
+        # Epochs do not apply to the vectorized engines
+        epochs = 0
+    timer = metrics.StageTimer()
+    calender_df, sales_df, desired_model_level = get_data(model_level, timer)
+    group_rows = get_hierarchy(sales_df).get_group_rows(
+        desired_model_level.LevelId)
+    if job is not None:
+        job.set_groups([group_name for group_name, _ in group_rows])
+    prune_other_levels(desired_model_level.LevelId,
+                       [str(group_name) for group_name, _ in group_rows])
+
+    training_keys = get_training_keys(group_rows, sales_df, calender_df,
+                                      epochs, key_model_type, is_global,
+                                      job, timer)
+    print(f"Data stages: {timer.summary()}")
+    record_stages(timer.seconds, key_model_type, job)
+    if model_type == 'keras' and training_keys:
+        report_resumed(training_keys, is_global)
+    group_rows = sorted(
+        [(group_name, rows) for group_name, rows in group_rows
+         if group_name in training_keys],
+        key=lambda group: len(group[1]), reverse=True)
+    if not group_rows or (job is not None and job.is_cancelled()):
+        return
+    if model_type != 'keras':
+        run_statistical_models(group_rows, sales_df, calender_df,
+                               model_type, training_keys, job)
+        return
+
+    plan, admission, estimates, oversized = plan_training(
+        group_rows, sales_df.columns.str.startswith('d_').sum(), is_global,
+        config_dict)
+    if job is not None:
+        job.set_plan(plan)
+    if oversized:
+        run_oversized_groups(oversized, len(group_rows), plan, admission,
+                             estimates, sales_df, calender_df,
+                             training_keys, job)
+        if plan['oversized_policy'] != 'train':
+            group_rows = [group for group in group_rows
+                          if group not in oversized]
+        if not group_rows:
+            return
+
+    # The calendar features are the same for every group
+    exogenous_by_day = calendarFeatures.get_exogenous_by_day(calender_df)
+
+    timer = metrics.StageTimer()
+    start_time = time.perf_counter()
+    sales_handle = sharedFrames.share_frame(
+        sales_df, rows=np.concatenate([rows for _, rows in group_rows]))
+    calendar_handle = sharedFrames.share_frame(calender_df)
+    shared_mb = (sharedFrames.get_shared_size(sales_handle) +
+                 sharedFrames.get_shared_size(calendar_handle)) / 1024 ** 2
+    timer.add('share_data', time.perf_counter() - start_time)
+    print(f"Shared {shared_mb:.1f} MB of sales and calendar data in " +
+          f"{time.perf_counter() - start_time:.2f}s")
+    report_peak_rss('sharing data')
+
+    start_time = time.perf_counter()
+    try:
+        run_worker_pool(group_rows, (sales_handle, calendar_handle,
+                                     exogenous_by_day), plan, admission,
+                        estimates, epochs, training_keys, key_model_type,
+                        is_global, job)
+    finally:
+        sharedFrames.release_frame(sales_handle)
+        sharedFrames.release_frame(calendar_handle)
+        timer.add('train', time.perf_counter() - start_time)
+        record_stages(timer.seconds, key_model_type, job)
+
+    report_peak_rss('training')
+    print("Peak RSS of the largest worker: " +
+          f"{get_peak_rss_mb(include_children=True):.1f} MB")
+
+
+def get_training_keys(group_rows: List[Tuple[Any, np.ndarray]],
+                      sales_df: DataFrame,
+                      calender_df: DataFrame,
+                      epochs: int,
+                      key_model_type: str,
+                      is_global: bool,
+                      job: Optional[Any],
+                      timer: metrics.StageTimer) -> Dict[Any, str]:
+    """
+    Compute the training key of every group (see trainingKey) and mark the
+    groups whose stored model and results already carry it as 'skipped'.
+
+    Parameters:
+    - group_rows: Name and rows of every group of the level.
+    - sales_df: Sales data.
+    - calender_df: Calendar data.
+    - epochs: Number of epochs per model.
+    - key_model_type: Model type the keys are computed for.
+    - is_global: Whether a single global model covers every group, whose
+    key is then the level's key.
+    - job: Optional trainingJobs.TrainingJob receiving the skipped groups.
+    - timer: Receives the time spent in the 'training_keys' stage.
+
+    Returns:
+    Dict[Any, str]: The key of every group that needs training.
+    """
+    start_time = time.perf_counter()
+    # Only the per-group Keras models export weights for the numpy runtime
+    inference_weights = configLoader.load_config().get(
+        'inference_weights', 'float16') if key_model_type == 'keras' \
+        else None
+    with timer.time('training_keys'):
+        calendar_digest = trainingKey.get_calendar_digest(calender_df)
+        group_keys = {
+            group_name: trainingKey.get_training_key(
+                sales_df.iloc[rows], calendar_digest, N_TRAINING, N_FORECAST,
+                epochs, key_model_type, inference_weights)
+            for group_name, rows in group_rows}
+    if is_global:
+        level_key = trainingKey.get_level_key(list(group_keys.values()))
+        group_keys = {group_name: level_key for group_name in group_keys}
+    training_keys = {}
+    for group_name, training_key in group_keys.items():
+        if is_trained(str(group_name), training_key, key_model_type):
+            update_groups(job, [group_name], 'skipped')
+        else:
+            training_keys[group_name] = training_key
+    print(f"{len(training_keys)} of {len(group_rows)} groups need " +
+          "training (keys computed in " +
+          f"{time.perf_counter() - start_time:.2f}s)")
+    return training_keys
+
+
+def report_resumed(training_keys: Dict[Any, str], is_global: bool) -> None:
+    """
+    Print the Keras models that will resume from a checkpoint of their
+    current training key (see get_checkpointing).
+
+    Parameters:
+    - training_keys: Key of every group that needs training.
+    - is_global: Whether a single global model covers every group.
+    """
+    if is_global:
+        candidates = {GLOBAL_CHECKPOINT: next(iter(training_keys.values()))}
+    else:
+        candidates = {str(group_name): training_key for
+                      group_name, training_key in training_keys.items()}
+    resumed = [
+        name for name, training_key in candidates.items()
+        if (checkpointStore.load_checkpoint_state(name) or {}).get(
+            'training_key') == training_key]
+    if resumed:
+        print(f"{len(resumed)} model(s) resume from a checkpoint: " +
+              ", ".join(resumed))
+
+
+def plan_training(group_rows: List[Tuple[Any, np.ndarray]],
+                  n_days: int,
+                  is_global: bool,
+                  config_dict: Dict[str, Any]) -> Tuple[
+                      Dict[str, Any], Optional[memoryBudget.MemoryAdmission],
+                      Dict[Any, float], List[Tuple[Any, np.ndarray]]]:
+    """
+    Plan the Keras training: the workers and their threads (see
+    cpuBudget.plan_workers) and, for per-group models, the memory
+    admission (see plan_memory) and the groups that can never fit the
+    memory budget, with the 'oversized_groups' policy applied to them.
+
+    Parameters:
+    - group_rows: Name and rows of every group to train, largest first.
+    - n_days: Number of sales days.
+    - is_global: Whether a single global model is trained.
+    - config_dict: The configuration.
+
+    Returns:
+    Tuple[Dict[str, Any], Optional[memoryBudget.MemoryAdmission],
+    Dict[Any, float], List[Tuple[Any, np.ndarray]]]: The worker plan, the
+    admission control (None for the global model), the estimate in MB of
+    every group and the oversized groups.
+    """
+    plan = cpuBudget.plan_workers(
+        len(group_rows),
+        # The global model is a single task
+        workers=1 if is_global else config_dict.get('workers', 'auto'),
+        threads_per_worker=config_dict.get('threads_per_worker', 'auto'))
+    print(f"Worker plan: {plan['workers']} worker(s) x " +
+          f"{plan['threads_per_worker']} thread(s) for a budget of " +
+          f"{plan['cpu_budget']} CPU(s) ({plan['budget_source']})")
+    if is_global:
+        return plan, None, {}, []
+    admission, estimates = plan_memory(group_rows, n_days, plan)
+    oversized = [(group_name, rows) for group_name, rows in group_rows
+                 if not admission.fits_alone(estimates[group_name])]
+    plan['oversized_groups'] = len(oversized)
+    plan['oversized_policy'] = get_oversized_policy()
+    return plan, admission, estimates, oversized
+
+
+def run_oversized_groups(oversized: List[Tuple[Any, np.ndarray]],
+                         n_groups: int,
+                         plan: Dict[str, Any],
+                         admission: memoryBudget.MemoryAdmission,
+                         estimates: Dict[Any, float],
+                         sales_df: DataFrame,
+                         calender_df: DataFrame,
+                         training_keys: Dict[Any, str],
+                         job: Optional[Any]) -> None:
+    """
+    Apply the 'oversized_groups' policy of the plan to the groups that can
+    never fit the memory budget: fit them with a vectorized engine
+    ('degraded') or reject them ('failed'); with 'train' they stay queued.
+    A warning is printed when no group fits at all.
+
+    Parameters:
+    - oversized: Name and rows of the oversized groups.
+    - n_groups: Number of groups to train.
+    - plan: Worker plan returned by plan_training.
+    - admission: The memory admission control.
+    - estimates: Estimate in MB of every group.
+    - sales_df: Sales data.
+    - calender_df: Calendar data.
+    - training_keys: Key of every group that needs training.
+    - job: Optional trainingJobs.TrainingJob receiving the groups' states.
+    """
+    policy = plan['oversized_policy']
+    if len(oversized) == n_groups:
+        outcome = {'reject': "every group is rejected",
+                   'train': "every group trains alone"}.get(
+            policy, f"every group is fitted with {policy}")
+        print(f"Warning: none of the {n_groups} groups fits the memory " +
+              f"budget of {admission.budget_mb:.0f} MB " +
+              f"({admission.reserved_mb:.0f} MB reserved, " +
+              f"{admission.worker_base_mb:.0f} MB per worker), so " +
+              f"{outcome}; raise the container's memory limit or " +
+              "memory_budget_mb")
+    print(f"{len(oversized)} group(s) can never fit the memory budget " +
+          f"({policy}): " +
+          ", ".join(f"{group_name} ({estimates[group_name]:.0f} MB)"
+                    for group_name, _ in oversized))
+    if policy == 'reject':
+        for group_name, _ in oversized:
+            update_groups(
+                job, [group_name], 'failed',
+                f"Estimated {estimates[group_name]:.0f} MB plus a " +
+                f"{admission.worker_base_mb:.0f} MB worker does not fit " +
+                "the memory budget")
+    elif policy != 'train':
+        run_statistical_models(oversized, sales_df, calender_df, policy,
+                               training_keys, job, state='degraded')
+
+
+def update_groups(job: Optional[Any], group_names: List[Any], state: str,
+                  error: Optional[str] = None) -> None:
+    """
+    Set the state of groups of a training job, if any.
+
+    Parameters:
+    - job: Optional trainingJobs.TrainingJob.
+    - group_names: Names of the groups.
+    - state: Their new state.
+    - error: Error message of failed groups.
+    """
+    if job is not None:
+        for group_name in group_names:
+            job.update_group(group_name, state, error)
+
+
+def get_live_workers_mb() -> List[float]:
+    """
+    Return the private RSS of the pool's workers, the only children of
+    this process.
+
+    Returns:
+    List[float]: Private RSS in MB of every live worker.
+    """
+    return [get_private_rss_mb(process.pid)
+            for process in multiprocessing.active_children()]
+
+
+def run_worker_pool(group_rows: List[Tuple[Any, np.ndarray]],
+                    initargs: Tuple[Dict[str, Any], Dict[str, Any],
+                                    np.ndarray],
+                    plan: Dict[str, Any],
+                    admission: Optional[memoryBudget.MemoryAdmission],
+                    estimates: Dict[Any, float],
+                    epochs: int,
+                    training_keys: Dict[Any, str],
+                    key_model_type: str,
+                    is_global: bool,
+                    job: Optional[Any]) -> None:
+    """
+    Train the groups in a pool of spawned workers attached to the shared
+    data, and wait for them. Per-group models are queued largest first, the
+    order of the shared sales rows, and submitted as the memory admission
+    allows (see submit_admitted); the global model is a single task.
+
+    The loop wakes up every POLL_INTERVAL seconds to admit queued groups,
+    to report running groups and to honour cancellation while waiting for
+    the next group to finish.
+
+    Parameters:
+    - group_rows: Name and rows of every group to train, in the order of
+    the shared sales rows.
+    - initargs: Handles of the shared sales and calendar frames and the
+    exogenous features of every day, see init_worker.
+    - plan: Worker plan returned by plan_training.
+    - admission: The memory admission control, None for the global model.
+    - estimates: Estimate in MB of every group.
+    - epochs: Number of epochs per model.
+    - training_keys: Key of every group to train.
+    - key_model_type: Model type the stages are recorded for.
+    - is_global: Whether a single global model is trained.
+    - job: Optional trainingJobs.TrainingJob receiving the groups' states.
+    """
+    # Workers are spawned, not forked: forking a process in which
+    # TensorFlow is already running (after a forecast request, or in the
+    # benchmarks) can deadlock the child on locks held by TensorFlow's
+    # threads
+    with ProcessPoolExecutor(
+            max_workers=plan['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=initargs + (plan['threads_per_worker'],)) as executor:
+        # The groups each future trains
+        futures: Dict[Future, List[Any]] = {}
+        # Groups waiting for memory: name and row range in the shared sales
+        # frame
+        queued: List[Tuple[Any, int, int]] = []
+        if is_global:
+            # One task trains every group; all share the level's key
+            group_sizes = [(group_name, len(rows))
+                           for group_name, rows in group_rows]
+            future = executor.submit(run_shared_global_model, group_sizes,
+                                     epochs, training_keys[group_rows[0][0]])
+            futures[future] = [group_name for group_name, _ in group_rows]
+        else:
+            start = 0
+            for group_name, rows in group_rows:
+                queued.append((group_name, start, start + len(rows)))
+                start += len(rows)
+
+        pending = set(futures)
+        while pending or queued:
+            if job is not None and job.is_cancelled():
+                update_groups(job, [name for name, _, _ in queued],
+                              'cancelled')
+                queued.clear()
+            if queued:
+                submitted = submit_admitted(executor, queued, admission,
+                                            estimates, epochs, training_keys)
+                futures.update(submitted)
+                pending.update(submitted)
+            if not pending:
+                continue
+            done, pending = wait(pending, timeout=POLL_INTERVAL,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                collect_group(future, futures[future], admission,
+                              key_model_type, is_global, job)
+            if job is not None and job.is_cancelled():
+                # Only futures still waiting in the queue can be cancelled,
+                # the loop keeps collecting the others
+                for future in pending:
+                    future.cancel()
+            for future in pending:
+                if future.running():
+                    update_groups(job, futures[future], 'running')
+
+
+def submit_admitted(executor: ProcessPoolExecutor,
+                    queued: List[Tuple[Any, int, int]],
+                    admission: memoryBudget.MemoryAdmission,
+                    estimates: Dict[Any, float],
+                    epochs: int,
+                    training_keys: Dict[Any, str]) -> Dict[Future, List[Any]]:
+    """
+    Submit the queued groups the memory admission accepts, in queue order,
+    and remove them from the queue. A group that does not fit yet lets the
+    smaller groups behind it through.
+
+    Parameters:
+    - executor: The worker pool.
+    - queued: Name and row range in the shared sales frame of every queued
+    group, updated in place.
+    - admission: The memory admission control.
+    - estimates: Estimate in MB of every group.
+    - epochs: Number of epochs per model.
+    - training_keys: Key of every group to train.
+
+    Returns:
+    Dict[Future, List[Any]]: The submitted futures and their group.
+    """
+    futures = {}
+    live_workers_mb = get_live_workers_mb()
+    for entry in list(queued):
+        group_name, start, stop = entry
+        if admission.is_full():
+            break
+        if not admission.try_admit(group_name, estimates[group_name],
+                                   live_workers_mb):
+            continue
+        # Only the group's row range is sent to the worker
+        future = executor.submit(run_shared_model, group_name, start, stop,
+                                 epochs, training_keys[group_name])
+        futures[future] = [group_name]
+        queued.remove(entry)
+    return futures
+
+
+def collect_group(future: Future,
+                  group_names: List[Any],
+                  admission: Optional[memoryBudget.MemoryAdmission],
+                  key_model_type: str,
+                  is_global: bool,
+                  job: Optional[Any]) -> None:
+    """
+    Record a finished task: release its memory admission, record the
+    stages it returned and set its groups 'completed', 'failed' or
+    'cancelled'.
+
+    Parameters:
+    - future: The finished future.
+    - group_names: The groups it trained, every group for the global model.
+    - admission: The memory admission control, None for the global model.
+    - key_model_type: Model type the stages are recorded for.
+    - is_global: Whether it trained the global model.
+    - job: Optional trainingJobs.TrainingJob receiving the groups' states.
+    """
+    if admission is not None:
+        admission.release(group_names[0])
+    if future.cancelled():
+        update_groups(job, group_names, 'cancelled')
+        return
+    try:
+        stages = future.result()
+        # The global model's stages belong to the whole run
+        record_stages(stages, key_model_type, job,
+                      None if is_global else group_names[0])
+        update_groups(job, group_names, 'completed')
+    except Exception as exc:
+        print(f'Generated an exception: {exc}')
+        update_groups(job, group_names, 'failed', str(exc))
+
+
+def save_predictions(group_name: Any,
+                     group_df: DataFrame,
+                     predictions: np.ndarray,
+                     valid_exogenous: np.ndarray,
+                     training_key: str) -> None:
+    """
+    Save the validation predictions of a group that has no model of its own
+    (vectorized engines, global model) in the layout of the per-group Keras
+    models. A stale per-group model is removed so that the forecast API
+    does not serve it.
+
+    Parameters:
+    - group_name: The name of the group.
+    - group_df: Sales rows of the group.
+    - predictions: Predictions of shape (N_FORECAST, n_series).
+    - valid_exogenous: Exogenous features of the validation days.
+    - training_key: Content address of the inputs.
+    """
+    fixed_cols = [col for col in calendarFeatures.ID_COLUMNS
+                  if col in group_df.columns]
+    valid_df_cols = [col for col in group_df.columns
+                     if col.startswith('d_')][-N_FORECAST:]
+    valid_df_og = group_df[fixed_cols + valid_df_cols]
+    pred_df = statisticalModels.get_pred_df(
+        predictions, valid_exogenous, valid_df_og, valid_df_cols, fixed_cols)
+    modelStore.remove_model(group_name)
+    resultsStore.save_results(group_name, valid_df_og, pred_df, training_key)
+
+
+def run_global_model(group_sizes: List[Tuple[Any, int]],
+                     sales_df: DataFrame,
+                     calendar_df: DataFrame,
+                     epochs: int,
+                     training_key: str,
+                     exogenous_by_day: Optional[np.ndarray] = None
+                     ) -> Dict[str, float]:
+    """
+    Train one Keras model over every series of the given groups and save
+    each group's validation predictions in the existing results layout.
+
+    Parameters:
+    - group_sizes: Name and number of rows of every group, in row order.
+    - sales_df: Sales rows of every group, group after group.
+    - calendar_df: DataFrame containing calendar data.
+    - epochs: Number of epochs to train the model.
+    - training_key: Content address of the level's inputs.
+    - exogenous_by_day: Precomputed exogenous features of every day,
+    computed from calendar_df when not given.
+
+    Returns:
+    Dict[str, float]: Seconds spent in the 'process', 'fit',
+    'evaluate_model' and 'write_results' stages.
+    """
+    from src.domain import globalModel
+
+    print(f"Running the global model on {len(group_sizes)} groups")
+    timer = metrics.StageTimer()
+    with timer.time('process'):
+        if exogenous_by_day is None:
+            exogenous_by_day = calendarFeatures.get_exogenous_by_day(
+                calendar_df)
+        day_positions = np.flatnonzero(
+            sales_df.columns.str.startswith('d_'))
+        day_cols = list(sales_df.columns[day_positions])
+        exogenous = calendarFeatures.take_exogenous(exogenous_by_day,
+                                                    day_cols)
+        sales = sales_df.iloc[:, day_positions].to_numpy(dtype=np.float32).T
+        sizes = [size for _, size in group_sizes]
+        series_groups = np.repeat(np.arange(len(sizes)), sizes)
+
+    initial_model, initial_epoch, callbacks = get_checkpointing(
+        GLOBAL_CHECKPOINT, training_key)
+    _, predictions = globalModel.train_global_model(
+        sales, exogenous, series_groups, n_training=N_TRAINING,
+        n_forecast=N_FORECAST, epochs=epochs, initial_model=initial_model,
+        initial_epoch=initial_epoch, callbacks=callbacks,
+        timings=timer.seconds)
+
+    with timer.time('write_results'):
+        start = 0
+        for group_name, size in group_sizes:
+            save_predictions(group_name, sales_df.iloc[start:start + size],
+                             predictions[:, start:start + size],
+                             exogenous[-N_FORECAST:], training_key)
+            start += size
+    checkpointStore.remove_checkpoint(GLOBAL_CHECKPOINT)
+    print(f"Results for {len(group_sizes)} groups saved to " +
+          f"{resultsStore.RESULTS_DIR} ({timer.summary()})")
+    return timer.seconds
+
+
+def run_statistical_models(group_rows: List[Tuple[Any, np.ndarray]],
+                           sales_df: DataFrame,
+                           calendar_df: DataFrame,
+                           model_type: str,
+                           training_keys: Dict[Any, str],
+                           job: Optional[Any] = None,
+                           state: str = 'completed') -> None:
+    """
+    Fit a vectorized engine (see statisticalModels) on the given groups and
+    save their results in the same layout as the Keras models.
+
+    Series of consecutive groups are stacked into one (days x series) matrix
+    of up to STATISTICAL_BATCH_SERIES series and fitted together, so a whole
+    level costs a few matrix operations rather than one model per group.
+    No model is persisted: a stale Keras model of a refitted group is
+    removed so that the forecast API does not serve it.
+
+    Parameters:
+    - group_rows: (group name, sales rows) of the groups to fit.
+    - sales_df: DataFrame containing sales data of every group.
+    - calendar_df: DataFrame containing calendar data.
+    - model_type: One of the vectorized engines.
+    - training_keys: Content address of each group's inputs.
+    - job: Optional trainingJobs.TrainingJob receiving the state of each
+    group.
+    - state: State of the fitted groups, 'degraded' when the engine
+    replaces Keras models that do not fit the memory budget.
+    """
+    exogenous_by_day = calendarFeatures.get_exogenous_by_day(calendar_df)
+    day_positions = np.flatnonzero(sales_df.columns.str.startswith('d_'))
+    day_cols = list(sales_df.columns[day_positions])
+    exogenous = calendarFeatures.take_exogenous(exogenous_by_day, day_cols)
+
+    batches: List[List[Tuple[Any, np.ndarray]]] = [[]]
+    n_series = 0
+    for group_name, rows in group_rows:
+        if batches[-1] and n_series + len(rows) > STATISTICAL_BATCH_SERIES:
+            batches.append([])
+            n_series = 0
+        batches[-1].append((group_name, rows))
+        n_series += len(rows)
+
+    start_time = time.perf_counter()
+    # Batches span several groups, so fitting is timed for the run and only
+    # the writes of each group for the group
+    timer = metrics.StageTimer()
+    for batch in batches:
+        if job is not None and job.is_cancelled():
+            for group_name, _ in batch:
+                job.update_group(group_name, 'cancelled')
+            continue
+        if job is not None:
+            for group_name, _ in batch:
+                job.update_group(group_name, 'running')
+        rows = np.concatenate([rows for _, rows in batch])
+        with timer.time('fit'):
+            sales = sales_df.iloc[rows, day_positions].to_numpy(
+                dtype=np.float64).T
+            predictions = statisticalModels.predict_validation(
+                model_type, sales, exogenous, N_FORECAST)
+
+        start = 0
+        for group_name, rows in batch:
+            stop = start + len(rows)
+            group_timer = metrics.StageTimer()
             try:
-                future.result()
+                with group_timer.time('write_results'):
+                    save_predictions(group_name, sales_df.iloc[rows],
+                                     predictions[:, start:stop],
+                                     exogenous[-N_FORECAST:],
+                                     training_keys[group_name])
+                record_stages(group_timer.seconds, model_type, job,
+                              group_name)
+                if job is not None:
+                    job.update_group(group_name, state)
             except Exception as exc:
                 print(f'Generated an exception: {exc}')
+                if job is not None:
+                    job.update_group(group_name, 'failed', str(exc))
+            start = stop
+    timer.add('train', time.perf_counter() - start_time)
+    record_stages(timer.seconds, model_type, job)
+    print(f"Fitted {len(group_rows)} groups with {model_type} in " +
+          f"{time.perf_counter() - start_time:.2f}s")
+    report_peak_rss('training')
+
+
+def get_checkpointing(checkpoint_name: str,
+                      training_key: Optional[str]) -> Tuple[
+                          Optional[Any], int, List[Any]]:
+    """
+    Prepare the checkpointing of a model about to be trained: the
+    partially trained model to resume, if its checkpoint carries the
+    current training key, and the callback writing new checkpoints every
+    'checkpoint_every_epochs' epochs and 'checkpoint_min_seconds' seconds
+    (config.yaml). Runs in the training workers.
+
+    Parameters:
+    - checkpoint_name: Name of the checkpoint, the group name.
+    - training_key: Content address of the inputs.
+
+    Returns:
+    Tuple[Optional[Any], int, List[Any]]: The model to resume (None to
+    start from scratch), its completed epochs and the callbacks to train
+    with.
+    """
+    from src.domain import trainAndEvaluate
+
+    config_dict = configLoader.load_config()
+    every_epochs = config_dict.get('checkpoint_every_epochs', 1)
+    if not every_epochs:
+        checkpointStore.remove_checkpoint(checkpoint_name)
+        return None, 0, []
+
+    checkpoint = checkpointStore.load_checkpoint(checkpoint_name,
+                                                 training_key)
+    model, initial_epoch = None, 0
+    if checkpoint is not None:
+        model, initial_epoch = checkpoint['model'], checkpoint['epoch']
+        print(f"Resuming {checkpoint_name} from epoch {initial_epoch}")
+
+    def save(model: Any, epoch: int) -> None:
+        checkpointStore.save_checkpoint(checkpoint_name, model, epoch,
+                                        training_key)
+
+    callback = trainAndEvaluate.PeriodicCheckpoint(
+        save, every_epochs=every_epochs,
+        min_seconds=config_dict.get('checkpoint_min_seconds', 60))
+    return model, initial_epoch, [callback]
 
 
 def run_model(group_name: str,
               sales_df: DataFrame,
               calendar_df: DataFrame,
-              epochs: int) -> None:
+              epochs: int,
+              training_key: Optional[str] = None,
+              exogenous_by_day: Optional[np.ndarray] = None
+              ) -> Dict[str, float]:
     """
     Process data, train and evaluate model, and save results.
 
@@ -76,23 +1217,35 @@ def run_model(group_name: str,
     - sales_df: DataFrame containing sales data.
     - calendar_df: DataFrame containing calendar data.
     - epochs: Number of epochs to train the model.
+    - training_key: Content address of the inputs, stored with the model
+    and the results.
+    - exogenous_by_day: Precomputed exogenous features of every day (see
+    calendarFeatures.get_exogenous_by_day), computed from calendar_df when
+    not given.
+
+    Returns:
+    Dict[str, float]: Seconds spent in the 'process', 'fit',
+    'evaluate_model', 'write_model' and 'write_results' stages.
     """
+    from src.domain import preProcessing, trainAndEvaluate
+
     print(f"Running {group_name}")
-    try:
-        sales_df.drop(columns=['for_all'], inplace=True)
-    except Exception as e:
-        print(e)
-        pass
-    (X_train, y_train, X_valid, y_valid,
-     n_products_stores, scaler, valid_df_cols,
-     fixed_cols, train_df_og,
-     valid_df_og,
-     train_df,
-     valid_df) = preProcessing.process(sales_df,
-                                       calendar_df,
-                                       n_training=28,
-                                       n_forecast=28)
+    timer = metrics.StageTimer()
+    sales_df = sales_df.drop(columns=['for_all'], errors='ignore')
+    with timer.time('process'):
+        (X_train, y_train, X_valid, y_valid,
+         n_products_stores, scaler, valid_df_cols,
+         fixed_cols, train_df_og,
+         valid_df_og,
+         train_df,
+         valid_df) = preProcessing.process(sales_df,
+                                           calendar_df,
+                                           n_training=N_TRAINING,
+                                           n_forecast=N_FORECAST,
+                                           exogenous_by_day=exogenous_by_day)
 
+    initial_model, initial_epoch, callbacks = get_checkpointing(
+        str(group_name), training_key)
     model, baseline_model_pred_df = trainAndEvaluate.train_and_evaluate(
         n_outputs=n_products_stores,
         X_train=X_train,
@@ -101,75 +1254,521 @@ def run_model(group_name: str,
         y_valid=y_valid,
         epochs=epochs,
         batch_size=10,
-        n_training=28,
+        n_training=N_TRAINING,
         train_df_og=valid_df_og,
         scaler=scaler,
         valid_df_cols=valid_df_cols,
-        fixed_cols=fixed_cols)
+        fixed_cols=fixed_cols,
+        initial_model=initial_model,
+        initial_epoch=initial_epoch,
+        callbacks=callbacks,
+        timings=timer.seconds)
 
-    # Construct a unique filename for each process's output
-    filename = f"./results/{group_name}_results.json"
-    print(type(train_df_og))
-    print(type(valid_df_og))
-    print(type(baseline_model_pred_df))
+    # Persist the model so forecasts can be served after training
+    with timer.time('write_model'):
+        future_days, future_exogenous = preProcessing.get_future_exogenous(
+            calendar_df, valid_df_cols[-1], n_days=2*N_FORECAST,
+            exogenous_by_day=exogenous_by_day)
+        modelStore.save_model(
+            group_name, model, scaler,
+            last_window=np.concatenate((train_df, valid_df),
+                                       axis=0)[-N_TRAINING:],
+            future_days=future_days,
+            future_exogenous=future_exogenous,
+            series_df=valid_df_og[fixed_cols],
+            training_key=training_key,
+            quantization=configLoader.load_config().get('inference_weights',
+                                                        'float16'))
 
-    data = {
-        "valid_df": valid_df_og.to_dict(),
-        'pred_df': baseline_model_pred_df.to_json(),
-    }
-    # Ensure the results directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    # Write results to a JSON file
-    with open(filename, 'w') as f:
-        json.dump(data, f)
-    print(f"Results for {group_name} saved to {filename}")
+    # Store validation actuals and predictions as typed arrays
+    with timer.time('write_results'):
+        resultsStore.save_results(group_name, valid_df_og,
+                                  baseline_model_pred_df, training_key)
+    # The group is trained, a crash from here on does not need a resume
+    checkpointStore.remove_checkpoint(str(group_name))
+    print(f"Results for {group_name} saved to {resultsStore.RESULTS_DIR} " +
+          f"({timer.summary()})")
+    return timer.seconds
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide cache of rendered results responses, creating
+    it from config.yaml (response_cache_size, response_cache_mb) on first
+    use.
+
+    Returns:
+        ResponseCache: The response cache.
+    """
+    global response_cache
+    if response_cache is None:
+        config_dict = configLoader.load_config()
+        response_cache = ResponseCache(
+            max_entries=config_dict.get('response_cache_size', 64),
+            max_bytes=config_dict.get('response_cache_mb', 64) * 1024 * 1024)
+    return response_cache
 
 
-@router.get("/api/modelNames")
-def fetch_model_names() -> List[str]:
+def cached_json_response(request: Request, key: Any, paths: List[str],
+                         render: Callable[[], Any]) -> Response:
     """
-    Fetch and return the names of all model groups from the results directory.
+    Serve a JSON response from the response cache, answering 304 Not
+    Modified when the client's If-None-Match matches the current ETag.
+
+    Parameters:
+    - request: The incoming request.
+    - key: Cache key of the response.
+    - paths: Files the response is built from; their mtime/size validate
+    the cached copy and derive the ETag.
+    - render: Builds the response content when it is not cached.
+
+    Returns:
+    Response: The JSON response, or an empty 304 response.
+    """
+    body, etag = get_response_cache().get(
+        key, paths, lambda: json.dumps(render()).encode())
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json",
+                    headers=headers)
+
+
+def check_group_key(key: str) -> None:
+    """
+    Reject a group name from a request that could point outside the
+    results directory, before any store builds a path from it.
+
+    Parameters:
+    - key: Name of Group
+
+    Raises:
+    HTTPException: 404 if the name is not a valid group name.
+    """
+    if not resultsStore.is_valid_group_name(key):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+
+@router.get("/api/modelNames", response_model=List[str])
+def fetch_model_names(request: Request) -> Response:
+    """
+    Fetch and return the names of the model groups of the trained level
+    from the results store.
 
     Returns:
     List[str]: A list containing model group names.
     """
-    # Directory where results JSON files are stored
-    results_dir = './results'
-    # List all files in the results directory
-    files = os.listdir(results_dir)
-    # Filter files to get only those ending with '_results.json'
-    results_files = [file for file in files if file.endswith('_results.json')]
-    group_names = [re.sub(r'_results\.json$', '', file)
-                   for file in results_files]
+    # The directory mtime changes whenever a group's index is written
+    return cached_json_response(request, 'modelNames',
+                                [resultsStore.RESULTS_DIR],
+                                resultsStore.list_groups)
 
-    return group_names
+
+def select_model_columns(all_columns: List[str],
+                         columns: Optional[List[str]],
+                         first_day: Optional[int],
+                         last_day: Optional[int]) -> List[str]:
+    """
+    Resolve the columns of a model data request: the requested fixed
+    columns (all of them by default) and the day columns d_first_day to
+    d_last_day (inclusive, open-ended when omitted).
+
+    Parameters:
+    - all_columns: Columns of the stored results.
+    - columns: Fixed (non-day) columns to return.
+    - first_day: First day number to return.
+    - last_day: Last day number to return.
+
+    Returns:
+    List[str]: The selected columns, in stored order.
+    """
+    day_cols = [col for col in all_columns if col.startswith('d_')]
+    fixed_cols = [col for col in all_columns if col not in day_cols]
+    if columns is not None:
+        unknown = sorted(set(columns) - set(fixed_cols))
+        if unknown:
+            raise HTTPException(status_code=422,
+                                detail=f"Unknown columns {unknown}")
+        fixed_cols = [col for col in fixed_cols if col in columns]
+    first_day = -np.inf if first_day is None else first_day
+    last_day = np.inf if last_day is None else last_day
+    day_cols = [col for col in day_cols
+                if first_day <= int(col.split('_')[1]) <= last_day]
+    return fixed_cols + day_cols
+
+
+def iter_model_data(key: str,
+                    filters: Optional[Dict[str, Any]],
+                    columns: List[str]) -> Iterator[bytes]:
+    """
+    Serialise model data a few columns at a time, read chunk by chunk from
+    the stored arrays, producing the same JSON as the rendered response,
+    so that large payloads are never held whole in memory.
+
+    Parameters:
+    - key: Name of Group
+    - filters: Required value of some columns, or None for every row.
+    - columns: Columns to return.
+
+    Returns:
+    Iterator[bytes]: Consecutive chunks of the JSON document.
+    """
+    yield b'{"valid_df": {'
+    separator = ''
+    for df in resultsStore.iter_frame(key, 'valid_df', filters, columns):
+        yield (separator + json.dumps(df.to_dict())[1:-1]).encode()
+        separator = ', '
+    # pred_df is a JSON string inside the document: each piece of it is
+    # escaped on its own, without the surrounding quotes
+    yield b'}, "pred_df": "'
+    separator = '{'
+    for df in resultsStore.iter_frame(key, 'pred_df', filters, columns):
+        yield json.dumps(separator + df.to_json()[1:-1])[1:-1].encode()
+        separator = ','
+    yield json.dumps('}' if separator == ',' else '{}')[1:-1].encode()
+    yield b'"}'
 
 
 @router.post("/api/modelData")
-def fetch_model_store(key) -> Dict[Any, Any]:
+def fetch_model_store(key: str, request: Request,
+                      item_id: Optional[str] = None,
+                      store_id: Optional[str] = None,
+                      first_day: Optional[int] = None,
+                      last_day: Optional[int] = None,
+                      columns: Optional[List[str]] = Query(None)
+                      ) -> Response:
+    """
+    Fetch and return model results for a specific key, optionally only the
+    series of one item or store, a range of days and some of the fixed
+    columns. Only the matching rows and columns are read from the stored
+    arrays. Payloads whose matching rows times columns exceed
+    model_data_stream_cells (config.yaml) are streamed a few columns at a
+    time; smaller ones are rendered once and cached.
+
+    Parameters:
+    - key: Name of Group
+    - item_id: Only the series of this item.
+    - store_id: Only the series of this store.
+    - first_day: First validation day number to return, e.g. 1886.
+    - last_day: Last validation day number to return.
+    - columns: Fixed columns to return (repeat the parameter), all by
+    default; the selected day columns are always returned.
+
+    Returns:
+    Dict[str, Any]: A dictionary with the validation actuals ('valid_df', as
+    a dict of columns) and predictions ('pred_df', as a JSON string).
+    """
+    check_group_key(key)
+    paths = list(resultsStore.get_paths(key))
+    index = resultsStore.load_index(key)
+    if index is None or not all(os.path.exists(path) for path in paths):
+        # If the group has no results, return a 404 error
+        raise HTTPException(status_code=404, detail="Model data not found")
+
+    frames = index['frames']
+    all_columns = list(dict.fromkeys(
+        frames['valid_df']['columns'] + frames['pred_df']['columns']))
+    selected = select_model_columns(all_columns, columns, first_day,
+                                    last_day)
+    filters = {col: value for col, value in
+               (('item_id', item_id), ('store_id', store_id))
+               if value is not None}
+    missing = sorted(set(filters) - set(all_columns))
+    if missing:
+        raise HTTPException(status_code=422,
+                            detail=f"Results of {key} have no {missing}")
+
+    def render() -> Dict[str, Any]:
+        valid_df, pred_df = resultsStore.select_results(
+            key, filters or None, selected)
+        return {
+            "valid_df": valid_df.to_dict(),
+            "pred_df": pred_df.to_json(),
+        }
+
+    # Upper bound of the payload; the filtered rows are only counted when
+    # the whole group would be streamed
+    n_cells = len(selected) * (frames['valid_df']['n_rows'] +
+                               frames['pred_df']['n_rows'])
+    stream_cells = configLoader.load_config().get(
+        'model_data_stream_cells', 200_000)
+    if n_cells > stream_cells and filters:
+        n_cells = len(selected) * sum(resultsStore.count_rows(key, filters))
+    if n_cells <= stream_cells:
+        cache_key = ('modelData', key, item_id, store_id, first_day,
+                     last_day, tuple(columns) if columns else None)
+        return cached_json_response(request, cache_key, paths, render)
+
+    etag = get_etag(get_signature(paths))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(
+        iter_model_data(key, filters or None, selected),
+        media_type="application/json", headers=headers)
+
+
+def get_model_cache() -> modelStore.ModelCache:
+    """
+    Returns the process-wide model cache, creating it from config.yaml
+    (model_cache_size, model_cache_mb) on first use.
+
+    Returns:
+        modelStore.ModelCache: The model cache.
+    """
+    global model_cache
+    if model_cache is None:
+        config_dict = configLoader.load_config()
+        model_cache = modelStore.ModelCache(
+            max_models=config_dict.get('model_cache_size', 8),
+            max_bytes=config_dict.get('model_cache_mb', 256) * 1024 * 1024)
+    return model_cache
+
+
+@router.post("/api/forecast")
+def fetch_forecast(key: str, n_forecast: int = 28) -> Dict[str, Any]:
+    """
+    Forecast the next n_forecast days of every series of a group, starting
+    from the latest window the group's model was trained on.
+
+    Parameters:
+    - key: Name of Group
+    - n_forecast: Number of days to forecast, at most max_forecast_days
+    (config.yaml)
+
+    Returns:
+    Dict[str, Any]: A dictionary with the forecast DataFrame, one row per
+    series and one column per future day.
+    """
+    start = time.perf_counter()
+    # Each day is one model call in this process, the horizon is capped
+    max_days = configLoader.load_config().get('max_forecast_days',
+                                              N_FORECAST)
+    if not 1 <= n_forecast <= max_days:
+        raise HTTPException(
+            status_code=422,
+            detail=f"n_forecast must be between 1 and {max_days}")
+
+    check_group_key(key)
+    artifacts = get_model_cache().get(key)
+    if artifacts is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+
+    predictions = inference.forecast(
+        artifacts['model'],
+        artifacts['scaler'],
+        artifacts['last_window'],
+        artifacts['future_exogenous'],
+        n_forecast)
+
+    meta = artifacts['meta']
+    series = DataFrame(meta['series'])
+    last_day = int(meta['future_days'][0].split('_')[1]) - 1
+    day_cols = [f"d_{last_day + i}" for i in range(1, n_forecast + 1)]
+    forecast_df = DataFrame(predictions[:, :len(series)].T, columns=day_cols)
+    forecast_df = series.join(forecast_df)
+
+    forecast_latency.record(time.perf_counter() - start)
+    return {"forecast_df": forecast_df.to_dict()}
+
+
+@router.get("/api/hierarchy")
+def fetch_hierarchy() -> List[Dict[str, Any]]:
+    """
+    Return the number of groups and of bottom-level series of every model
+    level.
+
+    Returns:
+    List[Dict[str, Any]]: One entry per level.
+    """
+    return get_served_hierarchy().summary()
+
+
+@router.get("/api/aggregates")
+def fetch_aggregates(level: int,
+                     key: Optional[str] = None,
+                     n_days: int = 28) -> Dict[str, Any]:
+    """
+    Return the aggregated daily sales of the groups of a model level,
+    computed for the requested days (and group) only from the cached
+    hierarchy.
+
+    Parameters:
+    - level: Model level (1 to 12).
+    - key: Name of one group of the level, e.g. "('FOODS',)"; all groups
+    when omitted.
+    - n_days: Number of most recent days to return.
+
+    Returns:
+    Dict[str, Any]: The level, the day columns and the series of each
+    group by name.
+    """
+    hierarchy = get_served_hierarchy()
+    if level not in hierarchy.get_level_ids():
+        raise HTTPException(status_code=422,
+                            detail=f"Unknown model level {level}")
+    if n_days < 1:
+        raise HTTPException(status_code=422,
+                            detail="n_days must be at least 1")
+    names = [str(name) for name in hierarchy.group_names[level]]
+    group = None
+    if key is not None:
+        if key not in names:
+            raise HTTPException(status_code=404, detail="Group not found")
+        group = names.index(key)
+        names = [key]
+    values = hierarchy.aggregate(level, n_days, group)
+    return {
+        "level": level,
+        "days": hierarchy.day_cols[-n_days:],
+        "series": {name: row.tolist() for name, row in zip(names, values)},
+    }
+
+
+def get_day_dates(day_cols: List[str]) -> List[str]:
+    """
+    Return the calendar date of day columns (d_1 -> 2011-01-29), from a
+    mapping kept until the calendar file changes.
+
+    Parameters:
+    - day_cols: Day columns.
+
+    Returns:
+    List[str]: The dates, None for days missing from the calendar.
+    """
+    global day_dates_cache
+    stat = os.stat(CALENDAR_PATH)
+    version = (stat.st_mtime_ns, stat.st_size)
+    if day_dates_cache is None or day_dates_cache[0] != version:
+        calendar_df = load_csv_data(CALENDAR_PATH)
+        day_dates_cache = (version, dict(zip(
+            calendar_df['d'].astype(str), calendar_df['date'].astype(str))))
+    dates = day_dates_cache[1]
+    return [dates.get(col) for col in day_cols]
+
+
+def get_points(day_cols: List[str], values: np.ndarray,
+               points: Optional[int], method: str) -> Dict[str, Any]:
+    """
+    Downsample one series and return its days, dates and values.
+
+    Parameters:
+    - day_cols: Day column of every value.
+    - values: The values.
+    - points: Number of points to keep, all when None.
+    - method: Downsampling method, see domain/downsampling.py.
+
+    Returns:
+    Dict[str, Any]: Kept days, dates and values (None for missing values).
+    """
+    kept = downsampling.downsample(values, points, method)
+    days = [day_cols[i] for i in kept]
+    kept_values = values[kept].astype(np.float64)
+    return {
+        "days": days,
+        "dates": get_day_dates(days),
+        "values": [None if np.isnan(value) else value
+                   for value in kept_values.tolist()],
+    }
+
+
+@router.get("/api/seriesIndex", response_model=Dict[str, List[str]])
+def fetch_series_index(key: str, request: Request) -> Response:
     """
-    Fetch and return model results for a specific key.
+    Return the series of a group, the stores of every item, read from the
+    series index of the results store without loading any day column.
 
     Parameters:
     - key: Name of Group
 
     Returns:
-    Dict[str, Any]: A dictionary containing model group names.
+    Dict[str, List[str]]: The stores of every item, empty if the group has
+    no item_id or store_id column.
     """
-    # Directory where results JSON files are stored
-    results_dir = './results/'
+    check_group_key(key)
+    _, index_path = resultsStore.get_paths(key)
+    if not os.path.exists(index_path):
+        raise HTTPException(status_code=404, detail="Model data not found")
+    # The index is rewritten whenever the group's results are saved
+    return cached_json_response(request, ('seriesIndex', key), [index_path],
+                                lambda: resultsStore.list_series(key))
+
 
-    # Construct the filename based on the key
-    filename = f"{key}_results.json"
-    file_path = os.path.join(results_dir, filename)
+@router.get("/api/seriesData")
+def fetch_series(key: str, item_id: str, store_id: str,
+                 n_days: Optional[int] = None,
+                 points: Optional[int] = None,
+                 method: str = 'lttb') -> Dict[str, Any]:
+    """
+    Return the actual sales history and the validation predictions of one
+    series (item and store) of a group, optionally downsampled on the
+    server so that long histories stay light to ship and to plot.
 
-    # Check if the file exists
-    if not os.path.exists(file_path):
-        # If the file doesn't exist, return a 404 error
-        raise Exception("Model data not found")
+    The series is found through the series index of the results store and
+    its history through the cached hierarchy of the sales data, so only
+    that series is read.
 
-    # Read and return the JSON data
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    Parameters:
+    - key: Name of Group
+    - item_id: The item.
+    - store_id: The store.
+    - n_days: Most recent days of history to return, all (up to 1913)
+    when omitted.
+    - points: Number of points to keep per line, every point when omitted.
+    - method: 'lttb' (Largest Triangle Three Buckets) or 'minmax'.
 
-    return data
+    Returns:
+    Dict[str, Any]: The series, its 'actual' and 'prediction' lines (days,
+    dates and values) and the number of days before downsampling.
+    """
+    if method not in downsampling.DOWNSAMPLING_METHODS:
+        raise HTTPException(
+            status_code=422,
+            detail="method must be one of " +
+            f"{list(downsampling.DOWNSAMPLING_METHODS)}")
+    if n_days is not None and n_days < 1:
+        raise HTTPException(status_code=422,
+                            detail="n_days must be at least 1")
+    if points is not None and points < 3:
+        raise HTTPException(status_code=422,
+                            detail="points must be at least 3")
+
+    check_group_key(key)
+    results = resultsStore.load_series(key, item_id, store_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Model data not found")
+    _, pred_df = results
+    hierarchy = get_served_hierarchy()
+    row = hierarchy.get_series_row(item_id, store_id)
+    if row is None or len(pred_df) == 0:
+        raise HTTPException(status_code=404, detail="Series not found")
+
+    day_cols = hierarchy.day_cols[-n_days:] if n_days else hierarchy.day_cols
+    # One row first, so that only that series' days are copied
+    actual = hierarchy.sales_df.iloc[[row]][day_cols].to_numpy(
+        dtype=np.float64)[0]
+    pred_cols = [col for col in pred_df.columns if col.startswith('d_')]
+    prediction = pred_df[pred_cols].iloc[0].to_numpy(dtype=np.float64)
+    return {
+        "key": key,
+        "item_id": item_id,
+        "store_id": store_id,
+        "n_days": len(day_cols),
+        "actual": get_points(day_cols, actual, points, method),
+        "prediction": get_points(pred_cols, prediction, points, method),
+    }
+
+
+@router.get("/api/forecastStats")
+def fetch_forecast_stats() -> Dict[str, Any]:
+    """
+    Return the forecast latency percentiles and the model cache statistics.
+
+    Returns:
+    Dict[str, Any]: p50/p99 latency over the recent requests and cache
+    hits/misses/occupancy.
+    """
+    return {
+        "latency": forecast_latency.summary(),
+        "cache": get_model_cache().stats(),
+    }
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence
+from pandas import DataFrame
+
+# Exogenous calendar features appended after the sales series, in order
+EXOGENOUS_COLUMNS = ['snap_CA', 'snap_TX', 'snap_WI',
+                     'event_1_flag', 'event_2_flag']
+
+
+# Identifier columns of the sales data, every other column is a day
+ID_COLUMNS = ['id', 'item_id', 'dept_id', 'cat_id', 'store_id', 'state_id']
+
+
+def get_exogenous_by_day(calendar_df: DataFrame) -> np.ndarray:
+    """
+    Computes the exogenous features of every calendar day once, as an array
+    indexed by day number so that any group can take its rows by position.
+
+    Args:
+        calendar_df (DataFrame): The calendar DataFrame.
+
+    Returns:
+        np.ndarray: Array of shape (last day, len(EXOGENOUS_COLUMNS)) whose
+        row i holds the features of day d_<i+1>; days missing from the
+        calendar are NaN.
+    """
+    day_numbers = calendar_df['d'].astype(str).str.slice(2).astype(int)
+    positions = day_numbers.to_numpy() - 1
+    exogenous = np.full((positions.max() + 1, len(EXOGENOUS_COLUMNS)),
+                        np.nan)
+    exogenous[positions, :3] = calendar_df[
+        ['snap_CA', 'snap_TX', 'snap_WI']].to_numpy(dtype=float)
+    exogenous[positions, 3] = calendar_df['event_name_1'].notna()
+    exogenous[positions, 4] = calendar_df['event_name_2'].notna()
+    return exogenous
+
+
+def take_exogenous(exogenous_by_day: np.ndarray,
+                   day_cols: Sequence[str]) -> np.ndarray:
+    """
+    Selects the exogenous features of the given days by position.
+
+    Args:
+        exogenous_by_day (np.ndarray): Array from get_exogenous_by_day.
+        day_cols (Sequence[str]): Day names, e.g. ['d_1', 'd_2', ...].
+
+    Returns:
+        np.ndarray: Array of shape (len(day_cols), len(EXOGENOUS_COLUMNS));
+        days missing from the calendar are NaN.
+    """
+    positions = pd.Index(day_cols).str.slice(2).astype(np.intp).to_numpy() - 1
+    known = (positions >= 0) & (positions < len(exogenous_by_day))
+    exogenous = np.full((len(day_cols), exogenous_by_day.shape[1]), np.nan)
+    exogenous[known] = exogenous_by_day[positions[known]]
+    return exogenous
@@ -42,11 +42,15 @@ def load_config() -> Dict:
     return config_dict
 
 
-def load_config_model() -> ModelLevel:
+def load_config_model(level_id: Optional[int] = None) -> ModelLevel:
     """
     Loads the model level configuration from the YAML file and returns the
     corresponding ModelLevel object.
 
+    Args:
+        level_id (Optional[int]): Model level to use instead of the
+        'model_level' value of config.yaml. Defaults to None.
+
     Returns:
         ModelLevel: The ModelLevel object corresponding to the configured
         model level.
@@ -55,12 +59,15 @@ def load_config_model() -> ModelLevel:
         Exception: If the model_level is not found in config.yaml or if it's 
         not within the expected range.
     """
-    config_dict = load_config()
-    # Check if 'model_level' parameter is present in the config
-    if 'model_level' not in config_dict:
-        raise Exception("model_level not found in config.yaml")
-    # Get the value of 'model_level' from the config
-    model_level = config_dict['model_level']
+    if level_id is None:
+        config_dict = load_config()
+        # Check if 'model_level' parameter is present in the config
+        if 'model_level' not in config_dict:
+            raise Exception("model_level not found in config.yaml")
+        # Get the value of 'model_level' from the config
+        model_level = config_dict['model_level']
+    else:
+        model_level = level_id
 
     if not 0 < model_level <= len(model_levels):
         raise Exception(
@@ -0,0 +1,102 @@
+from typing import Callable, Dict, Optional
+import numpy as np
+from numpy import ndarray
+
+
+def lttb_indices(values: ndarray, n_points: int) -> ndarray:
+    """
+    Selects the points of a daily series to keep with Largest Triangle Three
+    Buckets: the first and last points are kept and every bucket in between
+    keeps the point forming the largest triangle with the point kept in the
+    previous bucket and the mean of the next bucket, which preserves the
+    visual shape of the series.
+
+    Args:
+        values (ndarray): The series, one value per day.
+        n_points (int): Number of points to keep, at least 3.
+
+    Returns:
+        ndarray: Increasing positions of the kept points.
+    """
+    n_values = len(values)
+    if n_points >= n_values or n_points < 3:
+        return np.arange(n_values)
+    values = np.nan_to_num(values.astype(np.float64))
+    # Buckets of the points between the first and the last one
+    edges = np.linspace(1, n_values - 1, n_points - 1).astype(np.intp)
+    means_x = np.array([(start + end - 1) / 2 for start, end in
+                        zip(edges[:-1], edges[1:])] + [n_values - 1])
+    means_y = np.array([values[start:end].mean() for start, end in
+                        zip(edges[:-1], edges[1:])] + [values[-1]])
+    kept = np.empty(n_points, dtype=np.intp)
+    kept[0], kept[-1] = 0, n_values - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+        positions = np.arange(start, end)
+        # Twice the triangle areas, the constant factor does not matter
+        areas = np.abs(
+            (previous - means_x[bucket + 1]) *
+            (values[positions] - values[previous]) -
+            (previous - positions) *
+            (means_y[bucket + 1] - values[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def min_max_indices(values: ndarray, n_points: int) -> ndarray:
+    """
+    Selects the points of a daily series to keep by splitting it into
+    n_points / 2 buckets and keeping the minimum and the maximum of each,
+    so that no peak is lost.
+
+    Args:
+        values (ndarray): The series, one value per day.
+        n_points (int): Number of points to keep, at least 2.
+
+    Returns:
+        ndarray: Increasing positions of the kept points.
+    """
+    n_values = len(values)
+    if n_points >= n_values or n_points < 2:
+        return np.arange(n_values)
+    values = np.nan_to_num(values.astype(np.float64))
+    edges = np.linspace(0, n_values, n_points // 2 + 1).astype(np.intp)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = values[start:end]
+        kept += [start + int(np.argmin(bucket)),
+                 start + int(np.argmax(bucket))]
+    return np.unique(kept)
+
+
+# Downsampling methods accepted by downsample
+DOWNSAMPLING_METHODS: Dict[str, Callable[[ndarray, int], ndarray]] = {
+    'lttb': lttb_indices,
+    'minmax': min_max_indices,
+}
+
+
+def downsample(values: ndarray, n_points: Optional[int],
+               method: str = 'lttb') -> ndarray:
+    """
+    Selects at most n_points points of a series with the given method.
+
+    Args:
+        values (ndarray): The series, one value per day.
+        n_points (Optional[int]): Number of points to keep; None keeps
+        every point.
+        method (str): 'lttb' or 'minmax'. Defaults to 'lttb'.
+
+    Raises:
+        ValueError: If the method is unknown.
+
+    Returns:
+        ndarray: Increasing positions of the kept points.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method {method}, expected " +
+                         f"one of {list(DOWNSAMPLING_METHODS)}")
+    if n_points is None:
+        return np.arange(len(values))
+    return DOWNSAMPLING_METHODS[method](values, n_points)
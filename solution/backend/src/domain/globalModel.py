@@ -0,0 +1,235 @@
+from keras.models import Model
+from keras.layers import (Input, Conv1D, MaxPooling1D, LSTM, Dense,
+                          Embedding, Flatten, Concatenate)
+from keras.metrics import RootMeanSquaredError
+from keras.optimizers import Adam
+from keras.callbacks import Callback, TensorBoard
+from keras.utils import Sequence
+import math
+import time
+import numpy as np
+from numpy import ndarray
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Tuple
+
+# Size of the learned vector identifying each series and each group
+SERIES_EMBEDDING_DIM = 8
+GROUP_EMBEDDING_DIM = 4
+# Most recent training days windows are drawn from
+GLOBAL_TRAIN_DAYS = 364
+# Windows drawn per epoch, at most; every series still contributes
+GLOBAL_MAX_WINDOWS = 200_000
+GLOBAL_BATCH_SIZE = 256
+
+
+def scale_series(sales: ndarray, n_train: int) -> Tuple[ndarray, ndarray]:
+    """
+    Scales every series by its largest training value, so that all series
+    share the [0, 1] range of the per-group MinMaxScaler (sales are never
+    negative).
+
+    Args:
+        sales (ndarray): Unit sales of shape (n_days, n_series).
+        n_train (int): Number of training days (the first days).
+
+    Returns:
+        Tuple[ndarray, ndarray]: Scaled float32 sales and the scale of
+        each series.
+    """
+    scale = sales[:n_train].max(axis=0).astype(np.float32)
+    scale[scale == 0] = 1
+    return (sales / scale).astype(np.float32), scale
+
+
+class GlobalWindows(Sequence):
+    """
+    Feeds (window, series id, group id) inputs and next-day targets drawn
+    from every series of a level to Keras, one batch at a time.
+
+    A window is the n_training previous days of one series together with
+    the exogenous features of those days; it is identified by its series
+    and its first day, and only the windows of the current batch are
+    copied out of the sliding-window views.
+    """
+
+    def __init__(self, sales: ndarray, exogenous: ndarray,
+                 series_groups: ndarray, starts: ndarray, n_training: int,
+                 batch_size: int, max_windows: int = 0):
+        """
+        Args:
+            sales (ndarray): Scaled sales of shape (n_days, n_series).
+            exogenous (ndarray): Exogenous features of shape
+            (n_days, n_exogenous).
+            series_groups (ndarray): Group index of every series.
+            starts (ndarray): First days of the windows to use, the target
+            being the day after each window.
+            n_training (int): Number of days per window.
+            batch_size (int): Number of windows per batch.
+            max_windows (int): Windows drawn at random every epoch; 0 uses
+            every window, in order. Defaults to 0.
+        """
+        super().__init__()
+        self.sales = sales
+        self.series_windows = sliding_window_view(sales, n_training, axis=0)
+        self.exogenous_windows = sliding_window_view(
+            exogenous, n_training, axis=0)
+        self.series_groups = series_groups
+        self.n_training = n_training
+        self.batch_size = batch_size
+        series, starts = np.meshgrid(np.arange(sales.shape[1]), starts,
+                                     indexing='ij')
+        self.all_series = series.ravel()
+        self.all_starts = starts.ravel()
+        self.max_windows = max_windows
+        self.on_epoch_end()
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.series) / self.batch_size)
+
+    def __getitem__(self, index: int) -> Tuple[Tuple[ndarray, ...], ndarray]:
+        batch = slice(index * self.batch_size, (index + 1) * self.batch_size)
+        series, starts = self.series[batch], self.starts[batch]
+        # (batch, n_training, 1 + n_exogenous)
+        windows = np.concatenate(
+            (self.series_windows[starts, series][..., np.newaxis],
+             self.exogenous_windows[starts].transpose(0, 2, 1)), axis=-1)
+        targets = self.sales[starts + self.n_training, series]
+        return ((windows, series[:, np.newaxis],
+                 self.series_groups[series][:, np.newaxis]),
+                targets[:, np.newaxis])
+
+    def on_epoch_end(self) -> None:
+        if 0 < self.max_windows < len(self.all_series):
+            chosen = np.random.choice(len(self.all_series), self.max_windows,
+                                      replace=False)
+            self.series = self.all_series[chosen]
+            self.starts = self.all_starts[chosen]
+        else:
+            self.series = self.all_series
+            self.starts = self.all_starts
+
+
+def build_global_model(n_series: int,
+                       n_groups: int,
+                       n_training: int,
+                       n_exogenous: int) -> Model:
+    """
+    Builds and compiles one CNN+LSTM model shared by every series of a
+    level. Each input is a single series' window with the calendar features
+    of its days; learned series and group embeddings let the shared network
+    tell the series apart.
+
+    Parameters:
+    - n_series (int): Number of series of the level.
+    - n_groups (int): Number of groups of the level.
+    - n_training (int): Number of days per input window.
+    - n_exogenous (int): Number of exogenous features per day.
+
+    Returns:
+    - Model: Compiled Keras model predicting the next scaled day.
+    """
+    window = Input(shape=(n_training, 1 + n_exogenous), name='window')
+    series = Input(shape=(1,), dtype='int32', name='series')
+    group = Input(shape=(1,), dtype='int32', name='group')
+
+    x = Conv1D(name='conv1', kernel_size=7, padding='causal',
+               activation='relu', filters=64)(window)
+    x = MaxPooling1D(name='pool1')(x)
+    x = Conv1D(name='conv2', kernel_size=7, padding='causal',
+               activation='relu', filters=32)(x)
+    x = MaxPooling1D(name='pool2')(x)
+    x = LSTM(name='lstm1', units=64)(x)
+
+    series_embedding = Flatten()(Embedding(
+        n_series, SERIES_EMBEDDING_DIM, name='series_embedding')(series))
+    group_embedding = Flatten()(Embedding(
+        n_groups, GROUP_EMBEDDING_DIM, name='group_embedding')(group))
+    x = Concatenate()([x, series_embedding, group_embedding])
+    x = Dense(name='dense1', units=32, activation='relu')(x)
+    output = Dense(name='dense', units=1)(x)
+
+    model = Model(inputs=[window, series, group], outputs=output)
+    model.compile(loss='mse',
+                  optimizer=Adam(clipvalue=0.5, learning_rate=0.001),
+                  metrics=[RootMeanSquaredError()])
+    return model
+
+
+def train_global_model(sales: ndarray,
+                       exogenous: ndarray,
+                       series_groups: ndarray,
+                       n_training: int,
+                       n_forecast: int,
+                       epochs: int,
+                       batch_size: int = GLOBAL_BATCH_SIZE,
+                       log_directory: str = "../results/global/tb_logs",
+                       initial_model: Optional[Model] = None,
+                       initial_epoch: int = 0,
+                       callbacks: Optional[List[Callback]] = None,
+                       timings: Optional[Dict[str, float]] = None
+                       ) -> Tuple[Model, ndarray]:
+    """
+    Trains one global model on windows of every series and predicts the
+    validation days one step ahead from the actual previous days, as
+    trainAndEvaluate.evaluate_model does for the per-group models.
+
+    Parameters:
+    - sales (ndarray): Unit sales of shape (n_days, n_series), the last
+    n_forecast days being the validation period.
+    - exogenous (ndarray): Exogenous features of shape (n_days,
+    n_exogenous); missing values are treated as 0.
+    - series_groups (ndarray): Group index (0..n_groups-1) of every series.
+    - n_training (int): Number of days per input window.
+    - n_forecast (int): Number of validation days.
+    - epochs (int): Number of epochs for training.
+    - batch_size (int): Batch size for training.
+    - log_directory (str): Directory for TensorBoard log files.
+    - initial_model (Optional[Model]): Partially trained model (with its
+    optimizer state) to resume instead of building a new one.
+    - initial_epoch (int): Epochs initial_model was already trained for.
+    - callbacks (Optional[List[Callback]]): Extra callbacks, e.g. a
+    trainAndEvaluate.PeriodicCheckpoint.
+    - timings (Optional[Dict[str, float]]): Receives the seconds spent in
+    'fit' and in 'evaluate_model' (the validation predictions).
+
+    Returns:
+    - Tuple[Model, ndarray]: Trained model and unscaled validation
+    predictions of shape (n_forecast, n_series).
+    """
+    n_days, n_series = sales.shape
+    n_train = n_days - n_forecast
+    scaled, scale = scale_series(sales, n_train)
+    exogenous = np.nan_to_num(exogenous).astype(np.float32)
+
+    if initial_model is None:
+        model = build_global_model(n_series, int(series_groups.max()) + 1,
+                                   n_training, exogenous.shape[1])
+        initial_epoch = 0
+    else:
+        model = initial_model
+    model.summary()
+
+    first_start = max(0, n_train - GLOBAL_TRAIN_DAYS - n_training)
+    train_windows = GlobalWindows(
+        scaled, exogenous, series_groups,
+        np.arange(first_start, n_train - n_training), n_training,
+        batch_size, max_windows=GLOBAL_MAX_WINDOWS)
+    valid_starts = np.arange(n_train - n_training, n_days - n_training)
+    valid_windows = GlobalWindows(scaled, exogenous, series_groups,
+                                  valid_starts, n_training, 4 * batch_size)
+    start = time.perf_counter()
+    model.fit(train_windows, epochs=epochs, initial_epoch=initial_epoch,
+              validation_data=valid_windows,
+              callbacks=[TensorBoard(log_dir=log_directory)] +
+              (callbacks or []))
+    fit_seconds = time.perf_counter() - start
+
+    # Windows are ordered series first, so predictions reshape to
+    # (n_series, n_forecast)
+    start = time.perf_counter()
+    predictions = model.predict(valid_windows, verbose=0)
+    predictions = predictions.reshape(n_series, len(valid_starts)).T
+    if timings is not None:
+        timings['fit'] = fit_seconds
+        timings['evaluate_model'] = time.perf_counter() - start
+    return model, np.clip(predictions, 0, None) * scale
@@ -0,0 +1,249 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numpy import ndarray
+from pandas import DataFrame
+from src.domain.models.definitions import model_levels
+from src.domain.models.pydantic.modelLevel import ModelLevel
+
+# Pseudo column of level 1, whose single group holds every series
+FOR_ALL_COLUMN = 'for_all'
+FOR_ALL_VALUE = 'all'
+# Day columns multiplied by the summing matrix at once: the sales are
+# converted to int32 one chunk at a time, never as a whole
+AGGREGATE_CHUNK_DAYS = 256
+
+
+def get_level_columns(model_level: ModelLevel) -> List[str]:
+    """
+    Returns the columns whose combinations define the groups of a level.
+
+    Args:
+        model_level (ModelLevel): The model level definition.
+
+    Returns:
+        List[str]: The grouping columns.
+    """
+    if isinstance(model_level.Columns, list):
+        return model_level.Columns
+    return [model_level.Columns]
+
+
+def get_column_codes(sales_df: DataFrame,
+                     column: str) -> Tuple[ndarray, ndarray]:
+    """
+    Encodes a grouping column as integer codes, ordered like the groups of
+    DataFrame.groupby (category order for categoricals, sorted values
+    otherwise).
+
+    Args:
+        sales_df (DataFrame): The sales DataFrame.
+        column (str): The grouping column, or FOR_ALL_COLUMN.
+
+    Returns:
+        Tuple[ndarray, ndarray]: Code of every row (-1 for missing values)
+        and the value of every code.
+    """
+    if column == FOR_ALL_COLUMN and column not in sales_df.columns:
+        return (np.zeros(len(sales_df), dtype=np.intp),
+                np.array([FOR_ALL_VALUE], dtype=object))
+    values = sales_df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return (values.cat.codes.to_numpy(dtype=np.intp),
+                values.cat.categories.to_numpy(dtype=object))
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.intp), np.asarray(uniques, dtype=object)
+
+
+def get_level_groups(sales_df: DataFrame,
+                     model_level: ModelLevel) -> Tuple[List[tuple], ndarray]:
+    """
+    Assigns every series (row) to its group of a level without a groupby.
+
+    Args:
+        sales_df (DataFrame): The sales DataFrame.
+        model_level (ModelLevel): The model level definition.
+
+    Returns:
+        Tuple[List[tuple], ndarray]: Names of the non-empty groups (tuples,
+        as when iterating over a groupby) in groupby order, and the group
+        position of every row (-1 for rows with a missing id).
+    """
+    columns = get_level_columns(model_level)
+    codes, uniques = zip(*[get_column_codes(sales_df, column)
+                           for column in columns])
+    missing = np.any([column_codes < 0 for column_codes in codes], axis=0)
+    combined = np.ravel_multi_index(
+        [np.where(missing, 0, column_codes) for column_codes in codes],
+        [len(values) for values in uniques])
+    group_codes, positions = np.unique(combined[~missing],
+                                       return_inverse=True)
+    names = list(zip(*[values[column_codes] for values, column_codes in zip(
+        uniques, np.unravel_index(group_codes,
+                                  [len(values) for values in uniques]))]))
+    row_groups = np.full(len(sales_df), -1, dtype=np.intp)
+    row_groups[~missing] = positions.ravel()
+    return names, row_groups
+
+
+class Hierarchy:
+    """
+    The M5 aggregation hierarchy of a sales DataFrame: one row of a sparse
+    summing matrix per group of every model level, so that the aggregated
+    series of any level are a sparse product with the bottom-level sales
+    matrix.
+
+    The summing matrix is built from the group membership alone; the
+    aggregated series are computed on request, for the days and groups
+    asked for only, in chunks of days (see aggregate).
+    """
+
+    def __init__(self, sales_df: DataFrame,
+                 levels: Optional[List[ModelLevel]] = None):
+        """
+        Args:
+            sales_df (DataFrame): The sales DataFrame, one row per bottom
+            level series.
+            levels (Optional[List[ModelLevel]]): Levels to include.
+            Defaults to the 12 levels of domain/models/definitions.py.
+        """
+        # scipy is imported here rather than with the module, which the
+        # API imports at start-up
+        from scipy import sparse
+
+        if levels is None:
+            levels = model_levels
+        self.sales_df = sales_df
+        self.day_cols = [col for col in sales_df.columns
+                         if col.startswith('d_')]
+        self.group_names: Dict[int, List[tuple]] = {}
+        self.level_slices: Dict[int, slice] = {}
+        self.series_rows_: Optional[Dict[Tuple[str, str], int]] = None
+
+        rows, cols = [], []
+        n_aggregates = 0
+        for model_level in levels:
+            names, row_groups = get_level_groups(sales_df, model_level)
+            series = np.flatnonzero(row_groups >= 0)
+            rows.append(n_aggregates + row_groups[series])
+            cols.append(series)
+            self.group_names[model_level.LevelId] = names
+            self.level_slices[model_level.LevelId] = slice(
+                n_aggregates, n_aggregates + len(names))
+            n_aggregates += len(names)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        self.summing_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(n_aggregates, len(sales_df)))
+
+    def get_level_ids(self) -> List[int]:
+        """
+        Returns:
+            List[int]: Ids of the levels of the hierarchy.
+        """
+        return list(self.level_slices)
+
+    def get_group_rows(self, level_id: int) -> List[Tuple[Any, ndarray]]:
+        """
+        Returns the row positions of every group of a level, read from the
+        summing matrix; a drop-in for transform.get_group_rows.
+
+        Args:
+            level_id (int): The model level.
+
+        Returns:
+            List[Tuple[Any, ndarray]]: Group names (tuples) and their row
+            positions, in groupby order.
+        """
+        matrix = self.summing_matrix
+        level_slice = self.level_slices[level_id]
+        return [(name, matrix.indices[matrix.indptr[row]:
+                                      matrix.indptr[row + 1]])
+                for name, row in zip(self.group_names[level_id],
+                                     range(level_slice.start,
+                                           level_slice.stop))]
+
+    def aggregate(self, level_id: int, n_days: Optional[int] = None,
+                  group: Optional[int] = None) -> ndarray:
+        """
+        Aggregates the daily sales of the groups of a level by multiplying
+        the level's rows of the summing matrix with the sales,
+        AGGREGATE_CHUNK_DAYS day columns at a time. Only the requested days
+        are read, and for a single group only its own series.
+
+        Args:
+            level_id (int): The model level.
+            n_days (Optional[int]): Number of most recent days, all days
+            when omitted.
+            group (Optional[int]): Position of one group in the level's
+            group names, every group when omitted.
+
+        Returns:
+            ndarray: int32 array of shape (n_groups, n_days); the int16
+            daily sales of every series sum without overflow.
+        """
+        level_slice = self.level_slices[level_id]
+        if group is not None:
+            level_slice = slice(level_slice.start + group,
+                                level_slice.start + group + 1)
+        matrix = self.summing_matrix[level_slice]
+        sales_df = self.sales_df
+        series = np.unique(matrix.indices)
+        if len(series) < matrix.shape[1]:
+            matrix = matrix[:, series]
+            sales_df = sales_df.iloc[series]
+        day_cols = self.day_cols[-n_days:] if n_days else self.day_cols
+        aggregates = np.empty((matrix.shape[0], len(day_cols)),
+                              dtype=np.int32)
+        for start in range(0, len(day_cols), AGGREGATE_CHUNK_DAYS):
+            chunk = day_cols[start:start + AGGREGATE_CHUNK_DAYS]
+            aggregates[:, start:start + len(chunk)] = matrix @ \
+                sales_df[chunk].to_numpy(dtype=np.int32)
+        return aggregates
+
+    def get_level(self, level_id: int,
+                  n_days: Optional[int] = None) -> Tuple[List[tuple], ndarray]:
+        """
+        Returns the aggregated series of a level.
+
+        Args:
+            level_id (int): The model level.
+            n_days (Optional[int]): Number of most recent days, all days
+            when omitted.
+
+        Returns:
+            Tuple[List[tuple], ndarray]: Group names and their daily sales,
+            of shape (n_groups, n_days).
+        """
+        return self.group_names[level_id], self.aggregate(level_id, n_days)
+
+    def get_series_row(self, item_id: str, store_id: str) -> Optional[int]:
+        """
+        Returns the row of a bottom-level series, looked up in an index of
+        every (item_id, store_id) pair built on first use.
+
+        Args:
+            item_id (str): The item.
+            store_id (str): The store.
+
+        Returns:
+            Optional[int]: Row position in sales_df, None if there is no
+            such series.
+        """
+        if self.series_rows_ is None:
+            self.series_rows_ = {
+                (str(item), str(store)): row for row, (item, store) in
+                enumerate(zip(self.sales_df['item_id'],
+                              self.sales_df['store_id']))}
+        return self.series_rows_.get((item_id, store_id))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: Number of groups and of bottom-level
+            series per level.
+        """
+        return [{"level": level_id,
+                 "groups": len(self.group_names[level_id]),
+                 "series": int(self.summing_matrix[level_slice].nnz)}
+                for level_id, level_slice in self.level_slices.items()]
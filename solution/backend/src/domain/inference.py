@@ -0,0 +1,362 @@
+import json
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+from numpy import ndarray
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Storage precision of the exported weight matrices (kernels); biases and
+# normalisation statistics always stay float32
+QUANTIZATIONS = ['float32', 'float16', 'int8']
+# Layers the numpy runtime can run, by Keras class name
+SUPPORTED_LAYERS = ['Conv1D', 'MaxPooling1D', 'LSTM', 'BatchNormalization',
+                    'Dense']
+# Weight arrays quantized with the chosen precision
+QUANTIZED_WEIGHTS = {'kernel', 'recurrent_kernel'}
+# Name of each weight array of a layer, in Keras get_weights order
+WEIGHT_NAMES = {
+    'Conv1D': ['kernel', 'bias'],
+    'MaxPooling1D': [],
+    'LSTM': ['kernel', 'recurrent_kernel', 'bias'],
+    'BatchNormalization': ['gamma', 'beta', 'moving_mean', 'moving_variance'],
+    'Dense': ['kernel', 'bias'],
+}
+
+
+def sigmoid(x: ndarray) -> ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+ACTIVATIONS: Dict[str, Callable[[ndarray], ndarray]] = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': sigmoid,
+}
+
+
+def get_layer_spec(layer: Any) -> Dict[str, Any]:
+    """
+    Describes a Keras layer with the settings the numpy runtime needs.
+
+    Args:
+        layer (Any): A Keras layer.
+
+    Raises:
+        ValueError: If the layer or one of its settings is not supported.
+
+    Returns:
+        Dict[str, Any]: The layer class name and settings.
+    """
+    kind = layer.__class__.__name__
+    config = layer.get_config()
+    if kind not in SUPPORTED_LAYERS:
+        raise ValueError(f"Layer {layer.name} ({kind}) is not supported")
+    spec: Dict[str, Any] = {"kind": kind, "name": layer.name}
+    if kind == 'Conv1D':
+        if tuple(config['strides']) != (1,) or \
+                tuple(config['dilation_rate']) != (1,) or \
+                config['padding'] != 'causal':
+            raise ValueError(f"Layer {layer.name}: only causal, stride 1, " +
+                             "undilated convolutions are supported")
+        spec['activation'] = config['activation']
+    elif kind == 'MaxPooling1D':
+        if config['padding'] != 'valid':
+            raise ValueError(f"Layer {layer.name}: only valid pooling is " +
+                             "supported")
+        pool_size = config['pool_size']
+        strides = config['strides'] or pool_size
+        spec['pool_size'] = int(np.ravel(pool_size)[0])
+        spec['strides'] = int(np.ravel(strides)[0])
+    elif kind == 'LSTM':
+        spec['activation'] = config['activation']
+        spec['recurrent_activation'] = config['recurrent_activation']
+        spec['return_sequences'] = config['return_sequences']
+        if config.get('go_backwards') or not config.get('use_bias', True):
+            raise ValueError(f"Layer {layer.name}: only forward LSTMs with " +
+                             "a bias are supported")
+    elif kind == 'BatchNormalization':
+        if not (config['center'] and config['scale']):
+            raise ValueError(f"Layer {layer.name}: only centred and " +
+                             "scaled normalisation is supported")
+        spec['epsilon'] = config['epsilon']
+    elif kind == 'Dense':
+        spec['activation'] = config['activation']
+    for key in ('activation', 'recurrent_activation'):
+        if key in spec and spec[key] not in ACTIVATIONS:
+            raise ValueError(f"Layer {layer.name}: activation {spec[key]} " +
+                             "is not supported")
+    return spec
+
+
+def quantize(values: ndarray, quantization: str) -> Dict[str, ndarray]:
+    """
+    Stores a weight matrix with the given precision. int8 is symmetric
+    with one scale per output unit (last axis).
+
+    Args:
+        values (ndarray): The float32 weights.
+        quantization (str): float32, float16 or int8.
+
+    Returns:
+        Dict[str, ndarray]: The stored values, plus their scale for int8.
+    """
+    if quantization == 'float16':
+        return {"values": values.astype(np.float16)}
+    if quantization == 'int8':
+        axes = tuple(range(values.ndim - 1))
+        scale = np.abs(values).max(axis=axes) / 127
+        scale[scale == 0] = 1
+        return {"values": np.round(values / scale).astype(np.int8),
+                "scale": scale.astype(np.float32)}
+    return {"values": values.astype(np.float32)}
+
+
+def export_model(model: Any, path: str,
+                 quantization: str = 'float32') -> int:
+    """
+    Exports a trained Keras model made of SUPPORTED_LAYERS to a weights
+    file that NumpyModel runs without TensorFlow.
+
+    Args:
+        model (Any): The Keras model, e.g. from build_baseline_model.
+        path (str): Output .npz file.
+        quantization (str): Precision of the weight matrices, one of
+        QUANTIZATIONS. Defaults to float32.
+
+    Raises:
+        ValueError: If the quantization or a layer is not supported.
+
+    Returns:
+        int: Size of the stored weights in bytes.
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization {quantization}, expected " +
+                         f"one of {QUANTIZATIONS}")
+    specs = []
+    arrays: Dict[str, ndarray] = {}
+    for i, layer in enumerate(model.layers):
+        spec = get_layer_spec(layer)
+        for name, values in zip(WEIGHT_NAMES[spec['kind']],
+                                layer.get_weights()):
+            values = np.asarray(values, dtype=np.float32)
+            stored = quantize(values, quantization) \
+                if name in QUANTIZED_WEIGHTS else {"values": values}
+            for suffix, array in stored.items():
+                arrays[f"{i}/{name}/{suffix}"] = array
+        specs.append(spec)
+    arrays['layers'] = np.array(json.dumps(specs))
+    np.savez(path, **arrays)
+    return sum(array.nbytes for name, array in arrays.items()
+               if name != 'layers')
+
+
+def conv1d(x: ndarray, kernel: ndarray, bias: ndarray) -> ndarray:
+    """
+    Causal 1D convolution with stride 1, over x of shape
+    (batch, steps, channels).
+    """
+    kernel_size = kernel.shape[0]
+    padded = np.pad(x, ((0, 0), (kernel_size - 1, 0), (0, 0)))
+    # (batch, steps, channels, kernel_size)
+    windows = sliding_window_view(padded, kernel_size, axis=1)
+    return np.einsum('btck,kco->bto', windows, kernel, optimize=True) + bias
+
+
+def max_pooling1d(x: ndarray, pool_size: int, strides: int) -> ndarray:
+    """
+    Valid 1D max pooling over x of shape (batch, steps, channels).
+    """
+    windows = sliding_window_view(x, pool_size, axis=1)[:, ::strides]
+    return windows.max(axis=-1)
+
+
+def lstm(x: ndarray, kernel: ndarray, recurrent_kernel: ndarray,
+         bias: ndarray, activation: Callable[[ndarray], ndarray],
+         recurrent_activation: Callable[[ndarray], ndarray],
+         return_sequences: bool) -> ndarray:
+    """
+    LSTM over x of shape (batch, steps, features), with the Keras gate
+    order (input, forget, cell, output) and zero initial states.
+    """
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    # The input projections of every step at once
+    projected = x @ kernel + bias
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = []
+    for step in range(steps):
+        z = projected[:, step] + h @ recurrent_kernel
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        c = f * c + i * activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+        h = o * activation(c)
+        if return_sequences:
+            outputs.append(h)
+    return np.stack(outputs, axis=1) if return_sequences else h
+
+
+class NumpyModel:
+    """
+    Runs an exported model (see export_model) with numpy only: no
+    TensorFlow import, float32 arithmetic and weights dequantized once at
+    load time. Offers predict and predict_on_batch like a Keras model, so it
+    can be passed to forecast.
+    """
+
+    def __init__(self, layers: List[Dict[str, Any]]):
+        """
+        Args:
+            layers (List[Dict[str, Any]]): Layer specs with their float32
+            weights under 'weights', in order.
+        """
+        self.layers = layers
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Size of the weights held in memory.
+        """
+        return sum(values.nbytes for layer in self.layers
+                   for values in layer['weights'].values())
+
+    def predict(self, x: ndarray) -> ndarray:
+        """
+        Runs the forward pass on a batch.
+
+        Args:
+            x (ndarray): Inputs of shape (batch, n_training, n_features).
+
+        Returns:
+            ndarray: Outputs of shape (batch, n_outputs).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            weights = layer['weights']
+            kind = layer['kind']
+            if kind == 'Conv1D':
+                x = ACTIVATIONS[layer['activation']](
+                    conv1d(x, weights['kernel'], weights['bias']))
+            elif kind == 'MaxPooling1D':
+                x = max_pooling1d(x, layer['pool_size'], layer['strides'])
+            elif kind == 'LSTM':
+                x = lstm(x, weights['kernel'], weights['recurrent_kernel'],
+                         weights['bias'], ACTIVATIONS[layer['activation']],
+                         ACTIVATIONS[layer['recurrent_activation']],
+                         layer['return_sequences'])
+            elif kind == 'BatchNormalization':
+                x = (x - weights['moving_mean']) * weights['gamma'] / \
+                    np.sqrt(weights['moving_variance'] + layer['epsilon']) + \
+                    weights['beta']
+            elif kind == 'Dense':
+                x = ACTIVATIONS[layer['activation']](
+                    x @ weights['kernel'] + weights['bias'])
+        return x
+
+    predict_on_batch = predict
+
+
+def load_model(path: str) -> NumpyModel:
+    """
+    Loads a weights file written by export_model.
+
+    Args:
+        path (str): The .npz file.
+
+    Returns:
+        NumpyModel: The model, ready to predict.
+    """
+    with np.load(path) as arrays:
+        layers = json.loads(str(arrays['layers']))
+        for i, layer in enumerate(layers):
+            layer['weights'] = {}
+            for name in WEIGHT_NAMES[layer['kind']]:
+                values = arrays[f"{i}/{name}/values"].astype(np.float32)
+                if f"{i}/{name}/scale" in arrays:
+                    values *= arrays[f"{i}/{name}/scale"]
+                layer['weights'][name] = values
+    return NumpyModel(layers)
+
+
+class MinMaxScaling:
+    """
+    The inverse of a fitted MinMaxScaler from its scale_ and min_ arrays,
+    so that serving a forecast neither unpickles nor imports scikit-learn.
+    """
+
+    def __init__(self, scale: ndarray, min_: ndarray):
+        """
+        Args:
+            scale (ndarray): MinMaxScaler.scale_, one value per feature.
+            min_ (ndarray): MinMaxScaler.min_, one value per feature.
+        """
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.min_ = np.asarray(min_, dtype=np.float64)
+
+    def transform(self, x: ndarray) -> ndarray:
+        return x * self.scale_ + self.min_
+
+    def inverse_transform(self, x: ndarray) -> ndarray:
+        return (x - self.min_) / self.scale_
+
+
+def forecast(model: Any,
+             scaler: Any,
+             last_window: ndarray,
+             future_exogenous: ndarray,
+             n_forecast: int) -> ndarray:
+    """
+    Forecasts the next n_forecast days by feeding each one-day-ahead
+    prediction back into the input window.
+
+    Known future exogenous features (calendar flags) overwrite the model's
+    own predictions for those columns; NaN entries are left as predicted.
+
+    Parameters:
+    - model (Any): NumpyModel, or trained Keras model.
+    - scaler (Any): MinMaxScaler fitted on the training data, or its
+    MinMaxScaling.
+    - last_window (ndarray): Last n_training scaled days, shape
+    (n_training, n_outputs).
+    - future_exogenous (ndarray): Unscaled exogenous features of the
+    following days, shape (n_days, n_exogenous).
+    - n_forecast (int): Number of days to forecast.
+
+    Returns:
+    - ndarray: Unscaled forecasts of shape (n_forecast, n_outputs).
+    """
+    n_exogenous = future_exogenous.shape[1]
+    exogenous = future_exogenous * scaler.scale_[-n_exogenous:] + \
+        scaler.min_[-n_exogenous:]
+
+    window = np.array(last_window, dtype=np.float32)
+    predictions = np.empty((n_forecast, window.shape[1]), dtype=np.float32)
+    for step in range(n_forecast):
+        # predict_on_batch reuses Keras' compiled predict function and skips
+        # the per-call data adapter set-up of predict
+        prediction = np.array(model.predict_on_batch(window[np.newaxis]))[0]
+        if step < len(exogenous):
+            known = ~np.isnan(exogenous[step])
+            prediction[-n_exogenous:][known] = exogenous[step][known]
+        predictions[step] = prediction
+        window = np.concatenate((window[1:], prediction[np.newaxis]))
+
+    return scaler.inverse_transform(predictions)
+
+
+def compare_outputs(expected: ndarray, actual: ndarray) -> Tuple[float, float]:
+    """
+    Measures how far the numpy runtime's outputs are from Keras' outputs.
+
+    Args:
+        expected (ndarray): Keras outputs.
+        actual (ndarray): NumpyModel outputs.
+
+    Returns:
+        Tuple[float, float]: Largest absolute difference, and the same
+        relative to the largest absolute Keras output.
+    """
+    error = float(np.abs(expected - actual).max())
+    return error, error / max(float(np.abs(expected).max()), 1e-12)
@@ -55,16 +55,16 @@ table_definitions_data = [
         "Columns": [
             {"ColumnName": "date", "ColumnDescription": "The" +
              "  date in a 'y-m-d'" +
-             "  format."},
+             "  format.", "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "wm_yr_wk",
                 "ColumnDescription": "The id of the week the date" +
-             "  belongs to."},
+             "  belongs to.", "Dtype": "integer", "MaxNanRate": 0.0},
             {"ColumnName": "weekday",
                 "ColumnDescription": "The type of the day (Saturday, " +
              " Sunday, ..., Friday)."},
             {"ColumnName": "wday",
                 "ColumnDescription": "The id of the weekday, starting " +
-             " from Saturday."},
+             " from Saturday.", "Dtype": "integer", "MaxNanRate": 0.0},
             {"ColumnName": "month", "ColumnDescription": "The month of " +
              " the date."},
             {"ColumnName": "year", "ColumnDescription": "The year of the" +
@@ -81,7 +81,17 @@ table_definitions_data = [
                 "If the date includes a second event," +
              "  the name of this event."},
             {"ColumnName": "event_type_2", "ColumnDescription":
-                "If the date includes a second event, the type of this event."}
+                "If the date includes a second event, the type of this event."},
+            {"ColumnName": "d", "ColumnDescription": "The day the date" +
+             " corresponds to (d_1, d_2, ...), matching the columns of" +
+             " the sales table.", "Dtype": "text", "MaxNanRate": 0.0},
+            *[
+                {"ColumnName": f"snap_{state}", "ColumnDescription":
+                 "Whether the stores of " +
+                 f"{state} allow SNAP purchases on the date (1) or not (0).",
+                 "Dtype": "integer", "NonNegative": True, "MaxNanRate": 0.0}
+                for state in ["CA", "TX", "WI"]
+            ]
         ]
     },
     {
@@ -91,18 +101,19 @@ table_definitions_data = [
         "Columns": [
             {"ColumnName": "store_id",
                 "ColumnDescription": "The id of the store where the product " +
-             " is sold."},
+             " is sold.", "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "item_id", "ColumnDescription": "The id of the" +
-             "  product."},
+             "  product.", "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "wm_yr_wk", "ColumnDescription": "The id of the " +
-             " week."},
+             " week.", "Dtype": "integer", "MaxNanRate": 0.0},
             {"ColumnName": "sell_price", "ColumnDescription":
                 "The price of the product for the given week/store. " +
              " The price" +
              "  is provided per week (average across seven days). " +
              " If not available, " +
              " this means that the product was not " +
-             " sold during the examined week."}
+             " sold during the examined week.",
+             "Dtype": "number", "NonNegative": True, "MaxNanRate": 0.0}
         ]
     },
     {
@@ -111,29 +122,34 @@ table_definitions_data = [
         "  unit sales data per" +
         "  product and store.",
         "Columns": [
+            {"ColumnName": "id", "ColumnDescription": "The id of the " +
+             " series, the product and the store.",
+             "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "item_id", "ColumnDescription": "The " +
-             " id of the product."},
+             " id of the product.",
+             "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "dept_id",
                 "ColumnDescription": "The id of the department the " +
-             " product belongs to."},
+             " product belongs to.",
+             "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "cat_id",
                 "ColumnDescription": "The id of the category the " +
-             " product belongs to."},
+             " product belongs to.",
+             "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "store_id",
                 "ColumnDescription": "The id of the store where " +
-             " the product is sold."},
+             " the product is sold.",
+             "Dtype": "text", "MaxNanRate": 0.0},
             {"ColumnName": "state_id",
-                "ColumnDescription": "The State where the store is located."},
-            {"ColumnName": "d_1", "ColumnDescription":
-                "The number of units sold at day 1, starting from " +
-             " 2011-01-29."},
-            # Add the remaining 'd_2' to 'd_1913' columns
-            *[
-                {"ColumnName": f"d_{i}", "ColumnDescription": "The" +
-                 "  number of" +
-                 f"  units sold at day {i}, starting " +
-                 " from 2011-01-29."} for i in range(2, 1914)
-            ]
+                "ColumnDescription": "The State where the store is located.",
+             "Dtype": "text", "MaxNanRate": 0.0}
+        ],
+        # d_1 ... d_N, for any number of days (1913 in the M5 training data)
+        "ColumnFamilies": [
+            {"FamilyName": "days", "Pattern": r"d_(\d+)",
+             "ColumnDescription": "The number of units sold at day " +
+             "{number}, starting from 2011-01-29.",
+             "Dtype": "integer", "NonNegative": True, "MaxNanRate": 0.0}
         ]
     }
 ]
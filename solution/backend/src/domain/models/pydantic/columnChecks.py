@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel
+
+# Values of ColumnChecks.Dtype
+DTYPE_KINDS = ['integer', 'number', 'text']
+
+
+class ColumnChecks(BaseModel):
+    """
+    Value checks shared by single columns and column families. Unset checks
+    are skipped.
+    """
+    # One of DTYPE_KINDS: integer, number (integer or float) or text
+    # (object, string or categorical)
+    Dtype: Optional[str] = None
+    NonNegative: bool = False
+    # Largest share of missing values allowed, e.g. 0.0 for none
+    MaxNanRate: Optional[float] = None
@@ -0,0 +1,76 @@
+import re
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+from src.domain.models.pydantic.columnChecks import ColumnChecks
+
+
+class ColumnFamily(ColumnChecks):
+    """
+    A family of columns described by a name pattern instead of one
+    TableColumn per column, e.g. the daily sales d_1 ... d_N for any N.
+
+    The pattern's first group is the column's number. With Contiguous set,
+    the numbers must run from Start without gaps, in column order.
+    """
+    FamilyName: str
+    Pattern: str
+    # Formatted with the column's number, e.g. "... at day {number} ..."
+    ColumnDescription: str
+    Start: int = 1
+    MinCount: int = 1
+    Contiguous: bool = True
+
+    def match(self, columns: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the columns of the family.
+
+        Args:
+            columns (pd.Index): Columns of a DataFrame.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Positions of the matching columns
+            and their numbers.
+        """
+        numbers = pd.Series(columns.astype(str)).str.extract(
+            f"^{self.Pattern}$", expand=False)
+        positions = np.flatnonzero(numbers.notna().to_numpy())
+        return positions, numbers.iloc[positions].astype(np.int64).to_numpy()
+
+    def describe(self, column: str) -> str:
+        """
+        Returns the description of one column of the family.
+
+        Args:
+            column (str): Name of the column.
+
+        Returns:
+            str: Its description.
+        """
+        number = re.fullmatch(self.Pattern, column).group(1)
+        return self.ColumnDescription.format(number=number)
+
+    def get_continuity_errors(self, numbers: np.ndarray) -> List[str]:
+        """
+        Checks the count and, when Contiguous, the continuity of the numbers
+        of the matching columns.
+
+        Args:
+            numbers (np.ndarray): Numbers of the matching columns, in column
+            order.
+
+        Returns:
+            List[str]: Problems found, empty if none.
+        """
+        errors = []
+        if len(numbers) < self.MinCount:
+            errors.append(f"{self.FamilyName}: {len(numbers)} columns, " +
+                          f"expected at least {self.MinCount}")
+        if self.Contiguous and len(numbers) and not np.array_equal(
+                numbers, np.arange(self.Start, self.Start + len(numbers))):
+            expected = np.arange(self.Start, self.Start + len(numbers))
+            first = int(np.flatnonzero(numbers != expected)[0])
+            errors.append(f"{self.FamilyName}: not a contiguous range " +
+                          f"from {self.Start}, column {first} has number " +
+                          f"{numbers[first]} instead of {expected[first]}")
+        return errors
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from src.domain.models.pydantic.columnChecks import ColumnChecks
 
 
-class TableColumn(BaseModel):
+class TableColumn(ColumnChecks):
     ColumnName: str
     ColumnDescription: str
@@ -1,11 +1,14 @@
 from pydantic import BaseModel
 from typing import List
 from src.domain.models.pydantic.tableColumn import TableColumn
+from src.domain.models.pydantic.columnFamily import ColumnFamily
 
 
 class TableDefinition(BaseModel):
     TableName: str
     Columns: List[TableColumn]
+    # Columns described by pattern, never materialised one by one
+    ColumnFamilies: List[ColumnFamily] = []
 
     def get_all_column_names(self) -> List[str]:
         return [column.ColumnName for column in self.Columns]
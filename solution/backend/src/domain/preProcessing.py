@@ -3,9 +3,16 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.pipeline import Pipeline
 import pandas as pd
 import numpy as np
-from typing import Tuple, List
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Tuple, List, Optional
 from pandas import DataFrame
 
+# The calendar features are computed without scikit-learn in
+# calendarFeatures, so that the API process can use them; they are
+# re-exported for existing callers
+from src.domain.calendarFeatures import (  # noqa: F401
+    EXOGENOUS_COLUMNS, ID_COLUMNS, get_exogenous_by_day, take_exogenous)
+
 
 class MergeExogenousFeatures(BaseEstimator, TransformerMixin):
     """
@@ -13,20 +20,26 @@ class MergeExogenousFeatures(BaseEstimator, TransformerMixin):
     into a sales DataFrame.
     """
 
-    def __init__(self, calendar_df: DataFrame):
+    def __init__(self, calendar_df: DataFrame,
+                 exogenous_by_day: Optional[np.ndarray] = None):
         """
         Initializes the transformer with the calendar dataframe.
 
         Args:
             calendar_df (DataFrame): The calendar DataFrame containing
             exogenous features.
+            exogenous_by_day (Optional[np.ndarray]): Features of every day
+            precomputed by get_exogenous_by_day, shared by every group of a
+            run. Computed from calendar_df when not given.
         """
         self.calendar_df = calendar_df
+        self.exogenous_by_day = exogenous_by_day
 
     def fit(self, X: DataFrame, y: None = None) -> 'MergeExogenousFeatures':
         """
         Fit method for the transformer. Since this transformer does not learn
-        from the data, it just returns itself.
+        from the data, it only makes sure the exogenous features of every
+        day are available.
 
         Args:
             X (DataFrame): The input data to transform.
@@ -35,44 +48,73 @@ class MergeExogenousFeatures(BaseEstimator, TransformerMixin):
         Returns:
             MergeExogenousFeatures: The transformer itself.
         """
+        self.exogenous_by_day_ = self.exogenous_by_day \
+            if self.exogenous_by_day is not None \
+            else get_exogenous_by_day(self.calendar_df)
         return self
 
     def transform(self, X: DataFrame) -> DataFrame:
         """
-        Transforms the sales data by merging it with exogenous features
-        from the calendar data.
+        Transforms the sales data by appending the exogenous features of
+        each day, taken by position from the precomputed day array. The
+        calendar is neither modified nor joined on the day names.
 
         Args:
             X (DataFrame): The sales data DataFrame to transform.
 
         Returns:
-            DataFrame: The transformed sales DataFrame with exogenous
-            features merged.
+            DataFrame: One row per day, one column per series (named after
+            the row labels of X) followed by the EXOGENOUS_COLUMNS.
         """
-        # Ensure the calendar_df has necessary flags
-        self.calendar_df['event_1_flag'] = self.calendar_df[
-            'event_name_1'].notna(
-        ).astype(int)
-        self.calendar_df['event_2_flag'] = self.calendar_df[
-            'event_name_2'].notna(
-        ).astype(int)
-        # Transpose sales data
-        sales_t_df = X[[col for col in X.columns if col not in [
-            'id', 'item_id', 'dept_id',
-            'cat_id', 'store_id', 'state_id']]
-        ].T.reset_index().rename(columns={'index': 'd'})
-
-        # Merge exogenous features from calendar_df
-        sales_t_exo_df = pd.merge(sales_t_df, self.calendar_df[[
-                                  'd', 'snap_CA', 'snap_TX', 'snap_WI',
-                                  'event_1_flag', 'event_2_flag']], on='d',
-                                  how='left').drop(columns=['d'])
-
-        # Convert all column names to strings to satisfy MinMaxScaler
-        # requirements
-        sales_t_exo_df.columns = sales_t_exo_df.columns.astype(str)
-
-        return sales_t_exo_df
+        day_positions = np.flatnonzero(~X.columns.isin(ID_COLUMNS))
+        day_cols = X.columns[day_positions]
+        if len(day_positions) and \
+                day_positions[-1] - day_positions[0] + 1 == len(day_positions):
+            # Usual layout (ids then days): a slice keeps the sales block a
+            # view instead of gathering the columns one by one
+            sales = X.iloc[:, day_positions[0]:day_positions[-1] + 1]
+        else:
+            sales = X.iloc[:, day_positions]
+
+        # The transpose is a view: pandas stores the block column-major, so
+        # the sales values are not converted until the scaler does it
+        sales_t_df = DataFrame(
+            sales.to_numpy().T,
+            # Column names are strings to satisfy MinMaxScaler requirements
+            columns=[str(label) for label in X.index],
+            copy=False)
+        exogenous_df = DataFrame(
+            take_exogenous(self.exogenous_by_day_, day_cols),
+            columns=EXOGENOUS_COLUMNS)
+        return pd.concat([sales_t_df, exogenous_df], axis=1)
+
+
+def get_future_exogenous(calendar_df: DataFrame,
+                         last_day_col: str,
+                         n_days: int,
+                         exogenous_by_day: Optional[np.ndarray] = None
+                         ) -> Tuple[List[str], np.ndarray]:
+    """
+    Returns the exogenous features of the days following the last observed
+    sales day, used when forecasting beyond the training data.
+
+    Args:
+        calendar_df (DataFrame): The calendar DataFrame.
+        last_day_col (str): Last observed day column, e.g. 'd_1913'.
+        n_days (int): Number of future days to return.
+        exogenous_by_day (Optional[np.ndarray]): Precomputed features of
+        every day (see get_exogenous_by_day).
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Future day names and an array of shape
+        (n_days, len(EXOGENOUS_COLUMNS)); days missing from the calendar are
+        NaN.
+    """
+    if exogenous_by_day is None:
+        exogenous_by_day = get_exogenous_by_day(calendar_df)
+    last_day = int(last_day_col.split('_')[1])
+    future_days = [f"d_{last_day + i}" for i in range(1, n_days + 1)]
+    return future_days, take_exogenous(exogenous_by_day, future_days)
 
 
 def get_cols(
@@ -114,6 +156,12 @@ def get_sequences(data_array: np.ndarray,
     """
     Generates input and output sequences for training and validation.
 
+    Both outputs are read-only views on data_array, no window is copied:
+    X[k] is data_array[i:i+n_training] and y[k] is
+    data_array[i+n_training, :n_products_stores] for
+    i = input_slice_start_min + k. Consumers that need contiguous memory
+    should copy one batch at a time (see trainAndEvaluate.WindowBatches).
+
     Args:
         data_array (np.ndarray): The data array to generate sequences from.
         input_slice_start_min (int): The starting index for generating
@@ -123,17 +171,18 @@ def get_sequences(data_array: np.ndarray,
         n_products_stores (int): Number of product/store combinations.
 
     Returns:
-        Tuple[np.ndarray, np.ndarray]: Input (X) and output (y) sequences.
+        Tuple[np.ndarray, np.ndarray]: Input (X) of shape
+        (n_sequences, n_training, n_features) and output (y) of shape
+        (n_sequences, n_products_stores) sequences.
     """
+    # (n_windows, n_features, n_training) -> (n_windows, n_training,
+    # n_features), both strided views without any copy
+    windows = sliding_window_view(data_array, n_training, axis=0)
+    X = windows[input_slice_start_min:input_slice_start_max].transpose(0, 2, 1)
 
-    X = []
-    y = []
-    for i in range(input_slice_start_min, input_slice_start_max):
-        # print a few slices at the start and end for debugging
-        # if i<=input_slice_start_min+2 or i>input_slice_start_max-4:
-        #     print('Input:',range(i,i+n_training),',  Output:',i+n_training)
-        X.append(data_array[i:i+n_training])
-        y.append(data_array[i+n_training, :n_products_stores])
+    y = data_array[input_slice_start_min + n_training:
+                   input_slice_start_max + n_training, :n_products_stores]
+    y.flags.writeable = False
 
     return X, y
 
@@ -141,11 +190,13 @@ def get_sequences(data_array: np.ndarray,
 def process(sales_df,
             calendar_df,
             n_training=28,
-            n_forecast=28):
+            n_forecast=28,
+            exogenous_by_day=None):
     (train_df_cols, fixed_cols,
      valid_df_cols, train_df_og,
      valid_df_og) = get_cols(sales_df, n_forecast)
-    merge_exogenous_features = MergeExogenousFeatures(calendar_df=calendar_df)
+    merge_exogenous_features = MergeExogenousFeatures(
+        calendar_df=calendar_df, exogenous_by_day=exogenous_by_day)
     sales_df_exogenous = merge_exogenous_features.fit_transform(sales_df)
     train_df = sales_df_exogenous.iloc[:-n_forecast, :]
     valid_df = sales_df_exogenous.iloc[-n_forecast:, :]
@@ -169,11 +220,6 @@ def process(sales_df,
                                       train_valid_df.shape[0]-n_forecast,
                                       n_training,
                                       n_products_stores)
-
-    X_train = np.array(X_train)
-    y_train = np.array(y_train)
-    X_valid = np.array(X_valid)
-    y_valid = np.array(y_valid)
     return (X_train, y_train, X_valid, y_valid,
             n_products_stores,
             scaler,
@@ -0,0 +1,199 @@
+from typing import Callable, Dict, List
+import numpy as np
+import pandas as pd
+from numpy import ndarray
+from pandas import DataFrame
+
+# Values of 'model_type' in config.yaml; 'keras' is the CNN+LSTM baseline of
+# trainAndEvaluate, the others are the vectorized engines of this module
+MODEL_TYPES = ['keras', 'seasonal_naive', 'exponential_smoothing', 'ridge']
+# Length of the weekly cycle used by the seasonal naive engine
+SEASON = 7
+# Smoothing levels tried for every series by exponential smoothing
+SMOOTHING_LEVELS = [0.05, 0.1, 0.2, 0.3, 0.5]
+# Lagged days used as features by the ridge engine
+RIDGE_LAGS = [1, 2, 3, 4, 5, 6, 7, 14, 28]
+# Most recent training days the ridge engine is fitted on
+RIDGE_TRAIN_DAYS = 364
+RIDGE_ALPHA = 1.0
+# Series per batch when building the ridge normal equations
+RIDGE_CHUNK_SERIES = 1024
+
+
+def seasonal_naive(sales: ndarray, exogenous: ndarray,
+                   n_forecast: int) -> ndarray:
+    """
+    Predicts each validation day as the same weekday of the previous week.
+
+    Args:
+        sales (ndarray): Unit sales of shape (n_days, n_series), the last
+        n_forecast days being the validation period.
+        exogenous (ndarray): Exogenous features of shape (n_days, n_exo),
+        unused.
+        n_forecast (int): Number of validation days.
+
+    Returns:
+        ndarray: Predictions of shape (n_forecast, n_series).
+    """
+    n_days = sales.shape[0]
+    return sales[n_days - n_forecast - SEASON:n_days - SEASON].astype(float)
+
+
+def exponential_smoothing(sales: ndarray, exogenous: ndarray,
+                          n_forecast: int) -> ndarray:
+    """
+    Simple exponential smoothing of every series at once. For each series
+    the smoothing level with the lowest one-step-ahead squared error over
+    the training days is kept.
+
+    Args:
+        sales (ndarray): Unit sales of shape (n_days, n_series), the last
+        n_forecast days being the validation period.
+        exogenous (ndarray): Exogenous features of shape (n_days, n_exo),
+        unused.
+        n_forecast (int): Number of validation days.
+
+    Returns:
+        ndarray: One-step-ahead predictions of shape (n_forecast, n_series).
+    """
+    n_days, n_series = sales.shape
+    n_train = n_days - n_forecast
+    alphas = np.array(SMOOTHING_LEVELS)[:, np.newaxis]
+    # One smoothed level per (smoothing level, series)
+    level = np.repeat(sales[:1].astype(float), len(alphas), axis=0)
+    errors = np.zeros((len(alphas), n_series))
+    predictions = np.empty((n_forecast, len(alphas), n_series))
+    for t in range(1, n_days):
+        actual = sales[t]
+        if t < n_train:
+            errors += (actual - level) ** 2
+        else:
+            predictions[t - n_train] = level
+        level += alphas * (actual - level)
+    best = errors.argmin(axis=0)
+    return predictions[:, best, np.arange(n_series)]
+
+
+def get_ridge_features(sales: ndarray, exogenous: ndarray,
+                       days: ndarray) -> ndarray:
+    """
+    Builds the ridge features of the given days for every series: an
+    intercept, the RIDGE_LAGS lagged sales and the day's exogenous features.
+
+    Args:
+        sales (ndarray): Scaled unit sales of shape (n_days, n_series).
+        exogenous (ndarray): Exogenous features of shape (n_days, n_exo).
+        days (ndarray): Day positions to build features for.
+
+    Returns:
+        ndarray: Features of shape (n_series, len(days), n_features).
+    """
+    n_series = sales.shape[1]
+    columns = [np.ones((len(days), n_series))]
+    columns += [sales[days - lag] for lag in RIDGE_LAGS]
+    columns += [np.broadcast_to(exogenous[days, i:i + 1],
+                                (len(days), n_series))
+                for i in range(exogenous.shape[1])]
+    return np.stack(columns, axis=-1).transpose(1, 0, 2)
+
+
+def ridge(sales: ndarray, exogenous: ndarray, n_forecast: int) -> ndarray:
+    """
+    Fits one ridge regression per series on its lagged sales and the
+    calendar features, all series solved in one batched linear solve.
+    Series are scaled by their mean training sales so that one penalty
+    suits every series.
+
+    Args:
+        sales (ndarray): Unit sales of shape (n_days, n_series), the last
+        n_forecast days being the validation period.
+        exogenous (ndarray): Exogenous features of shape (n_days, n_exo);
+        missing values are treated as 0.
+        n_forecast (int): Number of validation days.
+
+    Returns:
+        ndarray: One-step-ahead predictions of shape (n_forecast, n_series).
+    """
+    n_days, n_series = sales.shape
+    n_train = n_days - n_forecast
+    first_day = max(max(RIDGE_LAGS), n_train - RIDGE_TRAIN_DAYS)
+    train_days = np.arange(first_day, n_train)
+    valid_days = np.arange(n_train, n_days)
+    exogenous = np.nan_to_num(exogenous.astype(float))
+
+    predictions = np.empty((n_forecast, n_series))
+    for start in range(0, n_series, RIDGE_CHUNK_SERIES):
+        chunk = slice(start, start + RIDGE_CHUNK_SERIES)
+        scale = sales[:n_train, chunk].mean(axis=0) + 1e-3
+        scaled = sales[:, chunk] / scale
+
+        X = get_ridge_features(scaled, exogenous, train_days)
+        y = scaled[train_days].T
+        gram = np.einsum('std,ste->sde', X, X)
+        gram += RIDGE_ALPHA * np.eye(X.shape[-1])
+        coefficients = np.linalg.solve(
+            gram, np.einsum('std,st->sd', X, y)[..., np.newaxis])
+
+        X_valid = get_ridge_features(scaled, exogenous, valid_days)
+        chunk_predictions = (X_valid @ coefficients)[..., 0].T
+        predictions[:, chunk] = np.clip(chunk_predictions, 0, None) * scale
+    return predictions
+
+
+ENGINES: Dict[str, Callable[[ndarray, ndarray, int], ndarray]] = {
+    'seasonal_naive': seasonal_naive,
+    'exponential_smoothing': exponential_smoothing,
+    'ridge': ridge,
+}
+
+
+def predict_validation(model_type: str, sales: ndarray, exogenous: ndarray,
+                       n_forecast: int) -> ndarray:
+    """
+    Predicts the validation days of every series with a vectorized engine.
+    Like evaluate_model for the Keras model, each day is predicted one step
+    ahead from the actual sales of the days before it.
+
+    Args:
+        model_type (str): One of the engines of ENGINES.
+        sales (ndarray): Unit sales of shape (n_days, n_series), the last
+        n_forecast days being the validation period.
+        exogenous (ndarray): Exogenous features of shape (n_days, n_exo).
+        n_forecast (int): Number of validation days.
+
+    Raises:
+        ValueError: If model_type is not a vectorized engine.
+
+    Returns:
+        ndarray: Predictions of shape (n_forecast, n_series).
+    """
+    if model_type not in ENGINES:
+        raise ValueError(f"Unknown model_type {model_type}, expected one " +
+                         f"of {list(ENGINES)}")
+    return ENGINES[model_type](sales, exogenous, n_forecast)
+
+
+def get_pred_df(predictions: ndarray, exogenous: ndarray,
+                valid_df_og: DataFrame, valid_df_cols: List[str],
+                fixed_cols: List[str]) -> DataFrame:
+    """
+    Lays out the predictions of a group like trainAndEvaluate.evaluate_model
+    does: one row per series with its fixed columns, followed by one row per
+    exogenous feature (holding the known calendar values, with empty fixed
+    columns), and one column per validation day.
+
+    Args:
+        predictions (ndarray): Predictions of shape (n_forecast, n_series).
+        exogenous (ndarray): Exogenous features of the validation days, of
+        shape (n_forecast, n_exo).
+        valid_df_og (DataFrame): Validation actuals with the fixed columns.
+        valid_df_cols (List[str]): Validation day columns.
+        fixed_cols (List[str]): Identifier columns.
+
+    Returns:
+        DataFrame: Validation predictions merged with fixed columns.
+    """
+    values = np.concatenate((predictions, exogenous), axis=1)
+    y_valid_pred_df = DataFrame(values.T, columns=valid_df_cols)
+    return pd.concat([valid_df_og[fixed_cols].reset_index(drop=True),
+                      y_valid_pred_df], axis=1, sort=False)
@@ -2,13 +2,101 @@ from keras.models import Sequential
 from keras.layers import Conv1D, MaxPooling1D, LSTM, BatchNormalization, Dense
 from keras.metrics import RootMeanSquaredError
 from keras.optimizers import Adam
-from keras.callbacks import EarlyStopping, TensorBoard
+from keras.callbacks import Callback, EarlyStopping, TensorBoard
+from keras.utils import Sequence
+import math
+import time
 import pandas as pd
 import numpy as np
 from pandas import DataFrame
 from numpy import ndarray
-from typing import Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from sklearn.preprocessing import MinMaxScaler
+# forecast runs with the numpy runtime as well as with Keras models and now
+# lives in inference; it is re-exported for existing callers
+from src.domain.inference import forecast  # noqa: F401
+
+
+class WindowBatches(Sequence):
+    """
+    Feeds windowed (X, y) views to Keras one batch at a time.
+
+    preProcessing.get_sequences returns strided views, so only the batch
+    being trained on is ever copied into contiguous memory.
+    """
+
+    def __init__(self, X: ndarray, y: ndarray, batch_size: int,
+                 shuffle: bool = True):
+        """
+        Args:
+            X (ndarray): Input windows of shape (n, n_training, n_features).
+            y (ndarray): Targets of shape (n, n_outputs).
+            batch_size (int): Number of windows per batch.
+            shuffle (bool): Reshuffle the window order every epoch, as
+            Model.fit does for in-memory arrays. Defaults to True.
+        """
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(X))
+        self.on_epoch_end()
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.X) / self.batch_size)
+
+    def __getitem__(self, index: int) -> Tuple[ndarray, ndarray]:
+        batch = self.order[index * self.batch_size:
+                           (index + 1) * self.batch_size]
+        return (np.ascontiguousarray(self.X[batch], dtype=np.float32),
+                np.ascontiguousarray(self.y[batch], dtype=np.float32))
+
+    def on_epoch_end(self) -> None:
+        if self.shuffle:
+            np.random.shuffle(self.order)
+
+
+class PeriodicCheckpoint(Callback):
+    """
+    Checkpoints the model being trained every few epochs, so that a killed
+    worker can resume from the last checkpoint instead of epoch 0.
+
+    Writes are bounded: at most one every every_epochs epochs and every
+    min_seconds of training, each replacing the previous one. The last
+    epoch is not checkpointed since the trained model is saved anyway.
+    """
+
+    def __init__(self, save: Callable[[Sequential, int], None],
+                 every_epochs: int = 1, min_seconds: float = 0):
+        """
+        Args:
+            save (Callable[[Sequential, int], None]): Called as
+            save(model, completed_epochs) to write a checkpoint.
+            every_epochs (int): Epochs between checkpoints. Defaults to 1.
+            min_seconds (float): Shortest time between checkpoints,
+            counted from the start of training. Defaults to 0.
+        """
+        super().__init__()
+        self.save = save
+        self.every_epochs = max(1, every_epochs)
+        self.min_seconds = min_seconds
+        self.last_save = time.monotonic()
+
+    def on_train_begin(self, logs=None) -> None:
+        self.last_save = time.monotonic()
+
+    def on_epoch_end(self, epoch: int, logs=None) -> None:
+        completed = epoch + 1
+        if completed % self.every_epochs or \
+                completed >= self.params.get('epochs', completed + 1) or \
+                time.monotonic() - self.last_save < self.min_seconds:
+            return
+        start = time.monotonic()
+        self.save(self.model, completed)
+        self.last_save = time.monotonic()
+        print(f"Checkpointed epoch {completed} in " +
+              f"{self.last_save - start:.2f}s")
 
 
 def build_baseline_model(n_products_stores: int,
@@ -97,17 +185,14 @@ def evaluate_model(model: Sequential,
     - DataFrame: Validation predictions merged with fixed columns.
     """
 
-    y_valid_pred = []
-    for X in X_valid:
-        y_valid_pred_day = model.predict(X.reshape(1, n_training, n_outputs))
-        y_valid_pred_day = scaler.inverse_transform(y_valid_pred_day)
-        y_valid_pred.append(y_valid_pred_day)
-
-    y_valid_pred_df = pd.DataFrame(
-        np.array(
-            [y_valid_pred[i].reshape(-1,) for i in range(
-                len(y_valid_pred))]).T,
-        columns=valid_df_cols)
+    # One batched predict over every validation window and a single inverse
+    # transform, instead of one predict/inverse_transform call per day
+    y_valid_pred = model.predict(
+        X_valid.reshape(-1, n_training, n_outputs), verbose=0)
+    y_valid_pred = scaler.inverse_transform(y_valid_pred)
+
+    # Rows are the series/features, columns the validation days
+    y_valid_pred_df = pd.DataFrame(y_valid_pred.T, columns=valid_df_cols)
     if not all([col in y_valid_pred_df.columns for col in fixed_cols]):
         y_valid_pred_df = pd.concat([valid_df_og[fixed_cols].reset_index(
             drop=True), y_valid_pred_df.reset_index(drop=True)], axis=1,
@@ -123,7 +208,11 @@ def train_and_evaluate(
         n_training: int, train_df_og: DataFrame,
         scaler: MinMaxScaler,
         valid_df_cols: list, fixed_cols: list,
-        log_directory: str = "../results/baseline/tb_logs") -> Tuple[
+        log_directory: str = "../results/baseline/tb_logs",
+        initial_model: Optional[Sequential] = None,
+        initial_epoch: int = 0,
+        callbacks: Optional[List[Callback]] = None,
+        timings: Optional[Dict[str, float]] = None) -> Tuple[
             Sequential, DataFrame]:
     """
     Trains the baseline model and evaluates it on the validation set.
@@ -145,14 +234,25 @@ def train_and_evaluate(
     - fixed_cols (list): List of fixed column names to be included in the 
     output DataFrame.
     - log_directory (str): Directory for TensorBoard log files.
+    - initial_model (Optional[Sequential]): Partially trained model (with
+    its optimizer state) to resume instead of building a new one.
+    - initial_epoch (int): Epochs initial_model was already trained for.
+    - callbacks (Optional[List[Callback]]): Extra callbacks, e.g. a
+    PeriodicCheckpoint.
+    - timings (Optional[Dict[str, float]]): Receives the seconds spent in
+    'fit' and in 'evaluate_model'.
 
     Returns:
     - Tuple[Sequential, DataFrame]: Trained model and DataFrame containing
     validation predictions.
     """
-    baseline_model = build_baseline_model(n_products_stores=n_outputs,
-                                          n_training=n_training,
-                                          n_outputs=n_outputs)
+    if initial_model is None:
+        baseline_model = build_baseline_model(n_products_stores=n_outputs,
+                                              n_training=n_training,
+                                              n_outputs=n_outputs)
+        initial_epoch = 0
+    else:
+        baseline_model = initial_model
     baseline_model.summary()
 
     # Train baseline model with early stopping and tensorboard callbacks
@@ -162,16 +262,20 @@ def train_and_evaluate(
         verbose=1,
         patience=20)
 
+    # Windows are views on the scaled series; batches are materialised lazily
+    start = time.perf_counter()
     _ = baseline_model.fit(
-        X_train,
-        y_train,
+        WindowBatches(X_train, y_train, batch_size),
         epochs=epochs,
-        batch_size=batch_size,
-        validation_data=(X_valid, y_valid),
+        initial_epoch=initial_epoch,
+        validation_data=WindowBatches(X_valid, y_valid, batch_size,
+                                      shuffle=False),
         callbacks=[es, TensorBoard(log_dir=log_directory)
-                   ])
+                   ] + (callbacks or []))
+    fit_seconds = time.perf_counter() - start
 
     # # Make predictions using baseline NN model
+    start = time.perf_counter()
     baseline_model_pred_df = evaluate_model(
         baseline_model,
         X_valid,
@@ -181,4 +285,7 @@ def train_and_evaluate(
         valid_df_cols,
         fixed_cols,
         train_df_og)
+    if timings is not None:
+        timings['fit'] = fit_seconds
+        timings['evaluate_model'] = time.perf_counter() - start
     return baseline_model, baseline_model_pred_df
@@ -0,0 +1,182 @@
+import os
+import ast
+import json
+import hashlib
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+# Bump whenever something outside the key changes what a model learns
+KEY_VERSION = 1
+# Calendar columns read by preProcessing (the day and the exogenous flags)
+CALENDAR_COLUMNS = ['d', 'snap_CA', 'snap_TX', 'snap_WI',
+                    'event_name_1', 'event_name_2']
+# Source file and function defining the model architecture
+MODEL_SOURCE_FILE = os.path.join(os.path.dirname(__file__),
+                                 'trainAndEvaluate.py')
+MODEL_FUNCTION = 'build_baseline_model'
+# Source file of the vectorized engines, hashed whole for those model types
+STATISTICAL_SOURCE_FILE = os.path.join(os.path.dirname(__file__),
+                                       'statisticalModels.py')
+# Source file of the global model (training_mode 'global'), hashed whole
+# since its window sampling and scaling also shape what it learns
+GLOBAL_MODEL_SOURCE_FILE = os.path.join(os.path.dirname(__file__),
+                                        'globalModel.py')
+# Source files turning the sales and the calendar into model inputs, hashed
+# whole for every model type
+PREPROCESSING_SOURCE_FILES = [
+    os.path.join(os.path.dirname(__file__), 'preProcessing.py'),
+    os.path.join(os.path.dirname(__file__), 'calendarFeatures.py')]
+
+
+@lru_cache(maxsize=None)
+def get_model_source(model_type: str = 'keras') -> str:
+    """
+    Returns the source code defining a model type: build_baseline_model for
+    'keras', the whole globalModel module for 'keras_global' (the global
+    training mode) and the whole statisticalModels module for the
+    vectorized engines.
+
+    The file is parsed rather than imported so that computing keys does not
+    load TensorFlow.
+
+    Args:
+        model_type (str): Model type from config.yaml, or 'keras_global'.
+        Defaults to 'keras'.
+
+    Returns:
+        str: Source of the code defining the model.
+    """
+    if model_type != 'keras':
+        path = GLOBAL_MODEL_SOURCE_FILE if model_type == 'keras_global' \
+            else STATISTICAL_SOURCE_FILE
+        with open(path, 'r') as f:
+            return f.read()
+    with open(MODEL_SOURCE_FILE, 'r') as f:
+        source = f.read()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name == MODEL_FUNCTION:
+            return ast.get_source_segment(source, node)
+    raise ValueError(f"{MODEL_FUNCTION} not found in {MODEL_SOURCE_FILE}")
+
+
+@lru_cache(maxsize=None)
+def get_preprocessing_source() -> str:
+    """
+    Returns the source code of the preprocessing modules: the windowing,
+    scaling and calendar features they compute shape what a model learns
+    as much as its architecture does.
+
+    Returns:
+        str: Concatenated source of PREPROCESSING_SOURCE_FILES.
+    """
+    sources = []
+    for path in PREPROCESSING_SOURCE_FILES:
+        with open(path, 'r') as f:
+            sources.append(f.read())
+    return '\n'.join(sources)
+
+
+def get_frame_digest(df: DataFrame) -> str:
+    """
+    Hashes the column names and the values of a DataFrame. Categorical
+    columns are hashed by value, so the digest does not depend on the
+    categories of the full dataset.
+
+    Numeric columns (the day columns of the sales) are hashed as one
+    contiguous array: hashing them column by column costs about 0.1s per
+    group of a 1913-day history, whatever the size of the group.
+
+    Args:
+        df (DataFrame): The frame to hash.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    numeric = df.select_dtypes(include='number')
+    others = df.drop(columns=numeric.columns)
+    if len(others.columns):
+        digest.update(
+            pd.util.hash_pandas_object(others, index=False).values.data)
+    if len(numeric.columns):
+        values = np.ascontiguousarray(numeric.to_numpy())
+        digest.update(str(values.dtype).encode())
+        digest.update(values.data)
+    return digest.hexdigest()
+
+
+def get_calendar_digest(calendar_df: DataFrame) -> str:
+    """
+    Hashes the calendar columns the models are trained on.
+
+    Args:
+        calendar_df (DataFrame): The calendar DataFrame.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    return get_frame_digest(calendar_df[CALENDAR_COLUMNS])
+
+
+def get_training_key(sales_df: DataFrame,
+                     calendar_digest: str,
+                     n_training: int,
+                     n_forecast: int,
+                     epochs: int,
+                     model_type: str = 'keras',
+                     inference_weights: Optional[str] = None) -> str:
+    """
+    Returns the content address of a group's model: a hash of everything
+    the trained artifacts depend on. A group whose stored key equals this
+    key does not need to be retrained.
+
+    Args:
+        sales_df (DataFrame): Sales rows of the group.
+        calendar_digest (str): Digest returned by get_calendar_digest.
+        n_training (int): Number of input days per window.
+        n_forecast (int): Number of forecast days per window.
+        epochs (int): Number of training epochs.
+        model_type (str): Model type from config.yaml. Defaults to 'keras'.
+        inference_weights (Optional[str]): Precision of the exported
+        weights (inference_weights in config.yaml), for the model types
+        that export them. Defaults to None.
+
+    Returns:
+        str: Hex SHA-256 key.
+    """
+    parts = {
+        "version": KEY_VERSION,
+        "sales": get_frame_digest(sales_df),
+        "calendar": calendar_digest,
+        "n_training": n_training,
+        "n_forecast": n_forecast,
+        "epochs": epochs,
+        "model_type": model_type,
+        "model": hashlib.sha256(
+            get_model_source(model_type).encode()).hexdigest(),
+        "preprocessing": hashlib.sha256(
+            get_preprocessing_source().encode()).hexdigest(),
+        "inference_weights": inference_weights,
+    }
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def get_level_key(training_keys: List[str]) -> str:
+    """
+    Returns the content address of a model trained on several groups at
+    once (the global model): a hash of the keys of all its groups, so that
+    a change in any group retrains the whole level.
+
+    Args:
+        training_keys (List[str]): Keys of the groups, in any order.
+
+    Returns:
+        str: Hex SHA-256 key.
+    """
+    return hashlib.sha256(
+        json.dumps(sorted(training_keys)).encode()).hexdigest()
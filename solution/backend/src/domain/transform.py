@@ -1,6 +1,11 @@
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
-from typing import Tuple, Generator
+from pandas.core.groupby import DataFrameGroupBy
+from typing import Tuple, List, Any, Optional
 from src.domain.configLoader import load_config_model
+from src.domain.hierarchy import (FOR_ALL_COLUMN, FOR_ALL_VALUE,
+                                  get_level_columns)
 from src.domain.models.pydantic.modelLevel import ModelLevel
 
 
@@ -48,8 +53,9 @@ def transform_sales(df: DataFrame) -> DataFrame:
 
 def transform(raw_calendar_df: DataFrame,
               raw_sales_df: DataFrame,
-              raw_sell_prices_df: DataFrame) -> Tuple[DataFrame, DataFrame,
-                                                      DataFrame, ModelLevel]:
+              raw_sell_prices_df: DataFrame,
+              model_level_id: Optional[int] = None) -> Tuple[
+                  DataFrame, DataFrame, DataFrame, ModelLevel]:
     """
     Transform raw dataframes according to the specified model level 
     configurations.
@@ -58,6 +64,8 @@ def transform(raw_calendar_df: DataFrame,
         raw_calendar_df (DataFrame): Raw calendar data.
         raw_sales_df (DataFrame): Raw sales data.
         raw_sell_prices_df (DataFrame): Raw sell prices data.
+        model_level_id (Optional[int]): Model level to use instead of the
+        one in config.yaml. Defaults to None.
 
     Raises:
         ValueError: If the desired model level configuration is not found.
@@ -67,7 +75,7 @@ def transform(raw_calendar_df: DataFrame,
         calendar, sales, and sell prices DataFrames,
         along with the desired model level.
     """
-    desired_model_level = load_config_model()
+    desired_model_level = load_config_model(model_level_id)
     if desired_model_level is None:
         raise ValueError(f"Model level {desired_model_level} not found.")
 
@@ -80,30 +88,54 @@ def transform(raw_calendar_df: DataFrame,
 
 def get_model_details_per_level(
         sales_df: DataFrame,
-        model_level: ModelLevel) -> Tuple[DataFrame, Generator]:
+        model_level: ModelLevel) -> Tuple[DataFrame, DataFrameGroupBy]:
     """
-    Group sales data according to the specified model level and calculate the 
+    Group sales data according to the specified model level and calculate the
     count of time series for each group.
 
+    The pseudo column of level 1 is a constant key rather than a column
+    added to sales_df, and the counts come from the group sizes instead of
+    counting every day column. Training groups the series through the
+    summing matrix of hierarchy.Hierarchy instead.
+
     Args:
-        sales_df (DataFrame): The sales DataFrame.
+        sales_df (DataFrame): The sales DataFrame, left unchanged.
         model_level (ModelLevel): The model level configuration.
 
     Returns:
-        Tuple[DataFrame, Generator]: A DataFrame summarizing the count of time
-        series for each model level group,
-        and a generator for iterating through each group in the sales 
-        DataFrame.
+        Tuple[DataFrame, DataFrameGroupBy]: A DataFrame summarizing the
+        count of time series for each model level group, and the groups of
+        the sales DataFrame.
     """
-    sales_df['for_all'] = "all"
-    if isinstance(model_level.Columns, list):
-        list_groupby = model_level.Columns
-    else:
-        list_groupby = [model_level.Columns]
+    list_groupby = get_level_columns(model_level)
     print(list_groupby)
-    d1 = sales_df.groupby(list_groupby).count().reset_index()[
-        list_groupby+['id']].rename(columns={
-            'id': 'number of raw time series for' +
-            ' training each model at level '+str(model_level.LevelId)})
-    d2 = sales_df.groupby(list_groupby)
-    return d1, d2
+    keys = [sales_df[column] if column != FOR_ALL_COLUMN else
+            pd.Series(FOR_ALL_VALUE, index=sales_df.index, name=column)
+            for column in list_groupby]
+    # observed=True keeps categorical id columns from producing empty groups
+    grouped = sales_df.groupby(keys, observed=True)
+    counts = grouped.size().rename(
+        'number of raw time series for training each model at level ' +
+        str(model_level.LevelId)).reset_index()
+    return counts, grouped
+
+
+def get_group_rows(grouped: DataFrameGroupBy) -> List[Tuple[Any, np.ndarray]]:
+    """
+    Return the row positions of every group without materialising the
+    group DataFrames.
+
+    Args:
+        grouped (DataFrameGroupBy): Groups returned by
+        get_model_details_per_level.
+
+    Returns:
+        List[Tuple[Any, np.ndarray]]: Group names, named exactly as when
+        iterating over the groups (always tuples), and their row positions.
+    """
+    group_rows = []
+    for group_name, rows in grouped.indices.items():
+        if not isinstance(group_name, tuple):
+            group_name = (group_name,)
+        group_rows.append((group_name, rows))
+    return group_rows
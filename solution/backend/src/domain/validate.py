@@ -1,58 +1,218 @@
-
+from typing import List, Sequence, Union
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 from src.domain.models.definitions import calendar, sell_prices, sales
 from src.domain.models.pydantic.tableDefinition import TableDefinition
+from src.domain.models.pydantic.columnChecks import ColumnChecks
+
+# Name of the calendar column holding the day of each date (d_1, d_2, ...)
+CALENDAR_DAY_COLUMN = 'd'
 
 
 def validate_expected_columns(df: DataFrame,
                               table_definition: TableDefinition) -> bool:
     """
-    Validates that a DataFrame contains all expected columns as defined 
+    Validates that a DataFrame contains all expected columns as defined
     in a TableDefinition.
 
     Args:
         df (DataFrame): The DataFrame to validate.
-        table_definition (TableDefinition): The definition of the table, 
+        table_definition (TableDefinition): The definition of the table,
         including expected column names.
 
     Raises:
         Exception: If any expected columns are missing from the DataFrame.
 
     Returns:
-        bool: True if the DataFrame contains all expected columns, otherwise 
+        bool: True if the DataFrame contains all expected columns, otherwise
         raises an Exception.
     """
     # Get expected column names from table definition
     expected_columns = table_definition.get_all_column_names()
 
-    # Get actual column names from the DataFrame
-    actual_columns = set(df.columns)
-
     # Check if all expected columns are present in the DataFrame
-    missing_columns = set(expected_columns) - actual_columns
-    if missing_columns:
+    missing_columns = set(expected_columns) - set(df.columns)
+    missing_families = [family.FamilyName
+                        for family in table_definition.ColumnFamilies
+                        if family.MinCount > 0 and
+                        len(family.match(df.columns)[0]) == 0]
+    if missing_columns or missing_families:
         raise Exception(
             f"Invalid {table_definition.TableName} DataFrame." +
-            f" Some expected columns are missing. Cols {missing_columns}")
+            f" Some expected columns are missing. Cols {missing_columns}" +
+            (f" Column families {missing_families}" if missing_families
+             else ""))
     return True
 
 
+def get_block(df: DataFrame, positions: np.ndarray) -> DataFrame:
+    """
+    Selects columns by position, as a view when they are contiguous.
+
+    Args:
+        df (DataFrame): The DataFrame.
+        positions (np.ndarray): Increasing column positions.
+
+    Returns:
+        DataFrame: The selected columns.
+    """
+    if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+        return df.iloc[:, positions[0]:positions[-1] + 1]
+    return df.iloc[:, positions]
+
+
+def is_kind(dtype: np.dtype, kind: str) -> bool:
+    """
+    Checks a dtype against a ColumnChecks.Dtype kind.
+
+    Args:
+        dtype (np.dtype): The dtype of a column.
+        kind (str): integer, number or text.
+
+    Returns:
+        bool: True if the dtype is of that kind.
+    """
+    if kind == 'integer':
+        return pd.api.types.is_integer_dtype(dtype)
+    if kind == 'number':
+        return pd.api.types.is_numeric_dtype(dtype) and \
+            not pd.api.types.is_bool_dtype(dtype)
+    return pd.api.types.is_object_dtype(dtype) or \
+        pd.api.types.is_string_dtype(dtype) or \
+        isinstance(dtype, pd.CategoricalDtype)
+
+
+def check_columns(df: DataFrame, positions: Union[Sequence[int], np.ndarray],
+                  checks: ColumnChecks, label: str) -> List[str]:
+    """
+    Runs the dtype, non-negativity and missing value checks on a block of
+    columns at once.
+
+    Numeric checks are reductions over the whole block; columns of the same
+    dtype are reduced together by pandas, without copying them.
+
+    Args:
+        df (DataFrame): The DataFrame to check.
+        positions (Union[Sequence[int], np.ndarray]): Positions of the
+        columns sharing these checks.
+        checks (ColumnChecks): The checks.
+        label (str): Name of the column or column family in messages.
+
+    Returns:
+        List[str]: Problems found, empty if none.
+    """
+    positions = np.asarray(positions, dtype=np.intp)
+    if len(positions) == 0:
+        return []
+    block = get_block(df, positions)
+    errors = []
+    dtypes = block.dtypes
+    if checks.Dtype is not None:
+        wrong = [str(dtype) for dtype in dtypes.unique()
+                 if not is_kind(dtype, checks.Dtype)]
+        if wrong:
+            errors.append(f"{label}: dtype {', '.join(wrong)}, expected " +
+                          f"{checks.Dtype}")
+            return errors
+
+    numeric = dtypes.map(pd.api.types.is_numeric_dtype).to_numpy()
+    if checks.NonNegative and numeric.any():
+        minimum = block.loc[:, numeric].min().min()
+        if minimum < 0:
+            errors.append(f"{label}: negative values (minimum {minimum})")
+
+    if checks.MaxNanRate is not None:
+        # Integer columns cannot hold missing values
+        nullable = ~dtypes.map(pd.api.types.is_integer_dtype).to_numpy()
+        if nullable.any():
+            nan_rate = block.loc[:, nullable].isna().mean().max()
+            if nan_rate > checks.MaxNanRate:
+                errors.append(f"{label}: {nan_rate:.3%} missing values, " +
+                              f"at most {checks.MaxNanRate:.3%} allowed")
+    return errors
+
+
+def validate_table(df: DataFrame, table_definition: TableDefinition) -> None:
+    """
+    Validates the columns of a DataFrame against a TableDefinition: the
+    presence of every column and column family, then the checks of each
+    column and family, and the count and continuity of each family.
+
+    Args:
+        df (DataFrame): The DataFrame to validate.
+        table_definition (TableDefinition): The definition of the table.
+
+    Raises:
+        Exception: Listing every problem found.
+    """
+    validate_expected_columns(df, table_definition)
+    errors = []
+    for column in table_definition.Columns:
+        errors += check_columns(df, [df.columns.get_loc(column.ColumnName)],
+                                column, column.ColumnName)
+    for family in table_definition.ColumnFamilies:
+        positions, numbers = family.match(df.columns)
+        errors += family.get_continuity_errors(numbers)
+        errors += check_columns(df, positions, family, family.FamilyName)
+    if errors:
+        raise Exception(f"Invalid {table_definition.TableName} DataFrame. " +
+                        "; ".join(errors))
+
+
+def validate_calendar_days(raw_calendar_df: DataFrame,
+                           raw_sales_df: DataFrame) -> None:
+    """
+    Validates that the calendar days form a contiguous range from d_1 that
+    covers every sales day, since the calendar features are looked up by
+    day number.
+
+    Args:
+        raw_calendar_df (DataFrame): The calendar data.
+        raw_sales_df (DataFrame): The sales data.
+
+    Raises:
+        Exception: If the calendar days are not contiguous or end before
+        the last sales day.
+    """
+    days = sales.ColumnFamilies[0]
+    calendar_days = raw_calendar_df[CALENDAR_DAY_COLUMN].astype(str)
+    numbers = pd.to_numeric(
+        calendar_days.str.extract(f"^{days.Pattern}$", expand=False),
+        errors='coerce')
+    errors = []
+    if numbers.isna().any():
+        errors.append(f"{int(numbers.isna().sum())} days do not match " +
+                      days.Pattern)
+    else:
+        errors += days.get_continuity_errors(numbers.to_numpy(np.int64))
+    _, sales_numbers = days.match(raw_sales_df.columns)
+    if len(sales_numbers) and numbers.max() < sales_numbers.max():
+        errors.append(f"the calendar ends at day {numbers.max()}, before " +
+                      f"the last sales day {sales_numbers.max()}")
+    if errors:
+        raise Exception("Invalid calendar DataFrame. " + "; ".join(errors))
+
+
 def validate(raw_calendar_df: DataFrame,
              raw_sales_df: DataFrame,
              raw_sell_prices_df: DataFrame) -> None:
     """
-    Validates that the provided DataFrames for calendar, sales, and 
+    Validates that the provided DataFrames for calendar, sales, and
     sell prices contain all the expected columns
-    as defined in their respective TableDefinition.
+    as defined in their respective TableDefinition, with the expected
+    dtypes, no negative or missing values where forbidden, contiguous day
+    columns and a calendar covering every sales day.
 
     Args:
-        raw_calendar_df (DataFrame): The DataFrame containing calendar data 
+        raw_calendar_df (DataFrame): The DataFrame containing calendar data
         to validate.
-        raw_sales_df (DataFrame): The DataFrame containing sales data 
+        raw_sales_df (DataFrame): The DataFrame containing sales data
         to validate.
-        raw_sell_prices_df (DataFrame): The DataFrame containing sell prices 
+        raw_sell_prices_df (DataFrame): The DataFrame containing sell prices
         data to validate.
     """
-    validate_expected_columns(raw_calendar_df, calendar)
-    validate_expected_columns(raw_sales_df, sales)
-    validate_expected_columns(raw_sell_prices_df, sell_prices)
+    validate_table(raw_calendar_df, calendar)
+    validate_table(raw_sales_df, sales)
+    validate_table(raw_sell_prices_df, sell_prices)
+    validate_calendar_days(raw_calendar_df, raw_sales_df)
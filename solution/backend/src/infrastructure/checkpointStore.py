@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+from typing import Any, Dict, List, Optional
+from src.infrastructure.resultsStore import get_group_path
+
+# Directory where partially trained models are checkpointed, one
+# sub-directory per group
+CHECKPOINTS_DIR = './results/checkpoints'
+# Model file of a checkpoint; the .keras format holds the weights and the
+# optimizer state
+MODEL_FILE = 'checkpoint.keras'
+STATE_FILE = 'state.json'
+
+
+def get_checkpoint_dir(group_name: str) -> str:
+    """
+    Returns the directory holding the checkpoint of a group.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Raises:
+        ValueError: If the group name is not valid (see
+        resultsStore.get_group_path).
+
+    Returns:
+        str: The checkpoint directory.
+    """
+    return get_group_path(CHECKPOINTS_DIR, group_name)
+
+
+def save_checkpoint(group_name: str, model: Any, epoch: int,
+                    training_key: Optional[str] = None) -> None:
+    """
+    Checkpoints a model after a number of completed epochs, replacing the
+    previous checkpoint of the group.
+
+    The model is written to a temporary name and renamed into place before
+    the state, so a crash while writing leaves the previous checkpoint (or
+    none) rather than a truncated one.
+
+    Args:
+        group_name (str): Name of the model group.
+        model (Any): Keras model being trained.
+        epoch (int): Number of completed epochs.
+        training_key (Optional[str]): Content address of the inputs the
+        model is trained on (see domain.trainingKey).
+    """
+    checkpoint_dir = get_checkpoint_dir(group_name)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    model_path = os.path.join(checkpoint_dir, MODEL_FILE)
+    # Keras only accepts paths ending with .keras
+    tmp_model_path = os.path.join(checkpoint_dir, f"tmp.{MODEL_FILE}")
+    model.save(tmp_model_path)
+    os.replace(tmp_model_path, model_path)
+
+    state_path = os.path.join(checkpoint_dir, STATE_FILE)
+    with open(f"{state_path}.tmp", 'w') as f:
+        json.dump({"epoch": epoch, "training_key": training_key}, f)
+    os.replace(f"{state_path}.tmp", state_path)
+
+
+def load_checkpoint_state(group_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Loads the state of a group's checkpoint.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[Dict[str, Any]]: The completed epochs and the training
+        key, or None if the group has no checkpoint.
+    """
+    checkpoint_dir = get_checkpoint_dir(group_name)
+    state_path = os.path.join(checkpoint_dir, STATE_FILE)
+    if not os.path.exists(state_path) or \
+            not os.path.exists(os.path.join(checkpoint_dir, MODEL_FILE)):
+        return None
+    with open(state_path, 'r') as f:
+        return json.load(f)
+
+
+def load_checkpoint(group_name: str,
+                    training_key: Optional[str] = None
+                    ) -> Optional[Dict[str, Any]]:
+    """
+    Loads the checkpoint of a group to resume its training. A checkpoint
+    taken with another training key (the inputs changed since) is removed
+    instead.
+
+    Args:
+        group_name (str): Name of the model group.
+        training_key (Optional[str]): Current training key of the group.
+
+    Returns:
+        Optional[Dict[str, Any]]: The compiled model with its optimizer
+        state and the number of completed epochs, or None if there is no
+        usable checkpoint.
+    """
+    state = load_checkpoint_state(group_name)
+    if state is None:
+        return None
+    if state.get('training_key') != training_key:
+        remove_checkpoint(group_name)
+        return None
+
+    # Imported here so that serving stored results does not load TensorFlow
+    from keras.models import load_model
+
+    try:
+        model = load_model(os.path.join(get_checkpoint_dir(group_name),
+                                        MODEL_FILE))
+    except Exception as exc:
+        print(f"Ignoring the unreadable checkpoint of {group_name}: {exc}")
+        remove_checkpoint(group_name)
+        return None
+    return {"model": model, "epoch": state['epoch']}
+
+
+def remove_checkpoint(group_name: str) -> None:
+    """
+    Removes the checkpoint of a group, if any.
+
+    Args:
+        group_name (str): Name of the model group.
+    """
+    checkpoint_dir = get_checkpoint_dir(group_name)
+    if os.path.exists(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+def list_checkpoints() -> List[str]:
+    """
+    Returns:
+        List[str]: Names of every checkpointed group.
+    """
+    if not os.path.isdir(CHECKPOINTS_DIR):
+        return []
+    return os.listdir(CHECKPOINTS_DIR)
+
+
+def remove_checkpoints() -> None:
+    """
+    Removes every checkpoint.
+    """
+    if os.path.exists(CHECKPOINTS_DIR):
+        shutil.rmtree(CHECKPOINTS_DIR)
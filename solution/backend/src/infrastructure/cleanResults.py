@@ -1,11 +1,15 @@
 import os
 import glob
 from typing import NoReturn
+from src.infrastructure.modelStore import remove_models
+from src.infrastructure.checkpointStore import remove_checkpoints
+from src.infrastructure import resultsStore
 
 
 def clean() -> NoReturn:
     """
-    Removes all JSON files from the results directory.
+    Removes all JSON/NPZ result files and persisted models from the results
+    directory.
 
     This function is designed to clean up the results directory by deleting
     all JSON files it contains. It iterates through all JSON files in the
@@ -18,13 +22,11 @@ def clean() -> NoReturn:
         NoReturn: This function does not return anything.
     """
     # Define the path to the results directory
-    results_dir = './results'
+    results_dir = resultsStore.RESULTS_DIR
 
-    # Construct the pattern to match all JSON files in the directory
-    pattern = os.path.join(results_dir, '*.json')
-
-    # Use glob to find all files matching the pattern
-    json_files = glob.glob(pattern)
+    # Match the JSON indexes and the NPZ arrays of the results store
+    json_files = glob.glob(os.path.join(results_dir, '*.json')) + \
+        glob.glob(os.path.join(results_dir, '*.npz'))
 
     # Iterate over the list of file paths & remove each file
     for file_path in json_files:
@@ -33,3 +35,15 @@ def clean() -> NoReturn:
             print(f"Removed: {file_path}")
         except Exception as e:
             print(f"Error removing {file_path}: {e}")
+
+    # Persisted models belong to the results being removed
+    try:
+        remove_models()
+    except Exception as e:
+        print(f"Error removing models: {e}")
+
+    # So are the checkpoints of partially trained models
+    try:
+        remove_checkpoints()
+    except Exception as e:
+        print(f"Error removing checkpoints: {e}")
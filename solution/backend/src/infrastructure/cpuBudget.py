@@ -0,0 +1,180 @@
+import os
+import math
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# cgroup v2 exposes "<quota> <period>" (or "max <period>") in cpu.max
+CGROUP_V2_CPU_MAX = 'cpu.max'
+# cgroup v1 exposes the CFS quota and period in separate files
+CGROUP_V1_QUOTA = 'cpu.cfs_quota_us'
+CGROUP_V1_PERIOD = 'cpu.cfs_period_us'
+# Environment variables read by the thread pools of the numerical libraries
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+                   'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS']
+
+
+# cgroup v1 mount points of each controller
+CGROUP_V1_MOUNTS = {'cpu': ['cpu', 'cpu,cpuacct'], 'memory': ['memory']}
+# Where the cgroup hierarchies are mounted, and the cgroups of this process
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_SELF_CGROUP = '/proc/self/cgroup'
+
+
+def get_cgroup_dirs(controller: str = 'cpu') -> List[str]:
+    """
+    Returns the cgroup directories that may hold the limits of this process
+    for a controller: the cgroup root (what a container sees) and the
+    process's own cgroup path from /proc/self/cgroup.
+
+    Args:
+        controller (str): 'cpu' or 'memory'. Defaults to 'cpu'.
+
+    Returns:
+        List[str]: Candidate directories, most specific first.
+    """
+    mounts = CGROUP_V1_MOUNTS[controller]
+    dirs = []
+    try:
+        with open(PROC_SELF_CGROUP, 'r') as f:
+            for line in f:
+                _, controllers, path = line.strip().split(':', 2)
+                path = path.lstrip('/')
+                if controllers == '':
+                    dirs.append(os.path.join(CGROUP_ROOT, path))
+                elif controller in controllers.split(','):
+                    for mount in mounts:
+                        dirs.append(os.path.join(CGROUP_ROOT, mount, path))
+    except (OSError, ValueError):
+        pass
+    dirs += [CGROUP_ROOT] + [os.path.join(CGROUP_ROOT, mount)
+                             for mount in mounts]
+    return list(dict.fromkeys(dirs))
+
+
+def read_cgroup_quota(directory: str) -> Optional[float]:
+    """
+    Reads the CPU quota of a cgroup directory, in CPUs.
+
+    Args:
+        directory (str): A cgroup v1 or v2 directory.
+
+    Returns:
+        Optional[float]: The quota (e.g. 0.6), or None if the directory sets
+        no quota.
+    """
+    try:
+        with open(os.path.join(directory, CGROUP_V2_CPU_MAX), 'r') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(directory, CGROUP_V1_QUOTA), 'r') as f:
+            quota = int(f.read())
+        with open(os.path.join(directory, CGROUP_V1_PERIOD), 'r') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def get_cgroup_cpu_limit() -> Optional[float]:
+    """
+    Returns the CPU quota imposed by cgroups (e.g. docker-compose 'cpus').
+
+    Returns:
+        Optional[float]: The tightest quota found, in CPUs, or None if the
+        process is not CPU limited.
+    """
+    quotas = [quota for quota in map(read_cgroup_quota, get_cgroup_dirs())
+              if quota is not None]
+    return min(quotas) if quotas else None
+
+
+def get_available_cpus() -> int:
+    """
+    Returns the number of CPUs this process may be scheduled on.
+
+    Returns:
+        int: Size of the affinity mask, or os.cpu_count() where affinity is
+        not supported.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_cpu_budget() -> Tuple[float, str]:
+    """
+    Returns how many CPUs the process can actually use: the smaller of its
+    affinity mask and its cgroup quota.
+
+    Returns:
+        Tuple[float, str]: The budget in CPUs and the constraint it comes
+        from ('cgroup quota' or 'affinity').
+    """
+    cpus = get_available_cpus()
+    quota = get_cgroup_cpu_limit()
+    if quota is not None and quota < cpus:
+        return quota, 'cgroup quota'
+    return float(cpus), 'affinity'
+
+
+def plan_workers(n_groups: int,
+                 workers: Union[int, str] = 'auto',
+                 threads_per_worker: Union[int, str] = 'auto'
+                 ) -> Dict[str, Any]:
+    """
+    Splits the CPU budget between training processes and the threads of
+    each process.
+
+    Whole CPUs go to separate workers first, since groups train
+    independently; threads are only added per worker when there are fewer
+    groups than CPUs. A fractional budget (e.g. 0.6) still gets one
+    single-threaded worker.
+
+    Args:
+        n_groups (int): Number of groups to train.
+        workers (Union[int, str]): Number of worker processes, or 'auto'.
+        threads_per_worker (Union[int, str]): Threads per worker for
+        TensorFlow and BLAS, or 'auto'.
+
+    Returns:
+        Dict[str, Any]: The CPU budget, where it comes from, and the
+        chosen number of workers and threads per worker.
+    """
+    budget, source = get_cpu_budget()
+    cpus = max(1, math.floor(budget))
+    if workers == 'auto':
+        workers = min(max(1, n_groups), cpus)
+    workers = max(1, int(workers))
+    if threads_per_worker == 'auto':
+        threads_per_worker = max(1, cpus // workers)
+    threads_per_worker = max(1, int(threads_per_worker))
+    return {
+        "cpu_budget": round(budget, 2),
+        "budget_source": source,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+    }
+
+
+def limit_threads(threads: int) -> None:
+    """
+    Caps the thread pools of TensorFlow, OpenMP and BLAS in the current
+    process. Must run before TensorFlow is imported; BLAS libraries that
+    are already loaded are limited through threadpoolctl.
+
+    Args:
+        threads (int): Maximum number of threads per pool.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    # Installed with scikit-learn
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=threads)
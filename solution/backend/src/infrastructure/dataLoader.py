@@ -1,25 +1,274 @@
 import pandas as pd
-from typing import Optional
+import numpy as np
+from pandas.api.types import union_categoricals
+from numpy.lib.format import open_memmap
+from typing import Optional, Dict, Any, List, Tuple
+import json
 import os
+import re
+from src.infrastructure.frameCodec import encode_frame, decode_frame
 
+# Columns stored as pandas categoricals to avoid one Python string per row
+CATEGORICAL_COLUMNS = ['id', 'item_id', 'dept_id',
+                       'cat_id', 'store_id', 'state_id']
+# Columns where float32 precision is plenty
+FLOAT32_COLUMNS = ['sell_price']
+# Daily unit sales columns (d_1 ... d_1913)
+DAY_COLUMN_PATTERN = re.compile(r'^d_\d+$')
+# Approximate number of values parsed per chunk when reading a CSV file
+CSV_CHUNK_CELLS = 4_000_000
 
-def load_csv_data(file_path: str) -> Optional[pd.DataFrame]:
+# Bump whenever the cache layout or the dtype policy changes
+CACHE_VERSION = 1
+CACHE_DIR_NAME = '.cache'
+
+
+def get_cache_dir(file_path: str) -> str:
+    """
+    Returns the directory holding the columnar cache of a CSV file.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+
+    Returns:
+        str: Cache directory, e.g. ./data/.cache/sales_train for
+        ./data/sales_train.csv.
+    """
+    directory, filename = os.path.split(file_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, CACHE_DIR_NAME, stem)
+
+
+def get_source_signature(file_path: str) -> Dict[str, Any]:
+    """
+    Returns the mtime and size of a source file, used to invalidate caches.
+
+    Args:
+        file_path (str): The path to the source file.
+
+    Returns:
+        Dict[str, Any]: Signature of the file.
+    """
+    stat = os.stat(file_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def get_csv_dtypes(header: List[str]) -> Dict[str, Any]:
+    """
+    Builds the dtype mapping passed to read_csv so that the compact dtypes
+    are produced directly by the parser instead of via float64/int64/object
+    intermediates.
+
+    Args:
+        header (List[str]): Column names of the CSV file.
+
+    Returns:
+        Dict[str, Any]: Column to dtype mapping.
+    """
+    dtypes: Dict[str, Any] = {}
+    for col in header:
+        if col in CATEGORICAL_COLUMNS:
+            dtypes[col] = 'category'
+        elif col in FLOAT32_COLUMNS:
+            dtypes[col] = np.float32
+        elif DAY_COLUMN_PATTERN.match(col):
+            dtypes[col] = np.int16
+    return dtypes
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts the remaining wide numeric columns of a loaded DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to downcast.
+
+    Returns:
+        pd.DataFrame: The DataFrame with integer columns downcast to the
+        smallest dtype able to hold them.
+    """
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col].dtype) and \
+                df[col].dtype.itemsize > 2:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def get_chunk_rows(n_columns: int) -> int:
+    """
+    Returns how many rows to parse per chunk so that a chunk holds roughly
+    CSV_CHUNK_CELLS values whatever the width of the file.
+
+    Args:
+        n_columns (int): Number of columns in the CSV file.
+
+    Returns:
+        int: Rows per chunk.
+    """
+    return max(1000, CSV_CHUNK_CELLS // max(1, n_columns))
+
+
+def combine_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates parsed chunks, unifying the categories of categorical
+    columns first so they stay categorical instead of falling back to object.
+
+    Args:
+        chunks (List[pd.DataFrame]): Chunks parsed from the same CSV file.
+
+    Returns:
+        pd.DataFrame: The combined DataFrame.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals(
+                [chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    data = pd.concat(chunks, ignore_index=True)
+    chunks.clear()
+    return data
+
+
+def read_csv_compact(file_path: str) -> pd.DataFrame:
+    """
+    Parses a CSV file straight into compact dtypes: int16 day columns,
+    categorical id columns and float32 prices.
+
+    The file is read in row chunks so the parser never holds the whole file
+    as int64/float64/object columns; each chunk is compacted before the next
+    one is read.
+
+    Args:
+        file_path (str): The path to the CSV file.
+
+    Returns:
+        pd.DataFrame: The parsed DataFrame.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns.tolist()
+    dtypes = get_csv_dtypes(header)
+    chunk_rows = get_chunk_rows(len(header))
+    chunks: List[pd.DataFrame] = []
+    try:
+        for chunk in pd.read_csv(file_path, dtype=dtypes,  # type: ignore
+                                 chunksize=chunk_rows):
+            chunks.append(compact_dtypes(chunk))
+    except (OverflowError, ValueError, TypeError):
+        # Values outside int16 (or missing values) in the day columns, fall
+        # back to letting pandas infer them and downcast chunk by chunk
+        dtypes = {col: dtype for col, dtype in dtypes.items()
+                  if not DAY_COLUMN_PATTERN.match(col)}
+        chunks = []
+        for chunk in pd.read_csv(file_path, dtype=dtypes,  # type: ignore
+                                 chunksize=chunk_rows):
+            chunks.append(compact_dtypes(chunk))
+    return combine_chunks(chunks)
+
+
+def write_cache(file_path: str, data: pd.DataFrame) -> None:
+    """
+    Writes a DataFrame to the columnar cache of its source CSV file.
+
+    Each block is stored as a .npy file so later loads can memory-map it. The
+    meta.json sidecar is written last, so a partially written cache is never
+    picked up.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        data (pd.DataFrame): The DataFrame parsed from the CSV file.
+    """
+    cache_dir = get_cache_dir(file_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    def allocate(name: str, shape: Tuple[int, ...],
+                 dtype: np.dtype) -> np.ndarray:
+        return open_memmap(os.path.join(cache_dir, f"{name}.npy"),
+                           mode='w+', dtype=dtype, shape=shape)
+
+    arrays, frame_meta = encode_frame(data, allocate=allocate)
+    for values in arrays.values():
+        values.flush()
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": get_source_signature(file_path),
+        "frame": frame_meta,
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+
+def load_cached_data(file_path: str) -> Optional[pd.DataFrame]:
+    """
+    Loads a CSV file from its columnar cache, memory-mapping the blocks.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+
+    Returns:
+        Optional[pd.DataFrame]: The cached DataFrame, or None if there is no
+        cache or the source file changed since it was written.
+    """
+    meta_path = os.path.join(get_cache_dir(file_path), 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    if meta.get('version') != CACHE_VERSION or \
+            meta.get('source') != get_source_signature(file_path):
+        return None
+
+    cache_dir = os.path.dirname(meta_path)
+    arrays = {
+        block['name']: np.load(
+            os.path.join(cache_dir, f"{block['name']}.npy"), mmap_mode='r')
+        for block in meta['frame']['blocks']}
+    return decode_frame(arrays, meta['frame'])
+
+
+def load_csv_data(file_path: str,
+                  use_cache: bool = True) -> Optional[pd.DataFrame]:
     """Loads CSV data from a given file path.
 
+    The first load converts the CSV into a columnar cache next to it (see
+    write_cache); later loads memory-map that cache until the CSV changes.
+
     Args:
         file_path (str): The path to the CSV file to be loaded.
+        use_cache (bool): Read from and write to the columnar cache.
+        Defaults to True.
 
     Returns:
         Optional[pd.DataFrame]: The loaded data as a pandas DataFrame or None.
     """
+    if use_cache:
+        try:
+            data = load_cached_data(file_path)
+            if data is not None:
+                print(f"Data loaded from cache for {file_path}")
+                return data
+        except Exception as e:
+            print(f"Ignoring unreadable cache for {file_path}: {e}")
+
     try:
-        data = pd.read_csv(file_path)  # type: ignore
+        data = read_csv_compact(file_path)
         print(f"Data loaded successfully from {file_path}")
-        return data
     except FileNotFoundError:
         print(f"File not found: {file_path}")
         return None
     except Exception as e:
-        print(f"""An error occurred while loading the data (CWD {os.getcwd()} 
+        print(f"""An error occurred while loading the data (CWD {os.getcwd()}
               File Path {file_path}): {e}""")
         return None
+
+    if use_cache:
+        try:
+            write_cache(file_path, data)
+        except Exception as e:
+            print(f"Could not write cache for {file_path}: {e}")
+    return data
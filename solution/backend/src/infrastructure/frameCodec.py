@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from numpy import ndarray
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Number of columns copied at a time when filling a numeric block
+COLUMN_CHUNK = 128
+
+
+def _column_kind(series: pd.Series) -> str:
+    """
+    Classifies a column into one of the storage kinds supported by the codec.
+
+    Args:
+        series (pd.Series): The column to classify.
+
+    Raises:
+        ValueError: If the column dtype cannot be stored as a plain array.
+
+    Returns:
+        str: 'category', 'object' or 'numeric'.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_object_dtype(series.dtype) or \
+            pd.api.types.is_string_dtype(series.dtype):
+        return 'object'
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return 'numeric'
+    raise ValueError(
+        f"Column {series.name} has unsupported dtype {series.dtype}")
+
+
+def _allocate_array(name: str, shape: Tuple[int, ...],
+                    dtype: np.dtype) -> ndarray:
+    """
+    Default block allocator of encode_frame: a plain in-memory array.
+    """
+    return np.empty(shape, dtype=dtype)
+
+
+def encode_frame(df: DataFrame,
+                 rows: Optional[ndarray] = None,
+                 allocate: Optional[Callable[..., ndarray]] = None) -> Tuple[
+                     Dict[str, ndarray], Dict[str, Any]]:
+    """
+    Splits a DataFrame into a few 2D numpy blocks plus a JSON-serialisable
+    description, so it can be written to disk or shared memory and rebuilt
+    without parsing.
+
+    Numeric columns are grouped into one block per dtype. Categorical and
+    string columns are stored as integer codes in a single block, with their
+    categories kept in the description.
+
+    Args:
+        df (DataFrame): The DataFrame to encode.
+        rows (Optional[ndarray]): Row positions to encode, in order. Defaults
+        to every row in the current order.
+        allocate (Optional[Callable[..., ndarray]]): Called as
+        allocate(name, shape, dtype) to create each block, e.g. to place it
+        in a memory-mapped file. Defaults to in-memory arrays.
+
+    Returns:
+        Tuple[Dict[str, ndarray], Dict[str, Any]]: Mapping of block name to
+        array of shape (rows, columns), and the frame description.
+    """
+    allocate = allocate or _allocate_array
+    n_rows = len(df) if rows is None else len(rows)
+    numeric: Dict[str, List[str]] = {}
+    coded: List[str] = []
+    categories: Dict[str, List[Any]] = {}
+    kinds: Dict[str, str] = {}
+    for col in df.columns:
+        kind = _column_kind(df[col])
+        kinds[str(col)] = kind
+        if kind == 'numeric':
+            numeric.setdefault(df[col].dtype.str, []).append(col)
+        else:
+            coded.append(col)
+
+    arrays: Dict[str, ndarray] = {}
+    blocks: List[Dict[str, Any]] = []
+    for i, (dtype, cols) in enumerate(numeric.items()):
+        name = f"numeric_{i}"
+        block = allocate(name, (n_rows, len(cols)), np.dtype(dtype))
+        # Copy a few columns at a time to bound the temporary memory used
+        for j in range(0, len(cols), COLUMN_CHUNK):
+            values = df[cols[j:j + COLUMN_CHUNK]].to_numpy(dtype=dtype)
+            block[:, j:j + COLUMN_CHUNK] = values if rows is None \
+                else values[rows]
+        arrays[name] = block
+        blocks.append({"name": name, "kind": "numeric",
+                       "columns": [str(col) for col in cols]})
+
+    if coded:
+        codes = allocate('codes', (n_rows, len(coded)), np.dtype(np.int32))
+        for j, col in enumerate(coded):
+            values = df[col]
+            if kinds[str(col)] == 'object':
+                values = values.astype('category')
+            column_codes = values.cat.codes.to_numpy()
+            codes[:, j] = column_codes if rows is None \
+                else column_codes[rows]
+            categories[str(col)] = values.cat.categories.tolist()
+        arrays['codes'] = codes
+        blocks.append({"name": "codes", "kind": "coded",
+                       "columns": [str(col) for col in coded]})
+
+    meta = {
+        "n_rows": n_rows,
+        "columns": [str(col) for col in df.columns],
+        "kinds": kinds,
+        "categories": categories,
+        "blocks": blocks,
+    }
+    return arrays, meta
+
+
+def _restore_column(meta: Dict[str, Any], col: str, values: ndarray) -> Any:
+    """
+    Rebuilds a single coded column from its integer codes.
+
+    Args:
+        meta (Dict[str, Any]): Frame description produced by encode_frame.
+        col (str): Name of the column.
+        values (ndarray): Integer codes of the column.
+
+    Returns:
+        Any: A Categorical, or an object array for string columns.
+    """
+    restored = pd.Categorical.from_codes(values, meta['categories'][col])
+    if meta['kinds'][col] == 'object':
+        return np.asarray(restored.astype(object))
+    return restored
+
+
+def decode_frame(arrays: Dict[str, ndarray],
+                 meta: Dict[str, Any]) -> DataFrame:
+    """
+    Rebuilds a DataFrame from the blocks produced by encode_frame.
+
+    The largest numeric block backs the DataFrame directly (no copy), so
+    memory-mapped or shared-memory arrays stay zero-copy for the bulk of the
+    data. Remaining columns are inserted at their original positions.
+
+    Args:
+        arrays (Dict[str, ndarray]): Mapping of block name to 2D array.
+        meta (Dict[str, Any]): Frame description produced by encode_frame.
+
+    Returns:
+        DataFrame: The reconstructed DataFrame.
+    """
+    position = {col: i for i, col in enumerate(meta['columns'])}
+    numeric_blocks = [block for block in meta['blocks']
+                      if block['kind'] == 'numeric']
+    base = max(numeric_blocks, key=lambda block: len(block['columns']),
+               default=None)
+
+    if base is None:
+        df = DataFrame(index=pd.RangeIndex(meta['n_rows']))
+    else:
+        df = DataFrame(arrays[base['name']], columns=base['columns'],
+                       copy=False)
+
+    pending = []
+    for block in meta['blocks']:
+        if block is base:
+            continue
+        values = arrays[block['name']]
+        for j, col in enumerate(block['columns']):
+            if block['kind'] == 'coded':
+                column = _restore_column(meta, col, values[:, j])
+            else:
+                column = values[:, j]
+            pending.append((position[col], col, column))
+
+    for loc, col, column in sorted(pending, key=lambda item: item[0]):
+        df.insert(loc, col, column)
+    return df
+
+
+def get_row_mask(arrays: Dict[str, ndarray], meta: Dict[str, Any],
+                 filters: Dict[str, Any]) -> ndarray:
+    """
+    Finds the rows whose columns equal the given values, from the encoded
+    blocks alone (a category is matched by its code).
+
+    Args:
+        arrays (Dict[str, ndarray]): Mapping of block name to 2D array.
+        meta (Dict[str, Any]): Frame description produced by encode_frame.
+        filters (Dict[str, Any]): Required value of some columns.
+
+    Raises:
+        KeyError: If a filtered column is not in the frame.
+
+    Returns:
+        ndarray: Boolean mask of the matching rows.
+    """
+    mask = np.ones(meta['n_rows'], dtype=bool)
+    for col, value in filters.items():
+        block = next((block for block in meta['blocks']
+                      if col in block['columns']), None)
+        if block is None:
+            raise KeyError(col)
+        values = arrays[block['name']][:, block['columns'].index(col)]
+        if block['kind'] == 'coded':
+            categories = meta['categories'][col]
+            if value not in categories:
+                return np.zeros(meta['n_rows'], dtype=bool)
+            value = categories.index(value)
+        mask &= values == value
+    return mask
+
+
+def select_frame(arrays: Dict[str, ndarray], meta: Dict[str, Any],
+                 rows: Optional[ndarray] = None,
+                 columns: Optional[List[str]] = None) -> DataFrame:
+    """
+    Rebuilds only some rows and columns of an encoded DataFrame: the blocks
+    are sliced first, so the rest of the data is never decoded.
+
+    Args:
+        arrays (Dict[str, ndarray]): Mapping of block name to 2D array.
+        meta (Dict[str, Any]): Frame description produced by encode_frame.
+        rows (Optional[ndarray]): Row positions (or boolean mask) to keep.
+        Defaults to every row.
+        columns (Optional[List[str]]): Columns to keep; they come back in
+        the frame's own order. Defaults to every column.
+
+    Returns:
+        DataFrame: The selected rows and columns, with a new RangeIndex.
+    """
+    if rows is not None:
+        rows = np.asarray(rows)
+        rows = np.flatnonzero(rows) if rows.dtype == bool \
+            else rows.astype(np.intp)
+    wanted = set(meta['columns'] if columns is None else columns)
+    selected: Dict[str, ndarray] = {}
+    blocks = []
+    for block in meta['blocks']:
+        positions = [j for j, col in enumerate(block['columns'])
+                     if col in wanted]
+        if not positions:
+            continue
+        values = arrays[block['name']]
+        selected[block['name']] = values[:, positions] if rows is None \
+            else values[np.ix_(rows, positions)]
+        blocks.append({**block,
+                       "columns": [block['columns'][j] for j in positions]})
+    n_rows = meta['n_rows'] if rows is None else len(rows)
+    return decode_frame(selected, {
+        **meta, "n_rows": n_rows, "blocks": blocks,
+        "columns": [col for col in meta['columns'] if col in wanted]})
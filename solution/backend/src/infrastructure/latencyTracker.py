@@ -0,0 +1,47 @@
+import threading
+from collections import deque
+from typing import Dict
+import numpy as np
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent request durations of an endpoint and reports
+    their percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window (int): Number of most recent samples kept. Defaults to
+            1000.
+        """
+        self.samples: deque = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Records the duration of one request.
+
+        Args:
+            seconds (float): Duration in seconds.
+        """
+        with self.lock:
+            self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns the p50/p99 latency over the recorded window.
+
+        Returns:
+            Dict[str, float]: Sample count and percentiles in milliseconds.
+        """
+        with self.lock:
+            samples = np.array(self.samples) * 1000
+        if len(samples) == 0:
+            return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0}
+        return {
+            "count": int(len(samples)),
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p99_ms": float(np.percentile(samples, 99)),
+        }
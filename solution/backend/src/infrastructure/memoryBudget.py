@@ -0,0 +1,236 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+from src.infrastructure.cpuBudget import get_cgroup_dirs
+
+# cgroup v2 exposes the limit in bytes (or "max") in memory.max
+CGROUP_V2_MEMORY_MAX = 'memory.max'
+# cgroup v1 exposes the limit in memory.limit_in_bytes; an unlimited cgroup
+# reports a huge page-aligned number instead of "max"
+CGROUP_V1_MEMORY_LIMIT = 'memory.limit_in_bytes'
+CGROUP_V1_UNLIMITED = 2 ** 60
+
+# Memory of an idle training worker when 'worker_base_mb' is 'auto' and it
+# cannot be measured (see workflow.get_worker_base_mb): the peak RSS
+# (VmHWM) of workflow.probe_worker with TensorFlow 2.21 on Linux x86-64,
+# 831 MB, of which about 400 MB are pages of the shared libraries
+DEFAULT_WORKER_BASE_MB = 830
+
+# Memory a per-group Keras model adds to its worker, on top of an idle
+# worker. Calibrated with the --memory-levels 1,3,4 run of
+# benchmarks/runBenchmarks.py (bench_memory): each group of 100 to 1000
+# synthetic series is trained for one epoch by run_model, alone in a fresh
+# single-threaded worker, over 1913 and 956 days; the peak RSS of an idle
+# worker is subtracted from the worker's peak RSS, and the constants below
+# are the least-squares fit of the 28 runs (fit_memory_model), within 5 MB
+# of every run. Re-run it after changing the model, the batch size or
+# N_TRAINING, or upgrading TensorFlow.
+# - per group: the saved model, the validation frames of evaluate_model
+# and the TensorFlow state of a model larger than the probe's
+GROUP_BYTES = 36 * 1024 ** 2
+# - per series and day: the float64 frames of preProcessing.process
+# (exogenous merge, scaling, train and validation concatenation)
+SERIES_DAY_BYTES = 39
+# - per series: the windows of each batch (28 input days), and the
+# weights, gradients and Adam moments of the layers sized by the number of
+# series (conv1, dense)
+SERIES_BYTES = 1300
+
+
+def read_cgroup_memory_limit(directory: str) -> Optional[int]:
+    """
+    Reads the memory limit of a cgroup directory.
+
+    Args:
+        directory (str): A cgroup v1 or v2 directory.
+
+    Returns:
+        Optional[int]: The limit in bytes, or None if the directory sets
+        no limit.
+    """
+    try:
+        with open(os.path.join(directory, CGROUP_V2_MEMORY_MAX), 'r') as f:
+            limit = f.read().strip()
+        return None if limit == 'max' else int(limit)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(directory, CGROUP_V1_MEMORY_LIMIT), 'r') as f:
+            limit = int(f.read())
+        return limit if limit < CGROUP_V1_UNLIMITED else None
+    except (OSError, ValueError):
+        return None
+
+
+def get_cgroup_memory_limit() -> Optional[int]:
+    """
+    Returns the memory limit imposed by cgroups (e.g. docker-compose
+    'memory').
+
+    Returns:
+        Optional[int]: The tightest limit found, in bytes, or None if the
+        process is not memory limited.
+    """
+    limits = [limit for limit in map(read_cgroup_memory_limit,
+                                     get_cgroup_dirs('memory'))
+              if limit is not None]
+    return min(limits) if limits else None
+
+
+def get_physical_memory() -> int:
+    """
+    Returns:
+        int: Physical memory of the machine in bytes.
+    """
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+
+def get_memory_budget(memory_budget_mb: Union[int, str] = 'auto'
+                      ) -> Tuple[float, str]:
+    """
+    Returns how much memory the process and its training workers may use
+    together.
+
+    Args:
+        memory_budget_mb (Union[int, str]): Budget in MB, or 'auto' for
+        the cgroup limit, else the physical memory.
+
+    Returns:
+        Tuple[float, str]: The budget in MB and where it comes from
+        ('config', 'cgroup limit' or 'physical memory').
+    """
+    if memory_budget_mb != 'auto':
+        return float(memory_budget_mb), 'config'
+    limit = get_cgroup_memory_limit()
+    if limit is not None:
+        return limit / 1024 ** 2, 'cgroup limit'
+    return get_physical_memory() / 1024 ** 2, 'physical memory'
+
+
+def estimate_group_mb(n_series: int, n_days: int) -> float:
+    """
+    Estimates the peak memory training a group's Keras model adds to an
+    idle worker (see the calibration of GROUP_BYTES, SERIES_DAY_BYTES and
+    SERIES_BYTES).
+
+    Args:
+        n_series (int): Number of series of the group.
+        n_days (int): Number of sales days.
+
+    Returns:
+        float: The estimate in MB.
+    """
+    return (GROUP_BYTES + n_series * (n_days * SERIES_DAY_BYTES +
+                                      SERIES_BYTES)) / 1024 ** 2
+
+
+class MemoryAdmission:
+    """
+    Decides which groups may start training without the workers exceeding
+    the memory budget.
+
+    The memory of the workers is the larger of what is committed (the
+    fixed cost of every started worker plus the estimate of every running
+    group) and what is measured (their live private RSS). The estimates
+    cover a group that has just started, the measurements cover workers
+    that grow beyond their estimates, e.g. as TensorFlow keeps state from
+    one group to the next.
+    """
+
+    def __init__(self, budget_mb: float, reserved_mb: float,
+                 worker_base_mb: float, max_workers: int):
+        """
+        Args:
+            budget_mb (float): Memory budget of the process and its workers.
+            reserved_mb (float): Part of the budget kept for this process
+            (the API) and as headroom.
+            worker_base_mb (float): Peak memory of an idle worker that
+            has loaded TensorFlow (see workflow.get_worker_base_mb).
+            max_workers (int): Number of worker processes.
+        """
+        self.budget_mb = budget_mb
+        self.reserved_mb = reserved_mb
+        self.worker_base_mb = worker_base_mb
+        self.max_workers = max_workers
+        # Estimate of every admitted group still running, by group name
+        self.running: Dict[Any, float] = {}
+        self.started_workers = 0
+        self.lock = threading.Lock()
+
+    def fits_alone(self, estimate_mb: float) -> bool:
+        """
+        Checks whether a group can ever be admitted, i.e. with no other
+        group running.
+
+        Args:
+            estimate_mb (float): Estimate of the group (estimate_group_mb).
+
+        Returns:
+            bool: True if a single worker training it fits the budget.
+        """
+        return self.reserved_mb + self.worker_base_mb + estimate_mb <= \
+            self.budget_mb
+
+    def get_usage_mb(self, live_workers_mb: List[float]) -> float:
+        """
+        Returns the memory counted against the budget.
+
+        Args:
+            live_workers_mb (List[float]): Private RSS of every live worker.
+
+        Returns:
+            float: Reserved memory plus the larger of the committed and the
+            measured memory of the workers, in MB.
+        """
+        with self.lock:
+            committed = self.started_workers * self.worker_base_mb + \
+                sum(self.running.values())
+        return self.reserved_mb + max(committed, sum(live_workers_mb))
+
+    def is_full(self) -> bool:
+        """
+        Returns:
+            bool: True if every worker is busy.
+        """
+        with self.lock:
+            return len(self.running) >= self.max_workers
+
+    def try_admit(self, group_name: Any, estimate_mb: float,
+                  live_workers_mb: List[float]) -> bool:
+        """
+        Admits a group if a worker is free and the group fits next to the
+        running ones. A group that does not fit alone is admitted only when
+        nothing else runs.
+
+        Args:
+            group_name (Any): Name of the group.
+            estimate_mb (float): Estimate of the group (estimate_group_mb).
+            live_workers_mb (List[float]): Private RSS of every live worker.
+
+        Returns:
+            bool: True if the group was admitted.
+        """
+        usage_mb = self.get_usage_mb(live_workers_mb)
+        with self.lock:
+            if len(self.running) >= self.max_workers:
+                return False
+            # The pool starts a new worker when none is idle
+            new_worker = len(self.running) >= self.started_workers
+            cost_mb = estimate_mb + \
+                (self.worker_base_mb if new_worker else 0.0)
+            if self.running and usage_mb + cost_mb > self.budget_mb:
+                return False
+            self.running[group_name] = estimate_mb
+            self.started_workers += int(new_worker)
+            return True
+
+    def release(self, group_name: Any) -> None:
+        """
+        Releases the estimate of a group that finished, failed or was
+        cancelled. Its worker stays started.
+
+        Args:
+            group_name (Any): Name of the group.
+        """
+        with self.lock:
+            self.running.pop(group_name, None)
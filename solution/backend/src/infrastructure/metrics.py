@@ -0,0 +1,275 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from fastapi import APIRouter, Response
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Upper bounds in seconds of the histogram buckets: API requests take
+# milliseconds, training stages take up to hours
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0,
+                 900.0, 3600.0)
+# Route label of requests that matched no endpoint, so that unknown paths
+# do not create new series
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def format_labels(label_names: Sequence[str], values: Tuple[str, ...],
+                  extra: str = '') -> str:
+    """
+    Formats the labels of a sample, e.g. {stage="fit",le="1.0"}.
+
+    Args:
+        label_names (Sequence[str]): Names of the labels.
+        values (Tuple[str, ...]): Values of the labels, in the same order.
+        extra (str): Already formatted label appended last, e.g. le.
+
+    Returns:
+        str: The label set, empty if there are no labels.
+    """
+    pairs = [f'{name}="{escape(value)}"'
+             for name, value in zip(label_names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def escape(value: str) -> str:
+    """
+    Escapes a label value for the text exposition format.
+    """
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+
+class Counter:
+    """
+    A thread-safe counter with labels.
+    """
+
+    def __init__(self, name: str, description: str,
+                 label_names: Sequence[str] = ()):
+        """
+        Args:
+            name (str): Metric name, ending with _total.
+            description (str): Help text.
+            label_names (Sequence[str]): Names of the labels.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increments the counter of a label set.
+
+        Args:
+            amount (float): Increment. Defaults to 1.
+            **labels (str): Value of every label.
+        """
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The metric in the text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(
+                    f"{self.name}{format_labels(self.label_names, key)} " +
+                    f"{value:g}")
+        return lines
+
+
+class Histogram:
+    """
+    A thread-safe histogram with labels and fixed buckets.
+    """
+
+    def __init__(self, name: str, description: str,
+                 label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        """
+        Args:
+            name (str): Metric name, ending with the unit, e.g. _seconds.
+            description (str): Help text.
+            label_names (Sequence[str]): Names of the labels.
+            buckets (Sequence[float]): Increasing upper bounds of the
+            buckets; +Inf is implied.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label set: count of each bucket (not cumulative), sum, count
+        self.values: Dict[Tuple[str, ...], List] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value, e.g. a duration.
+            **labels (str): Value of every label.
+        """
+        key = tuple(str(labels[name]) for name in self.label_names)
+        bucket = next((i for i, bound in enumerate(self.buckets)
+                       if value <= bound), len(self.buckets))
+        with self.lock:
+            counts, total, count = self.values.get(
+                key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            counts[bucket] += 1
+            self.values[key] = [counts, total + value, count + 1]
+
+    def render(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The metric in the text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(
+                        [f"{bound:g}" for bound in self.buckets] + ['+Inf'],
+                        counts):
+                    cumulative += bucket_count
+                    labels = format_labels(self.label_names, key,
+                                           f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {total:.6f}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class StageTimer:
+    """
+    Accumulates the seconds spent in the named stages of a run or of a
+    group. The timings are a plain dict, so training workers return them to
+    the API process with the result of their task.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """
+        Times a block and adds its duration to the stage, even if the block
+        raises.
+
+        Args:
+            stage (str): Name of the stage, e.g. 'fit'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        Adds a duration measured elsewhere to a stage.
+
+        Args:
+            stage (str): Name of the stage.
+            seconds (float): Duration in seconds.
+        """
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: The stages and their durations, e.g. 'process 1.20s, fit
+            30.02s'.
+        """
+        return ', '.join(f"{stage} {seconds:.2f}s"
+                         for stage, seconds in self.seconds.items())
+
+
+# Metrics of this process. Training workers do not record here: the API
+# process records the stage timings they return.
+STAGE_SECONDS = Histogram(
+    'm5_stage_seconds',
+    'Time spent in each stage of the training pipeline, per run for the '
+    'data stages and per group for the model stages.',
+    ['stage', 'model_type'], STAGE_BUCKETS)
+GROUPS = Counter(
+    'm5_training_groups_total',
+    'Groups that reached a final state in a training job.', ['state'])
+JOBS = Counter(
+    'm5_training_jobs_total',
+    'Training jobs that finished, by final state.', ['state'])
+REQUEST_SECONDS = Histogram(
+    'm5_http_request_duration_seconds',
+    'Time until the API sends the response headers, by route template.',
+    ['method', 'route', 'status'], REQUEST_BUCKETS)
+METRICS = [STAGE_SECONDS, GROUPS, JOBS, REQUEST_SECONDS]
+
+
+def record_stages(stages: Dict[str, float], model_type: str) -> None:
+    """
+    Adds the stage timings of a run or of a group to STAGE_SECONDS.
+
+    Args:
+        stages (Dict[str, float]): Seconds per stage, see StageTimer.
+        model_type (str): Model type of the run.
+    """
+    for stage, seconds in stages.items():
+        STAGE_SECONDS.observe(seconds, stage=stage, model_type=model_type)
+
+
+def record_request(method: str, route: Optional[str], status: int,
+                   seconds: float) -> None:
+    """
+    Adds the latency of an API request to REQUEST_SECONDS.
+
+    Args:
+        method (str): HTTP method.
+        route (Optional[str]): Path template of the matched endpoint, e.g.
+        /api/trainingJobs/{job_id}; None if no endpoint matched.
+        status (int): Status code of the response.
+        seconds (float): Time until the response headers.
+    """
+    REQUEST_SECONDS.observe(seconds, method=method,
+                            route=route or UNMATCHED_ROUTE,
+                            status=str(status))
+
+
+def render() -> str:
+    """
+    Renders every metric of this process in the Prometheus text exposition
+    format.
+
+    Returns:
+        str: The metrics.
+    """
+    return '\n'.join(line for metric in METRICS
+                     for line in metric.render()) + '\n'
+
+
+@router.get("/api/metrics")
+def fetch_metrics() -> Response:
+    """
+    Exposes the stage timings of the training runs, the training job and
+    group counters and the API request latencies for Prometheus.
+
+    Returns:
+        Response: The metrics in the text exposition format.
+    """
+    return Response(content=render(), media_type=CONTENT_TYPE)
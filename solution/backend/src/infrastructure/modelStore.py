@@ -0,0 +1,309 @@
+import os
+import json
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame
+from src.domain import inference
+from src.infrastructure.resultsStore import get_group_path
+
+# Directory where trained models are persisted, one sub-directory per group
+MODELS_DIR = './results/models'
+# Weights of a model exported for the numpy runtime (see domain.inference),
+# served instead of the Keras model when present
+WEIGHTS_FILE = 'weights.npz'
+# Version of the files of a model directory; a model stored in another
+# format has no training key, so its group is retrained
+MODEL_FORMAT = 2
+# Suffixes of the directories save_model writes and replaces; group names
+# are tuples and end with ')'
+TMP_SUFFIX = '.tmp'
+OLD_SUFFIX = '.old'
+
+
+def get_model_dir(group_name: str) -> str:
+    """
+    Returns the directory holding the artifacts of a group's model.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Raises:
+        ValueError: If the group name is not valid (see
+        resultsStore.get_group_path).
+
+    Returns:
+        str: The model directory.
+    """
+    return get_group_path(MODELS_DIR, group_name)
+
+
+def save_model(group_name: str,
+               model: Any,
+               scaler: Any,
+               last_window: ndarray,
+               future_days: List[str],
+               future_exogenous: ndarray,
+               series_df: DataFrame,
+               training_key: Optional[str] = None,
+               quantization: Optional[str] = 'float32') -> None:
+    """
+    Persists a trained model with everything needed to forecast from it,
+    and exports its weights for the numpy runtime.
+
+    Args:
+        group_name (str): Name of the model group.
+        model (Any): Trained Keras model.
+        scaler (Any): MinMaxScaler fitted on the group's training data;
+        only its scale_ and min_ arrays are stored.
+        last_window (ndarray): Last n_training scaled days of the group.
+        future_days (List[str]): Names of the days following the data.
+        future_exogenous (ndarray): Exogenous features of those days.
+        series_df (DataFrame): Identifier columns of the group's series.
+        training_key (Optional[str]): Content address of the inputs the
+        model was trained on (see domain.trainingKey).
+        quantization (Optional[str]): Precision of the exported weights,
+        one of inference.QUANTIZATIONS; None skips the export. Defaults to
+        float32.
+    """
+    model_dir = get_model_dir(group_name)
+    # Written next to the model directory and swapped in whole, so that a
+    # crash or a cancelled job never pairs a new model with an old scaler
+    # or metadata
+    tmp_dir = f"{model_dir}{TMP_SUFFIX}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    model.save(os.path.join(tmp_dir, 'model.keras'))
+    if quantization is not None:
+        try:
+            inference.export_model(model, os.path.join(tmp_dir, WEIGHTS_FILE),
+                                   quantization)
+        except ValueError as exc:
+            # The Keras model is still served
+            print(f"Not exporting the weights of {group_name}: {exc}")
+    np.savez(os.path.join(tmp_dir, 'artifacts.npz'),
+             last_window=last_window,
+             future_exogenous=future_exogenous,
+             scaler_scale=scaler.scale_,
+             scaler_min=scaler.min_)
+    meta = {
+        "format": MODEL_FORMAT,
+        "future_days": future_days,
+        "series": series_df.astype(str).to_dict(orient='list'),
+        "training_key": training_key,
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    replace_dir(tmp_dir, model_dir)
+
+
+def replace_dir(src: str, dst: str) -> None:
+    """
+    Moves a complete directory into place, replacing any previous one.
+
+    A directory cannot be renamed over a non-empty one, so the previous
+    directory is first renamed aside: a crash in between leaves no model
+    (the group is retrained) rather than a mixed one.
+
+    Args:
+        src (str): The new directory.
+        dst (str): Its final path.
+    """
+    old_dir = f"{dst}{OLD_SUFFIX}"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(dst):
+        os.replace(dst, old_dir)
+    os.replace(src, dst)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def get_training_key(group_name: str) -> Optional[str]:
+    """
+    Returns the training key a group's persisted model was trained with.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[str]: The key, or None if the group has no model or it
+        predates training keys or MODEL_FORMAT.
+    """
+    meta_path = os.path.join(get_model_dir(group_name), 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    if meta.get('format') != MODEL_FORMAT:
+        return None
+    return meta.get('training_key')
+
+
+def load_model_artifacts(group_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Loads a persisted model and its forecasting artifacts from disk. The
+    exported weights are run with the numpy runtime when present, so that
+    forecasting does not load TensorFlow; the Keras model is the fallback.
+    The scaler is rebuilt from its stored arrays, nothing is unpickled.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[Dict[str, Any]]: The model, scaler, last window, future
+        exogenous features and metadata, or None if the group has no model
+        in MODEL_FORMAT.
+    """
+    model_dir = get_model_dir(group_name)
+    model_path = os.path.join(model_dir, 'model.keras')
+    if not os.path.exists(model_path):
+        return None
+
+    with open(os.path.join(model_dir, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('format') != MODEL_FORMAT:
+        return None
+    with np.load(os.path.join(model_dir, 'artifacts.npz')) as artifacts:
+        last_window = artifacts['last_window']
+        future_exogenous = artifacts['future_exogenous']
+        scaler = inference.MinMaxScaling(artifacts['scaler_scale'],
+                                         artifacts['scaler_min'])
+
+    weights_path = os.path.join(model_dir, WEIGHTS_FILE)
+    if os.path.exists(weights_path):
+        model = inference.load_model(weights_path)
+        model_bytes = model.nbytes
+    else:
+        # Imported here so that serving stored results does not load
+        # TensorFlow
+        from keras.models import load_model
+
+        model = load_model(model_path)
+        model_bytes = sum(w.nbytes for w in model.get_weights())
+    return {
+        "model": model,
+        "scaler": scaler,
+        "last_window": last_window,
+        "future_exogenous": future_exogenous,
+        "meta": meta,
+        "nbytes": model_bytes + last_window.nbytes + future_exogenous.nbytes,
+    }
+
+
+def list_models() -> List[str]:
+    """
+    Returns:
+        List[str]: Names of every directory of the model store, including
+        those left by an interrupted save_model.
+    """
+    if not os.path.isdir(MODELS_DIR):
+        return []
+    return os.listdir(MODELS_DIR)
+
+
+def remove_models() -> None:
+    """
+    Removes every persisted model.
+    """
+    if os.path.exists(MODELS_DIR):
+        shutil.rmtree(MODELS_DIR)
+
+
+def remove_model(group_name: str) -> None:
+    """
+    Removes the persisted model of a group, if any.
+
+    Args:
+        group_name (str): Name of the model group.
+    """
+    model_dir = get_model_dir(group_name)
+    if os.path.exists(model_dir):
+        shutil.rmtree(model_dir)
+
+
+class ModelCache:
+    """
+    A thread-safe LRU cache of loaded models, bounded both by the number of
+    models and by the total size of their weights.
+    """
+
+    def __init__(self, max_models: int, max_bytes: int):
+        """
+        Args:
+            max_models (int): Maximum number of models kept in memory.
+            max_bytes (int): Maximum total size of the cached weights.
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, group_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the artifacts of a group, loading them from disk on a miss.
+
+        Args:
+            group_name (str): Name of the model group.
+
+        Returns:
+            Optional[Dict[str, Any]]: The artifacts (see
+            load_model_artifacts), or None if the group has no model.
+        """
+        with self.lock:
+            if group_name in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(group_name)
+                return self.entries[group_name]
+            self.misses += 1
+
+        artifacts = load_model_artifacts(group_name)
+        if artifacts is None:
+            return None
+
+        with self.lock:
+            if group_name not in self.entries:
+                self.entries[group_name] = artifacts
+                self.total_bytes += artifacts['nbytes']
+                self.evict()
+        return artifacts
+
+    def evict(self) -> None:
+        """
+        Drops least recently used models until the cache fits its budget.
+        The most recently used model is always kept.
+        """
+        while len(self.entries) > 1 and (
+                len(self.entries) > self.max_models or
+                self.total_bytes > self.max_bytes):
+            _, artifacts = self.entries.popitem(last=False)
+            self.total_bytes -= artifacts['nbytes']
+
+    def clear(self) -> None:
+        """
+        Drops every cached model, e.g. after retraining.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache occupancy and hit/miss counters.
+
+        Returns:
+            Dict[str, Any]: Cache statistics.
+        """
+        with self.lock:
+            return {
+                "models": len(self.entries),
+                "max_models": self.max_models,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
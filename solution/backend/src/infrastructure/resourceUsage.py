@@ -0,0 +1,117 @@
+import resource
+import sys
+from typing import Any, Dict, List, Tuple, Union
+
+
+def get_peak_rss_mb(include_children: bool = False) -> float:
+    """
+    Returns the peak resident set size of this process in megabytes.
+
+    Args:
+        include_children (bool): Report the largest terminated child process
+        (e.g. pool workers) instead of this process. Defaults to False.
+
+    Returns:
+        float: Peak RSS in MB.
+    """
+    if not include_children:
+        # On Linux ru_maxrss survives fork and exec, so a freshly spawned
+        # process would report the peak of its parent; VmHWM is its own
+        try:
+            with open('/proc/self/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    who = resource.RUSAGE_CHILDREN if include_children else \
+        resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def get_private_rss_mb(pid: Union[int, str] = 'self') -> float:
+    """
+    Returns the current anonymous (private) resident memory of a process
+    in megabytes. Unlike VmRSS it leaves out the pages of mapped files,
+    such as the TensorFlow libraries, which every worker shares and which
+    the kernel can reclaim, so it is what a process adds towards an
+    out-of-memory kill.
+
+    Args:
+        pid (Union[int, str]): Process id. Defaults to this process.
+
+    Returns:
+        float: Private RSS in MB (VmRSS on kernels without RssAnon), 0 if
+        the process is gone.
+    """
+    values = {}
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith(('RssAnon:', 'RssShmem:', 'VmRSS:')):
+                    name, value = line.split(':', 1)
+                    values[name] = int(value.split()[0]) / 1024
+    except (OSError, ValueError):
+        return 0.0
+    if 'RssAnon' in values:
+        return values['RssAnon'] + values.get('RssShmem', 0.0)
+    return values.get('VmRSS', 0.0)
+
+
+def report_peak_rss(stage: str) -> float:
+    """
+    Prints and returns the peak RSS of this process after a given stage.
+
+    Args:
+        stage (str): Name of the stage, used in the printed message.
+
+    Returns:
+        float: Peak RSS in MB.
+    """
+    peak = get_peak_rss_mb()
+    print(f"Peak RSS after {stage}: {peak:.1f} MB")
+    return peak
+
+
+# Modules only the training workers need; the API process must not load
+# them just to serve health checks, configuration and stored results
+TRAINING_MODULES = ('tensorflow', 'keras', 'sklearn', 'torch')
+
+
+def get_loaded_modules(modules: Tuple[str, ...] = TRAINING_MODULES
+                       ) -> List[str]:
+    """
+    Returns which of the given top-level modules this process has imported.
+
+    Args:
+        modules (Tuple[str, ...]): Top-level module names. Defaults to
+        TRAINING_MODULES.
+
+    Returns:
+        List[str]: The imported ones.
+    """
+    return [module for module in modules if module in sys.modules]
+
+
+def report_startup(seconds: float) -> Dict[str, Any]:
+    """
+    Prints and returns the start-up cost of this process: import time,
+    peak RSS and the training modules it has loaded.
+
+    Args:
+        seconds (float): Time spent importing the application.
+
+    Returns:
+        Dict[str, Any]: seconds, peak_mb and training_modules.
+    """
+    startup = {"seconds": round(seconds, 3),
+               "peak_mb": round(get_peak_rss_mb(), 1),
+               "training_modules": get_loaded_modules()}
+    print(f"Started in {startup['seconds']:.2f}s, peak RSS " +
+          f"{startup['peak_mb']:.1f} MB, training modules loaded: " +
+          f"{', '.join(startup['training_modules']) or 'none'}")
+    return startup
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def get_signature(paths: List[str]) -> Tuple[Any, ...]:
+    """
+    Returns the (path, mtime, size) signature of files or directories.
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed in it.
+
+    Args:
+        paths (List[str]): Files or directories a cached value depends on.
+
+    Returns:
+        Tuple[Any, ...]: The signature; missing paths have no mtime/size.
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def get_etag(signature: Tuple[Any, ...]) -> str:
+    """
+    Derives a strong ETag from a file signature.
+
+    Args:
+        signature (Tuple[Any, ...]): Signature returned by get_signature.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.sha1(repr(signature).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match request header against an ETag.
+
+    Args:
+        if_none_match (Optional[str]): Value of the If-None-Match header.
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: True if the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or \
+        f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """
+    A thread-safe LRU cache of rendered responses built from files. An entry
+    is reused only while the mtime and size of its files are unchanged.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """
+        Args:
+            max_entries (int): Maximum number of cached responses.
+            max_bytes (int): Maximum total size of the cached responses.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, paths: List[str],
+            render: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """
+        Returns the cached response for key, re-rendering it if any of its
+        files changed since it was cached.
+
+        Args:
+            key (Hashable): Cache key, e.g. the endpoint and its parameters.
+            paths (List[str]): Files or directories the response is built
+            from.
+            render (Callable[[], bytes]): Builds the response body.
+
+        Returns:
+            Tuple[bytes, str]: The response body and its ETag.
+        """
+        signature = get_signature(paths)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry['signature'] == signature:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry['body'], entry['etag']
+            self.misses += 1
+
+        body = render()
+        etag = get_etag(signature)
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous['body'])
+            self.entries[key] = {
+                "signature": signature, "body": body, "etag": etag}
+            self.total_bytes += len(body)
+            while len(self.entries) > 1 and (
+                    len(self.entries) > self.max_entries or
+                    self.total_bytes > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted['body'])
+        return body, etag
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache occupancy and hit/miss counters.
+
+        Returns:
+            Dict[str, Any]: Cache statistics.
+        """
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
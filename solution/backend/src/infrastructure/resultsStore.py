@@ -0,0 +1,492 @@
+import os
+import json
+import glob
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from src.infrastructure.frameCodec import (COLUMN_CHUNK, encode_frame,
+                                          decode_frame, get_row_mask,
+                                          select_frame)
+
+# Directory where the per-group results are stored
+RESULTS_DIR = './results'
+# Typed arrays of the validation actuals and predictions of a group
+ARRAYS_SUFFIX = '_results.npz'
+# Small JSON index describing the arrays of a group
+INDEX_SUFFIX = '_results.index.json'
+# Frames stored per group, in the order they are returned by load_results
+FRAMES = ['valid_df', 'pred_df']
+# Model level of the stored results and the names of its groups
+LEVEL_FILE = 'level.json'
+
+
+def is_valid_group_name(group_name: Any) -> bool:
+    """
+    Checks that a group name, which may come from a request, names a file
+    directly inside a store directory: no path separator, no '.' or '..'.
+
+    Args:
+        group_name (Any): Name of the model group, e.g. "('FOODS',)".
+
+    Returns:
+        bool: True if the name can be used in a path.
+    """
+    name = str(group_name)
+    separators = [sep for sep in (os.sep, os.altsep, '\0') if sep]
+    return name not in ('', '.', '..') and \
+        not any(sep in name for sep in separators)
+
+
+def get_group_path(directory: str, group_name: Any, suffix: str = '') -> str:
+    """
+    Returns the path of a group's file or directory inside a store
+    directory.
+
+    Args:
+        directory (str): The store directory.
+        group_name (Any): Name of the model group.
+        suffix (str): Appended to the group name, e.g. ARRAYS_SUFFIX.
+
+    Raises:
+        ValueError: If the name could point outside the directory (see
+        is_valid_group_name).
+
+    Returns:
+        str: The path.
+    """
+    if not is_valid_group_name(group_name):
+        raise ValueError(f"Invalid group name {str(group_name)!r}")
+    return os.path.join(directory, f"{group_name}{suffix}")
+
+
+def get_paths(group_name: str) -> Tuple[str, str]:
+    """
+    Returns the array file and the index file of a group.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Raises:
+        ValueError: If the group name is not valid (see get_group_path).
+
+    Returns:
+        Tuple[str, str]: Paths of the .npz arrays and of the JSON index.
+    """
+    return (get_group_path(RESULTS_DIR, group_name, ARRAYS_SUFFIX),
+            get_group_path(RESULTS_DIR, group_name, INDEX_SUFFIX))
+
+
+def compact_frame(df: DataFrame) -> DataFrame:
+    """
+    Prepares a result frame for storage: predicted day columns become
+    float32 and categorical columns keep only the group's own categories
+    (they otherwise carry every id of the whole dataset).
+
+    Args:
+        df (DataFrame): valid_df or pred_df of a group.
+
+    Returns:
+        DataFrame: The compacted frame.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+        elif str(col).startswith('d_') and \
+                pd.api.types.is_float_dtype(df[col].dtype):
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def get_series_index(valid_df: DataFrame,
+                     pred_df: DataFrame) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Indexes the rows of every series of a group, so that one series can be
+    read without scanning the group.
+
+    Args:
+        valid_df (DataFrame): Validation actuals with the fixed columns.
+        pred_df (DataFrame): Validation predictions with the fixed columns.
+
+    Returns:
+        Dict[str, Dict[str, List[int]]]: Row in valid_df and in pred_df of
+        each series, by item_id then store_id; empty if the frames have no
+        item_id or store_id column.
+    """
+    rows: Dict[str, Dict[str, List[int]]] = {}
+    if not {'item_id', 'store_id'} <= set(valid_df.columns) & \
+            set(pred_df.columns):
+        return rows
+    for name, df in enumerate([valid_df, pred_df]):
+        for row, (item, store) in enumerate(zip(df['item_id'],
+                                                df['store_id'])):
+            # The exogenous rows of pred_df have no series
+            if isinstance(item, str) and isinstance(store, str):
+                rows.setdefault(item, {}).setdefault(
+                    store, [-1, -1])[name] = row
+    return rows
+
+
+def save_results(group_name: str,
+                 valid_df: DataFrame,
+                 pred_df: DataFrame,
+                 training_key: Optional[str] = None) -> None:
+    """
+    Writes the validation actuals and predictions of a group as typed
+    arrays plus a small JSON index.
+
+    Both files are written to a temporary name and renamed into place, the
+    index last, so readers never see a partially written group.
+
+    Args:
+        group_name (str): Name of the model group.
+        valid_df (DataFrame): Validation actuals with the fixed columns.
+        pred_df (DataFrame): Validation predictions with the fixed columns.
+        training_key (Optional[str]): Content address of the inputs the
+        results were produced from (see domain.trainingKey).
+    """
+    arrays_path, index_path = get_paths(group_name)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+
+    arrays: Dict[str, np.ndarray] = {}
+    frames: Dict[str, Any] = {}
+    for name, df in zip(FRAMES, [valid_df, pred_df]):
+        blocks, meta = encode_frame(compact_frame(df))
+        for block_name, values in blocks.items():
+            arrays[f"{name}/{block_name}"] = values
+        frames[name] = meta
+
+    # np.savez appends .npz to names without that extension
+    tmp_arrays_path = f"{arrays_path}.tmp.npz"
+    np.savez(tmp_arrays_path, **arrays)
+    os.replace(tmp_arrays_path, arrays_path)
+
+    index = {"group": str(group_name), "training_key": training_key,
+             "frames": frames, "series": get_series_index(valid_df, pred_df)}
+    tmp_index_path = f"{index_path}.tmp"
+    with open(tmp_index_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_index_path, index_path)
+
+
+def save_level(model_level: int, group_names: List[str]) -> None:
+    """
+    Records the model level the results belong to and its groups, written
+    to a temporary name and renamed into place.
+
+    Args:
+        model_level (int): The level being trained.
+        group_names (List[str]): Names of every group of the level.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    level_path = os.path.join(RESULTS_DIR, LEVEL_FILE)
+    tmp_level_path = f"{level_path}.tmp"
+    with open(tmp_level_path, 'w') as f:
+        json.dump({"model_level": model_level, "groups": group_names}, f)
+    os.replace(tmp_level_path, level_path)
+
+
+def load_level() -> Optional[Dict[str, Any]]:
+    """
+    Returns:
+        Optional[Dict[str, Any]]: The model level of the results and its
+        groups (see save_level), or None if no level was recorded.
+    """
+    level_path = os.path.join(RESULTS_DIR, LEVEL_FILE)
+    if not os.path.exists(level_path):
+        return None
+    with open(level_path, 'r') as f:
+        return json.load(f)
+
+
+def list_groups(all_levels: bool = False) -> List[str]:
+    """
+    Returns the names of the groups with stored results.
+
+    Args:
+        all_levels (bool): Also list groups that do not belong to the
+        recorded level (see save_level). Defaults to False.
+
+    Returns:
+        List[str]: Group names.
+    """
+    pattern = os.path.join(RESULTS_DIR, f"*{INDEX_SUFFIX}")
+    names = [os.path.basename(path)[:-len(INDEX_SUFFIX)]
+             for path in glob.glob(pattern)]
+    level = None if all_levels else load_level()
+    if level is not None:
+        groups = set(level['groups'])
+        names = [name for name in names if name in groups]
+    return names
+
+
+def remove_results(group_name: str) -> None:
+    """
+    Removes the stored results of a group, if any.
+
+    Args:
+        group_name (str): Name of the model group.
+    """
+    for path in get_paths(group_name):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_index(group_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Loads the JSON index of a group.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[Dict[str, Any]]: The index, or None if the group has no
+        stored results.
+    """
+    _, index_path = get_paths(group_name)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r') as f:
+        return json.load(f)
+
+
+def get_training_key(group_name: str) -> Optional[str]:
+    """
+    Returns the training key the stored results of a group were produced
+    with.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[str]: The key, or None if the group has no stored results
+        or they predate training keys.
+    """
+    index = load_index(group_name)
+    return None if index is None else index.get('training_key')
+
+
+def load_results(group_name: str) -> Optional[Tuple[DataFrame, DataFrame]]:
+    """
+    Loads the validation actuals and predictions of a group.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[Tuple[DataFrame, DataFrame]]: valid_df and pred_df, or None
+        if the group has no stored results.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return None
+    arrays_path, _ = get_paths(group_name)
+    with np.load(arrays_path) as arrays:
+        frames = []
+        for name in FRAMES:
+            meta = index['frames'][name]
+            blocks = {block['name']: arrays[f"{name}/{block['name']}"]
+                      for block in meta['blocks']}
+            frames.append(decode_frame(blocks, meta))
+    return frames[0], frames[1]
+
+
+def select_results(group_name: str,
+                   filters: Optional[Dict[str, Any]] = None,
+                   columns: Optional[List[str]] = None
+                   ) -> Optional[Tuple[DataFrame, DataFrame]]:
+    """
+    Loads only some rows and columns of the validation actuals and
+    predictions of a group. Rows are matched on the stored codes and the
+    arrays are sliced before any DataFrame is built.
+
+    Args:
+        group_name (str): Name of the model group.
+        filters (Optional[Dict[str, Any]]): Required value of some columns,
+        e.g. {'item_id': 'FOODS_1_001'}. Rows missing the column value
+        (such as the exogenous rows of pred_df) never match. Defaults to
+        every row.
+        columns (Optional[List[str]]): Columns to keep in both frames.
+        Defaults to every column.
+
+    Returns:
+        Optional[Tuple[DataFrame, DataFrame]]: valid_df and pred_df, or None
+        if the group has no stored results.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return None
+    arrays_path, _ = get_paths(group_name)
+    frames = []
+    with np.load(arrays_path) as arrays:
+        for name in FRAMES:
+            meta = index['frames'][name]
+            blocks = read_blocks(arrays, name, meta, columns, filters)
+            rows = get_row_mask(blocks, meta, filters) if filters else None
+            frames.append(select_frame(blocks, meta, rows, columns))
+    return frames[0], frames[1]
+
+
+def read_blocks(arrays: Any, name: str, meta: Dict[str, Any],
+                columns: Optional[List[str]] = None,
+                filters: Optional[Dict[str, Any]] = None
+                ) -> Dict[str, np.ndarray]:
+    """
+    Reads the blocks of a stored frame holding a selected or filtered
+    column; the other blocks are not read at all.
+
+    Args:
+        arrays (Any): The open .npz file of the group.
+        name (str): The frame, one of FRAMES.
+        meta (Dict[str, Any]): Description of the frame from the index.
+        columns (Optional[List[str]]): Selected columns. Defaults to every
+        column.
+        filters (Optional[Dict[str, Any]]): Filtered columns and values.
+
+    Returns:
+        Dict[str, np.ndarray]: Mapping of block name to 2D array.
+    """
+    wanted = set(meta['columns'] if columns is None else columns)
+    wanted |= set(filters or {})
+    return {block['name']: arrays[f"{name}/{block['name']}"]
+            for block in meta['blocks']
+            if wanted.intersection(block['columns'])}
+
+
+def count_rows(group_name: str,
+               filters: Optional[Dict[str, Any]] = None
+               ) -> Optional[Tuple[int, int]]:
+    """
+    Counts the rows of the validation actuals and predictions of a group
+    matching some filters, reading only the filtered columns.
+
+    Args:
+        group_name (str): Name of the model group.
+        filters (Optional[Dict[str, Any]]): Required value of some columns
+        (see select_results). Defaults to every row.
+
+    Returns:
+        Optional[Tuple[int, int]]: Matching rows of valid_df and pred_df,
+        or None if the group has no stored results.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return None
+    if not filters:
+        return (index['frames']['valid_df']['n_rows'],
+                index['frames']['pred_df']['n_rows'])
+    arrays_path, _ = get_paths(group_name)
+    counts = []
+    with np.load(arrays_path) as arrays:
+        for name in FRAMES:
+            meta = index['frames'][name]
+            blocks = read_blocks(arrays, name, meta, [], filters)
+            counts.append(int(get_row_mask(blocks, meta, filters).sum()))
+    return counts[0], counts[1]
+
+
+def iter_frame(group_name: str, name: str,
+               filters: Optional[Dict[str, Any]] = None,
+               columns: Optional[List[str]] = None,
+               chunk_columns: int = COLUMN_CHUNK) -> Iterator[DataFrame]:
+    """
+    Loads some rows and columns of one stored frame of a group a few
+    columns at a time, so that a large selection is never decoded whole.
+    Each chunk has the selected rows (see select_results).
+
+    Args:
+        group_name (str): Name of the model group.
+        name (str): The frame, one of FRAMES.
+        filters (Optional[Dict[str, Any]]): Required value of some columns.
+        Defaults to every row.
+        columns (Optional[List[str]]): Columns to return, in the frame's
+        own order. Defaults to every column.
+        chunk_columns (int): Number of columns per chunk. Defaults to
+        COLUMN_CHUNK.
+
+    Returns:
+        Iterator[DataFrame]: Consecutive column chunks of the frame; none if
+        the group has no stored results or no selected column.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return
+    arrays_path, _ = get_paths(group_name)
+    meta = index['frames'][name]
+    selected = set(meta['columns'] if columns is None else columns)
+    wanted = [col for col in meta['columns'] if col in selected]
+    with np.load(arrays_path) as arrays:
+        blocks = read_blocks(arrays, name, meta, wanted, filters)
+        # Matched once, then every chunk takes the same rows
+        rows = np.flatnonzero(get_row_mask(blocks, meta, filters)) \
+            if filters else None
+        for start in range(0, len(wanted), chunk_columns):
+            yield select_frame(blocks, meta, rows,
+                               wanted[start:start + chunk_columns])
+
+
+def list_series(group_name: str) -> Optional[Dict[str, List[str]]]:
+    """
+    Lists the series (item and store) of a group from its series index
+    (or, for results saved before it existed, from the stored codes),
+    without reading any day column.
+
+    Args:
+        group_name (str): Name of the model group.
+
+    Returns:
+        Optional[Dict[str, List[str]]]: The stores of every item, empty if
+        the group has no item_id or store_id column, or None if the group
+        has no stored results.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return None
+    if 'series' in index:
+        return {item: list(stores) for item, stores in
+                index['series'].items()}
+    columns = ['item_id', 'store_id']
+    valid_df, _ = select_results(group_name, columns=columns)
+    if not set(columns) <= set(valid_df.columns):
+        return {}
+    series: Dict[str, List[str]] = {}
+    for item, store in zip(valid_df['item_id'], valid_df['store_id']):
+        series.setdefault(item, []).append(store)
+    return series
+
+
+def load_series(group_name: str, item_id: str, store_id: str
+                ) -> Optional[Tuple[DataFrame, DataFrame]]:
+    """
+    Loads the validation actuals and predictions of one series of a group,
+    found through the series index written with the results (or, for
+    results saved before it existed, the stored codes).
+
+    Args:
+        group_name (str): Name of the model group.
+        item_id (str): The item.
+        store_id (str): The store.
+
+    Returns:
+        Optional[Tuple[DataFrame, DataFrame]]: The one-row valid_df and
+        pred_df (empty if the series has no row in that frame), or None if
+        the group has no stored results.
+    """
+    index = load_index(group_name)
+    if index is None:
+        return None
+    if 'series' not in index:
+        return select_results(group_name,
+                              {'item_id': item_id, 'store_id': store_id})
+    rows = index['series'].get(item_id, {}).get(store_id, [-1, -1])
+    arrays_path, _ = get_paths(group_name)
+    frames = []
+    with np.load(arrays_path) as arrays:
+        for name, row in zip(FRAMES, rows):
+            meta = index['frames'][name]
+            blocks = {block['name']: arrays[f"{name}/{block['name']}"]
+                      for block in meta['blocks']}
+            frames.append(select_frame(blocks, meta,
+                                       [row] if row >= 0 else []))
+    return frames[0], frames[1]
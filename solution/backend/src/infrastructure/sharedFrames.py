@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from numpy import ndarray
+from numpy.lib.format import open_memmap
+from pandas import DataFrame
+from src.infrastructure.frameCodec import encode_frame, decode_frame
+
+
+def share_frame(df: DataFrame,
+                rows: Optional[ndarray] = None) -> Dict[str, Any]:
+    """
+    Writes a DataFrame once into memory-mapped .npy files that any process
+    can attach to without copying or unpickling it.
+
+    Memory-mapped files are used rather than /dev/shm, which Docker limits
+    to 64MB by default, and their pages stay reclaimable page cache.
+
+    Args:
+        df (DataFrame): The DataFrame to share.
+        rows (Optional[ndarray]): Row positions to share, in order, e.g. to
+        make every group a contiguous row range. Defaults to all rows.
+
+    Returns:
+        Dict[str, Any]: A small picklable handle to pass to attach_frame.
+    """
+    directory = tempfile.mkdtemp(prefix='shared-frame-')
+
+    def allocate(name: str, shape: Tuple[int, ...],
+                 dtype: np.dtype) -> ndarray:
+        return open_memmap(os.path.join(directory, f"{name}.npy"),
+                           mode='w+', dtype=dtype, shape=shape)
+
+    arrays, meta = encode_frame(df, rows=rows, allocate=allocate)
+    for values in arrays.values():
+        values.flush()
+    return {"directory": directory, "frame": meta}
+
+
+def attach_frame(handle: Dict[str, Any]) -> DataFrame:
+    """
+    Rebuilds a shared DataFrame on top of its read-only memory maps.
+
+    Args:
+        handle (Dict[str, Any]): Handle returned by share_frame.
+
+    Returns:
+        DataFrame: The shared DataFrame; its numeric data is not copied.
+    """
+    arrays = {
+        block['name']: np.load(
+            os.path.join(handle['directory'], f"{block['name']}.npy"),
+            mmap_mode='r')
+        for block in handle['frame']['blocks']}
+    return decode_frame(arrays, handle['frame'])
+
+
+def release_frame(handle: Dict[str, Any]) -> None:
+    """
+    Deletes the files backing a shared DataFrame. Processes still attached
+    keep their mappings until they exit.
+
+    Args:
+        handle (Dict[str, Any]): Handle returned by share_frame.
+    """
+    shutil.rmtree(handle['directory'], ignore_errors=True)
+
+
+def get_shared_size(handle: Dict[str, Any]) -> int:
+    """
+    Returns the size in bytes of the files backing a shared DataFrame.
+
+    Args:
+        handle (Dict[str, Any]): Handle returned by share_frame.
+
+    Returns:
+        int: Total size in bytes.
+    """
+    directory = handle['directory']
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for name in os.listdir(directory))
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+
+from keras.callbacks import Callback  # noqa: E402
+from keras.layers import Dense, Input  # noqa: E402
+from keras.models import Sequential  # noqa: E402
+from src.application import workflow  # noqa: E402
+from src.domain import configLoader  # noqa: E402
+from src.infrastructure import checkpointStore  # noqa: E402
+
+GROUP = "('FOODS',)"
+EPOCHS = 5
+# Epochs completed before the worker is killed
+INTERRUPTED_AT = 2
+CONFIG = {'checkpoint_every_epochs': 1, 'checkpoint_min_seconds': 0}
+
+
+class Interrupted(Exception):
+    pass
+
+
+class Interrupt(Callback):
+    """
+    Stops the training like a killed worker after some epochs, keeping the
+    weights it had then.
+    """
+
+    def __init__(self, after_epochs):
+        super().__init__()
+        self.after_epochs = after_epochs
+        self.weights = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        if epoch + 1 == self.after_epochs:
+            self.weights = self.model.get_weights()
+            raise Interrupted()
+
+
+class EpochLog(Callback):
+
+    def __init__(self):
+        super().__init__()
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epochs.append(epoch)
+
+
+class ResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for module, name, value in [
+                (checkpointStore, 'CHECKPOINTS_DIR', tmp.name),
+                (configLoader, 'load_config', lambda: CONFIG)]:
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rng = np.random.default_rng(0)
+        self.X = rng.random((32, 4)).astype(np.float32)
+        self.y = self.X.sum(axis=1, keepdims=True)
+
+    def fit(self, model, initial_epoch, callbacks):
+        if model is None:
+            model = Sequential([Input(shape=(4,)), Dense(3), Dense(1)])
+            model.compile(optimizer='adam', loss='mse')
+        model.fit(self.X, self.y, epochs=EPOCHS, batch_size=8,
+                  initial_epoch=initial_epoch, verbose=0,
+                  callbacks=callbacks)
+        return model
+
+    def interrupt(self, training_key='key'):
+        model, initial_epoch, callbacks = workflow.get_checkpointing(
+            GROUP, training_key)
+        self.assertIsNone(model)
+        self.assertEqual(initial_epoch, 0)
+        interrupt = Interrupt(INTERRUPTED_AT)
+        with self.assertRaises(Interrupted):
+            self.fit(None, 0, callbacks + [interrupt])
+        return interrupt.weights
+
+    def test_restart_resumes_from_the_checkpoint(self):
+        weights = self.interrupt()
+        self.assertEqual(checkpointStore.load_checkpoint_state(GROUP),
+                         {"epoch": INTERRUPTED_AT, "training_key": 'key'})
+
+        model, initial_epoch, callbacks = workflow.get_checkpointing(
+            GROUP, 'key')
+        self.assertEqual(initial_epoch, INTERRUPTED_AT)
+        for restored, saved in zip(model.get_weights(), weights):
+            np.testing.assert_array_equal(restored, saved)
+        # The optimizer state is restored with the weights
+        self.assertEqual(int(model.optimizer.iterations),
+                         INTERRUPTED_AT * len(self.X) // 8)
+
+        log = EpochLog()
+        self.fit(model, initial_epoch, callbacks + [log])
+        self.assertEqual(log.epochs, list(range(INTERRUPTED_AT, EPOCHS)))
+        # The last epoch is not checkpointed, the model is saved anyway
+        self.assertEqual(checkpointStore.load_checkpoint_state(GROUP)[
+            'epoch'], EPOCHS - 1)
+
+    def test_changed_inputs_start_from_scratch(self):
+        self.interrupt()
+        model, initial_epoch, _ = workflow.get_checkpointing(GROUP, 'other')
+        self.assertIsNone(model)
+        self.assertEqual(initial_epoch, 0)
+        self.assertIsNone(checkpointStore.load_checkpoint_state(GROUP))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.infrastructure import cpuBudget
+
+
+class CgroupTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, 'cgroup')
+        self.proc = os.path.join(tmp.name, 'proc_self_cgroup')
+        for name, value in [('CGROUP_ROOT', self.root),
+                            ('PROC_SELF_CGROUP', self.proc)]:
+            patcher = mock.patch.object(cpuBudget, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_v2_quota(self):
+        directory = os.path.join(self.root, 'app.slice')
+        self.write(os.path.join(directory, 'cpu.max'), '60000 100000\n')
+        self.assertAlmostEqual(cpuBudget.read_cgroup_quota(directory), 0.6)
+        self.write(os.path.join(directory, 'cpu.max'), 'max 100000\n')
+        self.assertIsNone(cpuBudget.read_cgroup_quota(directory))
+
+    def test_v1_quota(self):
+        directory = os.path.join(self.root, 'cpu,cpuacct')
+        self.write(os.path.join(directory, 'cpu.cfs_quota_us'), '200000\n')
+        self.write(os.path.join(directory, 'cpu.cfs_period_us'), '100000\n')
+        self.assertEqual(cpuBudget.read_cgroup_quota(directory), 2.0)
+        # -1 is v1's unlimited quota
+        self.write(os.path.join(directory, 'cpu.cfs_quota_us'), '-1\n')
+        self.assertIsNone(cpuBudget.read_cgroup_quota(directory))
+        self.assertIsNone(cpuBudget.read_cgroup_quota(self.root))
+
+    def test_v2_dirs(self):
+        self.write(self.proc, '0::/app.slice/api.scope\n')
+        self.assertEqual(cpuBudget.get_cgroup_dirs('cpu'), [
+            os.path.join(self.root, 'app.slice/api.scope'), self.root,
+            os.path.join(self.root, 'cpu'),
+            os.path.join(self.root, 'cpu,cpuacct')])
+
+    def test_v1_dirs(self):
+        self.write(self.proc, '4:memory:/docker/abc\n'
+                   '3:cpu,cpuacct:/docker/abc\n')
+        self.assertEqual(cpuBudget.get_cgroup_dirs('memory'), [
+            os.path.join(self.root, 'memory', 'docker/abc'), self.root,
+            os.path.join(self.root, 'memory')])
+        self.assertEqual(cpuBudget.get_cgroup_dirs('cpu')[:2], [
+            os.path.join(self.root, 'cpu', 'docker/abc'),
+            os.path.join(self.root, 'cpu,cpuacct', 'docker/abc')])
+
+    def test_tightest_quota(self):
+        self.write(self.proc, '0::/app.slice\n')
+        self.write(os.path.join(self.root, 'cpu.max'), '400000 100000')
+        self.write(os.path.join(self.root, 'app.slice', 'cpu.max'),
+                   '150000 100000')
+        self.assertAlmostEqual(cpuBudget.get_cgroup_cpu_limit(), 1.5)
+
+
+class PlanWorkersTest(unittest.TestCase):
+
+    def plan(self, budget, n_groups, workers='auto', threads='auto'):
+        with mock.patch.object(cpuBudget, 'get_cpu_budget',
+                               return_value=(budget, 'cgroup quota')):
+            return cpuBudget.plan_workers(n_groups, workers, threads)
+
+    def test_fractional_budget_gets_one_single_threaded_worker(self):
+        plan = self.plan(0.6, 10)
+        self.assertEqual((plan['workers'], plan['threads_per_worker']),
+                         (1, 1))
+        self.assertEqual(plan['cpu_budget'], 0.6)
+
+    def test_workers_before_threads(self):
+        plan = self.plan(8.0, 20)
+        self.assertEqual((plan['workers'], plan['threads_per_worker']),
+                         (8, 1))
+        # Fewer groups than CPUs: the spare CPUs become threads
+        plan = self.plan(8.0, 3)
+        self.assertEqual((plan['workers'], plan['threads_per_worker']),
+                         (3, 2))
+
+    def test_configured_values(self):
+        plan = self.plan(4.0, 20, workers=2, threads=3)
+        self.assertEqual((plan['workers'], plan['threads_per_worker']),
+                         (2, 3))
+        plan = self.plan(4.0, 20, workers=2)
+        self.assertEqual(plan['threads_per_worker'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from pandas.testing import assert_frame_equal
+from benchmarks.syntheticData import generate_sales, get_series_ids
+from src.infrastructure import dataLoader
+
+
+class CsvCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'sales_train.csv')
+        self.sales_df = generate_sales(get_series_ids(30), 20, 0.6,
+                                       np.random.default_rng(0))
+        self.sales_df.to_csv(self.path, index=False)
+
+    def load(self):
+        """
+        Loads the file, returning the data and whether the CSV was parsed.
+        """
+        with mock.patch.object(dataLoader, 'read_csv_compact',
+                               wraps=dataLoader.read_csv_compact) as parse:
+            data = dataLoader.load_csv_data(self.path)
+        return data, parse.called
+
+    def test_round_trip(self):
+        parsed, was_parsed = self.load()
+        self.assertTrue(was_parsed)
+        self.assertTrue(os.path.exists(os.path.join(
+            dataLoader.get_cache_dir(self.path), 'meta.json')))
+        cached, was_parsed = self.load()
+        self.assertFalse(was_parsed)
+        assert_frame_equal(cached, parsed)
+        self.assertEqual(cached['d_1'].dtype, np.int16)
+        self.assertEqual(cached['store_id'].dtype, 'category')
+
+    def test_invalidated_by_size(self):
+        self.load()
+        self.sales_df.loc[0, 'd_1'] = 1234
+        self.sales_df.to_csv(self.path, index=False)
+        reloaded, was_parsed = self.load()
+        self.assertTrue(was_parsed)
+        self.assertEqual(reloaded.loc[0, 'd_1'], 1234)
+        _, was_parsed = self.load()
+        self.assertFalse(was_parsed)
+
+    def test_invalidated_by_mtime(self):
+        self.load()
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns,
+                                stat.st_mtime_ns + 10 ** 9))
+        _, was_parsed = self.load()
+        self.assertTrue(was_parsed)
+
+    def test_unreadable_cache_is_ignored(self):
+        parsed, _ = self.load()
+        cache_dir = dataLoader.get_cache_dir(self.path)
+        with open(os.path.join(cache_dir, 'numeric_0.npy'), 'wb') as f:
+            f.write(b'garbage')
+        reloaded, was_parsed = self.load()
+        self.assertTrue(was_parsed)
+        assert_frame_equal(reloaded, parsed)
+
+
+if __name__ == '__main__':
+    unittest.main()
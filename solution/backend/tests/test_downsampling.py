@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from src.domain.downsampling import (downsample, lttb_indices,
+                                     min_max_indices)
+
+
+class DownsamplingTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.poisson(5, size=1913).astype(np.int16)
+        self.values[1000] = 500
+
+    def assert_increasing(self, kept):
+        self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_lttb_length_and_endpoints(self):
+        for n_points in [3, 10, 200, 1912]:
+            with self.subTest(n_points=n_points):
+                kept = lttb_indices(self.values, n_points)
+                self.assertEqual(len(kept), n_points)
+                self.assertEqual(kept[0], 0)
+                self.assertEqual(kept[-1], len(self.values) - 1)
+                self.assert_increasing(kept)
+
+    def test_lttb_keeps_the_peak(self):
+        self.assertIn(1000, lttb_indices(self.values, 100))
+
+    def test_min_max_length_and_extremes(self):
+        for n_points in [2, 10, 200, 1912]:
+            with self.subTest(n_points=n_points):
+                kept = min_max_indices(self.values, n_points)
+                self.assertLessEqual(len(kept), n_points)
+                self.assert_increasing(kept)
+                self.assertIn(1000, kept)
+                self.assertIn(int(np.argmin(self.values)), kept)
+
+    def test_short_series_are_kept_whole(self):
+        for method in ['lttb', 'minmax']:
+            with self.subTest(method=method):
+                np.testing.assert_array_equal(
+                    downsample(self.values[:50], 50, method), np.arange(50))
+                np.testing.assert_array_equal(
+                    downsample(self.values, None, method),
+                    np.arange(len(self.values)))
+
+    def test_missing_values(self):
+        values = self.values.astype(float)
+        values[::7] = np.nan
+        self.assertEqual(len(lttb_indices(values, 50)), 50)
+        self.assertLessEqual(len(min_max_indices(values, 50)), 50)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            downsample(self.values, 10, 'mean')
+
+
+if __name__ == '__main__':
+    unittest.main()
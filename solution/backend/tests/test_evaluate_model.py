@@ -0,0 +1,80 @@
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+
+from sklearn.preprocessing import MinMaxScaler  # noqa: E402
+from src.domain.trainAndEvaluate import (build_baseline_model,  # noqa: E402
+                                         evaluate_model)
+
+N_TRAINING = 14
+N_OUTPUTS = 4
+N_VALID = 28
+
+
+def evaluate_model_per_window(model, X_valid, scaler, n_training, n_outputs,
+                              valid_df_cols, fixed_cols, valid_df_og):
+    """
+    evaluate_model before batching: one predict and one inverse transform
+    per validation window.
+    """
+    y_valid_pred = []
+    for X in X_valid:
+        y_valid_pred_day = model.predict(X.reshape(1, n_training, n_outputs),
+                                         verbose=0)
+        y_valid_pred_day = scaler.inverse_transform(y_valid_pred_day)
+        y_valid_pred.append(y_valid_pred_day)
+
+    y_valid_pred_df = pd.DataFrame(
+        np.array(
+            [y_valid_pred[i].reshape(-1,) for i in range(
+                len(y_valid_pred))]).T,
+        columns=valid_df_cols)
+    if not all([col in y_valid_pred_df.columns for col in fixed_cols]):
+        y_valid_pred_df = pd.concat([valid_df_og[fixed_cols].reset_index(
+            drop=True), y_valid_pred_df.reset_index(drop=True)], axis=1,
+            sort=False)
+    return y_valid_pred_df
+
+
+class EvaluateModelTest(unittest.TestCase):
+
+    def test_batched_matches_per_window(self):
+        rng = np.random.default_rng(0)
+        sales = rng.poisson(3, size=(N_TRAINING + N_VALID, N_OUTPUTS))
+        scaler = MinMaxScaler().fit(sales)
+        scaled = scaler.transform(sales)
+        X_valid = np.stack([scaled[i:i + N_TRAINING]
+                            for i in range(N_VALID)])
+        model = build_baseline_model(N_OUTPUTS, N_TRAINING, N_OUTPUTS)
+
+        fixed_cols = ['id', 'item_id']
+        valid_df_cols = [f'd_{day}' for day in range(1, N_VALID + 1)]
+        valid_df_og = pd.DataFrame({
+            'id': [f'item_{i}_CA_1' for i in range(N_OUTPUTS)],
+            'item_id': [f'item_{i}' for i in range(N_OUTPUTS)]})
+        args = (X_valid, scaler, N_TRAINING, N_OUTPUTS, valid_df_cols,
+                fixed_cols, valid_df_og)
+
+        per_window = np.concatenate([
+            model.predict(X.reshape(1, N_TRAINING, N_OUTPUTS), verbose=0)
+            for X in X_valid])
+        batched = model.predict(X_valid, verbose=0)
+        np.testing.assert_allclose(batched, per_window, rtol=1e-5, atol=1e-6)
+
+        expected = evaluate_model_per_window(model, *args)
+        actual = evaluate_model(model, *args)
+
+        self.assertEqual(list(actual.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(actual[fixed_cols],
+                                      expected[fixed_cols])
+        np.testing.assert_allclose(
+            actual[valid_df_cols].to_numpy(dtype=float),
+            expected[valid_df_cols].to_numpy(dtype=float),
+            rtol=1e-5, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.infrastructure.frameCodec import (decode_frame, encode_frame,
+                                           get_row_mask, select_frame)
+
+
+class FrameCodecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': pd.Categorical(['a_CA_1', 'b_CA_1', 'a_TX_1', 'b_TX_1']),
+            'store_id': ['CA_1', 'CA_1', 'TX_1', 'TX_1'],
+            'd_1': np.array([0, 3, 1, 2], dtype=np.int16),
+            'd_2': np.array([5, 0, 0, 1], dtype=np.int16),
+            'price': [1.5, np.nan, 2.25, 0.5],
+            'd_3': np.array([1, 1, 0, 4], dtype=np.int16),
+        })
+
+    def test_round_trip(self):
+        arrays, meta = encode_frame(self.df)
+        decoded = decode_frame(arrays, meta)
+        assert_frame_equal(decoded, self.df)
+        # The largest numeric block backs the frame without a copy
+        self.assertTrue(np.shares_memory(decoded['d_1'].to_numpy(),
+                                         arrays['numeric_0']))
+
+    def test_round_trip_of_selected_rows(self):
+        rows = np.array([3, 0])
+        arrays, meta = encode_frame(self.df, rows=rows)
+        assert_frame_equal(decode_frame(arrays, meta),
+                           self.df.iloc[rows].reset_index(drop=True))
+
+    def test_select_rows_and_columns(self):
+        arrays, meta = encode_frame(self.df)
+        mask = get_row_mask(arrays, meta, {'store_id': 'TX_1'})
+        np.testing.assert_array_equal(mask, [False, False, True, True])
+        selected = select_frame(arrays, meta, rows=mask,
+                                columns=['d_3', 'id', 'price'])
+        expected = self.df.loc[mask, ['id', 'price', 'd_3']]
+        assert_frame_equal(selected, expected.reset_index(drop=True))
+
+    def test_unknown_filter_value(self):
+        arrays, meta = encode_frame(self.df)
+        self.assertFalse(get_row_mask(arrays, meta, {'id': 'z'}).any())
+        with self.assertRaises(KeyError):
+            get_row_mask(arrays, meta, {'item_id': 'a'})
+
+
+if __name__ == '__main__':
+    unittest.main()
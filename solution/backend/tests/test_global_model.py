@@ -0,0 +1,115 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+
+from benchmarks.syntheticData import (generate_calendar,  # noqa: E402
+                                      generate_sales, get_series_ids)
+from src.application import workflow  # noqa: E402
+from src.domain import calendarFeatures, globalModel  # noqa: E402
+from src.domain.hierarchy import Hierarchy  # noqa: E402
+from src.infrastructure import checkpointStore, resultsStore  # noqa: E402
+
+N_DAYS = 120
+# Stores, one group per store
+MODEL_LEVEL = 3
+
+
+class GlobalModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.calendar_df = generate_calendar(N_DAYS, rng)
+        sales_df = generate_sales(get_series_ids(30), N_DAYS, 0.6, rng)
+        group_rows = Hierarchy(sales_df).get_group_rows(MODEL_LEVEL)
+        # Group after group, as the workers receive them
+        cls.sales_df = sales_df.iloc[
+            np.concatenate([rows for _, rows in group_rows])].reset_index(
+                drop=True)
+        cls.group_sizes = [(group_name, len(rows))
+                           for group_name, rows in group_rows]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        for module, name, path in [
+                (resultsStore, 'RESULTS_DIR',
+                 os.path.join(self.tmp, 'results')),
+                (checkpointStore, 'CHECKPOINTS_DIR',
+                 os.path.join(self.tmp, 'checkpoints'))]:
+            patcher = mock.patch.object(module, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_predictions_shape(self):
+        day_cols = [col for col in self.sales_df.columns
+                    if col.startswith('d_')]
+        sales = self.sales_df[day_cols].to_numpy(dtype=np.float32).T
+        exogenous = calendarFeatures.take_exogenous(
+            calendarFeatures.get_exogenous_by_day(self.calendar_df),
+            day_cols)
+        series_groups = np.repeat(np.arange(len(self.group_sizes)),
+                                  [size for _, size in self.group_sizes])
+        timings = {}
+        model, predictions = globalModel.train_global_model(
+            sales, exogenous, series_groups, n_training=workflow.N_TRAINING,
+            n_forecast=workflow.N_FORECAST, epochs=1,
+            log_directory=os.path.join(self.tmp, 'tb_logs'),
+            timings=timings)
+        self.assertEqual(predictions.shape,
+                         (workflow.N_FORECAST, len(self.sales_df)))
+        self.assertTrue(np.all(np.isfinite(predictions)))
+        self.assertTrue(np.all(predictions >= 0))
+        self.assertEqual(model.input_shape[0],
+                         (None, workflow.N_TRAINING,
+                          1 + len(calendarFeatures.EXOGENOUS_COLUMNS)))
+        self.assertCountEqual(timings, ['fit', 'evaluate_model'])
+
+    def test_one_model_for_the_level(self):
+        # The TensorBoard logs default to ../results
+        train = functools.partial(globalModel.train_global_model,
+                                  log_directory=os.path.join(self.tmp,
+                                                             'tb_logs'))
+        build = mock.Mock(wraps=globalModel.build_global_model)
+        with mock.patch.object(globalModel, 'build_global_model', build), \
+                mock.patch.object(globalModel, 'train_global_model', train):
+            stages = workflow.run_global_model(
+                self.group_sizes, self.sales_df, self.calendar_df, 1,
+                'level-key')
+        build.assert_called_once()
+        self.assertEqual(build.call_args.args[:2],
+                         (len(self.sales_df), len(self.group_sizes)))
+        self.assertIn('write_results', stages)
+
+        self.assertCountEqual(resultsStore.list_groups(all_levels=True),
+                              [str(name) for name, _ in self.group_sizes])
+        start = 0
+        for group_name, size in self.group_sizes:
+            with self.subTest(group=group_name):
+                valid_df, pred_df = resultsStore.load_results(
+                    str(group_name))
+                group_df = self.sales_df.iloc[start:start + size]
+                pd.testing.assert_series_equal(
+                    valid_df['id'].astype(str),
+                    group_df['id'].astype(str).reset_index(drop=True))
+                self.assertEqual(
+                    [col for col in pred_df.columns if col.startswith('d_')],
+                    [f'd_{day}' for day in range(
+                        N_DAYS - workflow.N_FORECAST + 1, N_DAYS + 1)])
+                self.assertEqual(
+                    resultsStore.get_training_key(str(group_name)),
+                    'level-key')
+                start += size
+        self.assertIsNone(
+            checkpointStore.load_checkpoint_state(workflow.GLOBAL_CHECKPOINT))
+
+
+if __name__ == '__main__':
+    unittest.main()
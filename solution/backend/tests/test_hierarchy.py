@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+import numpy as np
+from benchmarks.syntheticData import generate_sales, get_series_ids
+from src.domain import hierarchy as hierarchy_module
+from src.domain.hierarchy import FOR_ALL_COLUMN, FOR_ALL_VALUE, Hierarchy
+from src.domain.hierarchy import get_level_columns
+from src.domain.models.definitions import model_levels
+
+N_DAYS = 40
+
+
+def get_expected(sales_df, model_level):
+    """
+    Sums the daily sales of every group of a level with a pandas groupby.
+    """
+    df = sales_df.assign(**{FOR_ALL_COLUMN: FOR_ALL_VALUE})
+    day_cols = [col for col in df.columns if col.startswith('d_')]
+    sums = df.groupby(get_level_columns(model_level))[day_cols].sum()
+    names = [name if isinstance(name, tuple) else (name,)
+             for name in sums.index]
+    return names, sums.to_numpy()
+
+
+class HierarchyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.sales_df = generate_sales(get_series_ids(140), N_DAYS, 0.6, rng)
+        cls.hierarchy = Hierarchy(cls.sales_df)
+
+    def test_levels_match_groupby_sums(self):
+        for model_level in model_levels:
+            with self.subTest(level=model_level.LevelId):
+                names, values = self.hierarchy.get_level(model_level.LevelId)
+                expected_names, expected = get_expected(self.sales_df,
+                                                        model_level)
+                self.assertEqual(names, expected_names)
+                self.assertEqual(values.dtype, np.int32)
+                np.testing.assert_array_equal(values, expected)
+
+    def test_recent_days_of_one_group(self):
+        _, expected = get_expected(self.sales_df, model_levels[8])
+        for group in [0, 5]:
+            with self.subTest(group=group):
+                values = self.hierarchy.aggregate(9, 7, group)
+                np.testing.assert_array_equal(values,
+                                              expected[group:group + 1, -7:])
+
+    def test_chunks_cover_every_day(self):
+        # Chunks smaller than the days, the last one partial
+        _, expected = get_expected(self.sales_df, model_levels[2])
+        with mock.patch.object(hierarchy_module, 'AGGREGATE_CHUNK_DAYS', 16):
+            np.testing.assert_array_equal(self.hierarchy.aggregate(3),
+                                          expected)
+
+
+class MissingSalesDataTest(unittest.TestCase):
+
+    def test_hierarchy_endpoints_are_unavailable(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.application import workflow
+
+        app = FastAPI()
+        app.include_router(workflow.router)
+        client = TestClient(app)
+        with mock.patch.object(workflow, 'SALES_PATH', '/nonexistent.csv'):
+            for response in [
+                    client.get('/api/hierarchy'),
+                    client.get('/api/aggregates', params={'level': 1})]:
+                self.assertEqual(response.status_code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
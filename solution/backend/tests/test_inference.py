@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+
+import keras  # noqa: E402
+from sklearn.preprocessing import MinMaxScaler  # noqa: E402
+from src.domain import inference  # noqa: E402
+from src.domain.trainAndEvaluate import build_baseline_model  # noqa: E402
+from src.infrastructure import modelStore  # noqa: E402
+
+N_TRAINING = 14
+N_OUTPUTS = 6
+# Largest difference from Keras relative to the largest Keras output
+TOLERANCES = {'float32': 1e-5, 'float16': 2e-3, 'int8': 2e-2}
+
+
+class NumpyModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        keras.utils.set_random_seed(0)
+        cls.model = build_baseline_model(N_OUTPUTS, N_TRAINING, N_OUTPUTS)
+        cls.X = np.random.default_rng(0).random(
+            (28, N_TRAINING, N_OUTPUTS), dtype=np.float32)
+        cls.expected = np.array(cls.model.predict_on_batch(cls.X))
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_agrees_with_keras(self):
+        for quantization, tolerance in TOLERANCES.items():
+            with self.subTest(quantization=quantization):
+                path = os.path.join(self.tmp.name, f'{quantization}.npz')
+                inference.export_model(self.model, path, quantization)
+                actual = inference.load_model(path).predict(self.X)
+                self.assertEqual(actual.shape, self.expected.shape)
+                _, relative_error = inference.compare_outputs(
+                    self.expected, actual)
+                self.assertLess(relative_error, tolerance)
+
+    def test_forecast_with_stored_scaler(self):
+        sales = np.random.default_rng(1).poisson(
+            3, size=(60, N_OUTPUTS)).astype(float)
+        scaler = MinMaxScaler().fit(sales)
+        scaling = inference.MinMaxScaling(scaler.scale_, scaler.min_)
+        np.testing.assert_allclose(scaling.transform(sales),
+                                   scaler.transform(sales))
+        np.testing.assert_allclose(scaling.inverse_transform(sales),
+                                   scaler.inverse_transform(sales))
+
+        future_exogenous = np.full((10, 2), np.nan)
+        future_exogenous[:5] = 1
+        args = (self.X[-1], future_exogenous, 7)
+        np.testing.assert_allclose(
+            inference.forecast(self.model, scaling, *args),
+            inference.forecast(self.model, scaler, *args),
+            rtol=1e-6, atol=1e-6)
+
+    def test_model_store_round_trip(self):
+        sales = np.random.default_rng(2).poisson(
+            3, size=(60, N_OUTPUTS)).astype(float)
+        scaler = MinMaxScaler().fit(sales)
+        models_dir = os.path.join(self.tmp.name, 'models')
+        with mock.patch.object(modelStore, 'MODELS_DIR', models_dir):
+            modelStore.save_model(
+                "('FOODS',)", self.model, scaler, self.X[-1],
+                ['d_61', 'd_62'], np.zeros((2, 2)),
+                pd.DataFrame({'id': [f'id_{i}' for i in range(N_OUTPUTS)]}),
+                training_key='key')
+            self.assertEqual(modelStore.get_training_key("('FOODS',)"),
+                             'key')
+            artifacts = modelStore.load_model_artifacts("('FOODS',)")
+        self.assertIsInstance(artifacts['model'], inference.NumpyModel)
+        np.testing.assert_allclose(artifacts['scaler'].inverse_transform(
+            sales), scaler.inverse_transform(sales))
+        self.assertNotIn('scaler.pkl', os.listdir(
+            os.path.join(models_dir, "('FOODS',)")))
+
+        # Serving a forecast loads neither scikit-learn nor TensorFlow
+        code = (
+            "import sys\n"
+            "from src.infrastructure import modelStore\n"
+            f"modelStore.MODELS_DIR = {models_dir!r}\n"
+            "a = modelStore.load_model_artifacts(\"('FOODS',)\")\n"
+            "from src.domain import inference\n"
+            "inference.forecast(a['model'], a['scaler'], a['last_window'],\n"
+            "                   a['future_exogenous'], 3)\n"
+            "print(sorted({m.split('.')[0] for m in sys.modules}\n"
+            "             & {'sklearn', 'scipy', 'tensorflow', 'keras'}))\n")
+        backend_dir = os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            check=True, cwd=backend_dir)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
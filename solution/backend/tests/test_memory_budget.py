@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+from src.application import workflow
+from src.infrastructure import memoryBudget
+
+
+class WorkerBaseTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(workflow, 'worker_base_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_configured_value_is_not_measured(self):
+        with mock.patch.object(workflow, 'ProcessPoolExecutor') as executor:
+            self.assertEqual(workflow.get_worker_base_mb(600), 600.0)
+            executor.assert_not_called()
+
+    def test_measured_once(self):
+        with mock.patch.object(workflow, 'ProcessPoolExecutor') as executor:
+            pool = executor.return_value.__enter__.return_value
+            pool.submit.return_value.result.return_value = 812.5
+            self.assertEqual(workflow.get_worker_base_mb('auto'), 812.5)
+            self.assertEqual(workflow.get_worker_base_mb('auto'), 812.5)
+            pool.submit.assert_called_once_with(workflow.probe_worker)
+
+    def test_default_when_the_probe_fails(self):
+        with mock.patch.object(workflow, 'ProcessPoolExecutor',
+                               side_effect=OSError('no semaphores')):
+            self.assertEqual(workflow.get_worker_base_mb('auto'),
+                             memoryBudget.DEFAULT_WORKER_BASE_MB)
+        self.assertIsNone(workflow.worker_base_cache)
+
+
+class AdmissionTest(unittest.TestCase):
+
+    def setUp(self):
+        # 1200 MB left for the workers
+        self.admission = memoryBudget.MemoryAdmission(
+            budget_mb=1400, reserved_mb=200, worker_base_mb=300,
+            max_workers=3)
+
+    def test_admitted_while_the_groups_fit(self):
+        self.assertTrue(self.admission.try_admit('a', 100, []))
+        self.assertTrue(self.admission.try_admit('b', 100, []))
+        # 200 + 2 * (300 + 100) + 300 + 150 > 1400
+        self.assertFalse(self.admission.try_admit('c', 150, []))
+        self.assertTrue(self.admission.try_admit('c', 100, []))
+        self.assertEqual(self.admission.get_usage_mb([]), 1400)
+        # Every worker is busy, whatever the estimate
+        self.assertTrue(self.admission.is_full())
+        self.assertFalse(self.admission.try_admit('d', 0, []))
+        self.assertEqual(list(self.admission.running), ['a', 'b', 'c'])
+
+    def test_measured_memory_rejects(self):
+        self.assertTrue(self.admission.try_admit('a', 100, []))
+        # The worker grew beyond its estimate of 400 MB
+        self.assertEqual(self.admission.get_usage_mb([900]), 1100)
+        self.assertFalse(self.admission.try_admit('b', 100, [900]))
+        self.assertTrue(self.admission.try_admit('b', 100, [700]))
+
+    def test_idle_worker_is_reused(self):
+        self.assertTrue(self.admission.try_admit('a', 400, []))
+        self.admission.release('a')
+        self.assertEqual(self.admission.started_workers, 1)
+        # 200 + 300 + 900 fits in the idle worker, not in a new one
+        self.assertTrue(self.admission.try_admit('b', 900, []))
+        self.assertEqual(self.admission.started_workers, 1)
+        self.assertFalse(self.admission.try_admit('c', 50, []))
+
+    def test_oversized_group_runs_alone(self):
+        self.assertFalse(self.admission.fits_alone(1000))
+        self.assertTrue(self.admission.fits_alone(900))
+        self.assertTrue(self.admission.try_admit('small', 100, []))
+        self.assertFalse(self.admission.try_admit('large', 1000, []))
+        self.admission.release('small')
+        self.assertTrue(self.admission.try_admit('large', 1000, []))
+        self.assertFalse(self.admission.try_admit('small', 0, []))
+
+    def test_worker_base_counts_once_per_started_worker(self):
+        admission = memoryBudget.MemoryAdmission(
+            budget_mb=1900, reserved_mb=200, worker_base_mb=800,
+            max_workers=2)
+        self.assertTrue(admission.fits_alone(900))
+        self.assertFalse(admission.fits_alone(1100))
+        self.assertTrue(admission.try_admit('a', 100, []))
+        # A second worker would need another 800 MB
+        self.assertFalse(admission.try_admit('b', 100, []))
+        admission.release('a')
+        self.assertTrue(admission.try_admit('b', 100, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
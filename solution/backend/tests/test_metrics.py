@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+from fastapi.testclient import TestClient
+from main import app
+from src.application import workflow
+from src.infrastructure import metrics
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        for metric in [metrics.STAGE_SECONDS, metrics.REQUEST_SECONDS]:
+            patcher = mock.patch.object(metric, 'values', {})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Not run as a context manager: no training starts with the app
+        self.client = TestClient(app)
+
+    def scrape(self):
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response.headers['content-type'].startswith('text/plain'))
+        return response.text.splitlines()
+
+    def samples(self, lines, prefix):
+        return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+                for line in lines if line.startswith(prefix)}
+
+    def test_stage_timings(self):
+        timer = metrics.StageTimer()
+        # Both parts of a stage are summed into one observation
+        timer.add('fit', 0.3)
+        timer.add('fit', 0.4)
+        with timer.time('process'):
+            pass
+        workflow.record_stages(timer.seconds, 'keras')
+        workflow.record_stages({'fit': 20.0}, 'keras')
+
+        samples = self.samples(self.scrape(), 'm5_stage_seconds')
+        labels = 'stage="fit",model_type="keras"'
+        self.assertEqual(samples[f'm5_stage_seconds_bucket{{{labels},'
+                                 'le="0.5"}'], 0)
+        self.assertEqual(samples[f'm5_stage_seconds_bucket{{{labels},'
+                                 'le="1"}'], 1)
+        self.assertEqual(samples[f'm5_stage_seconds_bucket{{{labels},'
+                                 'le="30"}'], 2)
+        self.assertEqual(samples[f'm5_stage_seconds_bucket{{{labels},'
+                                 'le="+Inf"}'], 2)
+        self.assertAlmostEqual(
+            samples[f'm5_stage_seconds_sum{{{labels}}}'], 20.7)
+        self.assertEqual(samples[f'm5_stage_seconds_count{{{labels}}}'], 2)
+        self.assertEqual(samples['m5_stage_seconds_count{stage="process",'
+                                 'model_type="keras"}'], 1)
+
+    def test_request_latencies(self):
+        self.client.get('/api/healthCheck')
+        self.client.get('/api/healthCheck')
+        self.client.get('/api/trainingJobs/abc123')
+        self.client.get('/api/unknown/path')
+
+        lines = self.scrape()
+        samples = self.samples(lines, 'm5_http_request_duration_seconds')
+        name = 'm5_http_request_duration_seconds'
+        health = 'method="GET",route="/api/healthCheck",status="200"'
+        self.assertEqual(samples[f'{name}_count{{{health}}}'], 2)
+        self.assertEqual(samples[f'{name}_bucket{{{health},le="+Inf"}}'], 2)
+        self.assertGreater(samples[f'{name}_sum{{{health}}}'], 0)
+        # Routes are labelled by template, whatever the path parameters
+        self.assertEqual(samples[
+            f'{name}_count{{method="GET",route="/api/trainingJobs/{{job_id}}"'
+            ',status="404"}'], 1)
+        self.assertEqual(samples[
+            f'{name}_count{{method="GET",route="{metrics.UNMATCHED_ROUTE}",'
+            'status="404"}'], 1)
+        self.assertIn(f'# TYPE {name} histogram', lines)
+        # The buckets are cumulative
+        buckets = [value for sample, value in samples.items()
+                   if sample.startswith(f'{name}_bucket{{{health}')]
+        self.assertEqual(len(buckets), len(metrics.REQUEST_BUCKETS) + 1)
+        self.assertEqual(buckets, sorted(buckets))
+
+
+if __name__ == '__main__':
+    unittest.main()
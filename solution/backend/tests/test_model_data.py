@@ -0,0 +1,127 @@
+import functools
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.application import workflow
+from src.domain import configLoader
+from src.infrastructure import resultsStore
+
+GROUP = "('FOODS',)"
+N_DAYS = 20
+# Small enough to split the day columns into several chunks
+CHUNK_COLUMNS = 3
+
+
+class ModelDataTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for module, name, value in [
+                (resultsStore, 'RESULTS_DIR', tmp.name),
+                (workflow, 'response_cache', None),
+                (resultsStore, 'iter_frame', functools.partial(
+                    resultsStore.iter_frame, chunk_columns=CHUNK_COLUMNS))]:
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rng = np.random.default_rng(0)
+        days = {f'd_{day}': rng.integers(0, 5, 4).astype(float)
+                for day in range(1, N_DAYS + 1)}
+        self.valid_df = pd.DataFrame({
+            'id': ['a', 'b', 'c', 'd'],
+            'item_id': ['FOODS_1_001', 'FOODS_1_001', 'FOODS_1_002',
+                        'FOODS_1_002'],
+            'store_id': ['CA_1', 'TX_1', 'CA_1', 'TX_1'], **days})
+        # The exogenous rows of the predictions have no series
+        self.pred_df = pd.concat([self.valid_df, pd.DataFrame({
+            'id': ['snap'], 'item_id': [np.nan], 'store_id': [np.nan],
+            **{col: [1.0] for col in days}})], ignore_index=True)
+        resultsStore.save_results(GROUP, self.valid_df, self.pred_df, 'key')
+        app = FastAPI()
+        app.include_router(workflow.router)
+        self.client = TestClient(app)
+
+    def fetch(self, stream_cells, **params):
+        with mock.patch.object(
+                configLoader, 'load_config',
+                return_value={'model_data_stream_cells': stream_cells}), \
+                mock.patch.object(workflow, 'iter_model_data',
+                                  wraps=workflow.iter_model_data) as stream:
+            response = self.client.post('/api/modelData',
+                                        params={'key': GROUP, **params})
+        response.streamed = stream.called
+        return response
+
+    def test_filters(self):
+        response = self.fetch(10 ** 6, item_id='FOODS_1_002',
+                              store_id='TX_1', first_day=5, last_day=7,
+                              columns=['id'])
+        self.assertFalse(response.streamed)
+        data = response.json()
+        self.assertEqual(data['valid_df'], {
+            'id': {'0': 'd'},
+            **{f'd_{day}': {'0': self.valid_df[f'd_{day}'][3]}
+               for day in range(5, 8)}})
+        pred_df = pd.read_json(io.StringIO(data['pred_df']))
+        self.assertEqual(list(pred_df.columns), ['id', 'd_5', 'd_6', 'd_7'])
+        self.assertEqual(pred_df['id'].tolist(), ['d'])
+
+        # The exogenous row has no item
+        pred_df = pd.read_json(io.StringIO(
+            self.fetch(10 ** 6, store_id='CA_1').json()['pred_df']))
+        self.assertEqual(pred_df['id'].tolist(), ['a', 'c'])
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.fetch(10 ** 6, columns=['dept_id']).status_code,
+                         422)
+        valid_df = self.valid_df.drop(columns='store_id')
+        resultsStore.save_results(GROUP, valid_df, valid_df, 'key')
+        self.assertEqual(self.fetch(10 ** 6, store_id='CA_1').status_code,
+                         422)
+
+    def test_streamed_body_matches_the_rendered_body(self):
+        for params in [{}, {'item_id': 'FOODS_1_001'},
+                       {'store_id': 'CA_1', 'first_day': 4},
+                       {'columns': ['item_id'], 'last_day': 2}]:
+            with self.subTest(**params):
+                rendered = self.fetch(10 ** 6, **params)
+                streamed = self.fetch(0, **params)
+                self.assertFalse(rendered.streamed)
+                self.assertTrue(streamed.streamed)
+                self.assertEqual(streamed.content, rendered.content)
+                self.assertEqual(streamed.headers['etag'],
+                                 rendered.headers['etag'])
+                json.loads(streamed.content)
+
+    def test_stream_decision_follows_the_filtered_rows(self):
+        # 9 rows of 23 columns in all, 2 rows for one item
+        n_cells = 9 * (3 + N_DAYS)
+        self.assertTrue(self.fetch(n_cells - 1).streamed)
+        self.assertFalse(self.fetch(n_cells).streamed)
+        filtered = self.fetch(n_cells // 2, item_id='FOODS_1_001')
+        self.assertFalse(filtered.streamed)
+        self.assertEqual(resultsStore.count_rows(
+            GROUP, {'item_id': 'FOODS_1_001'}), (2, 2))
+
+    def test_frames_are_read_in_column_chunks(self):
+        filters = {'store_id': 'TX_1'}
+        expected = resultsStore.select_results(GROUP, filters)
+        for name, expected_df in zip(resultsStore.FRAMES, expected):
+            with self.subTest(frame=name):
+                chunks = list(resultsStore.iter_frame(GROUP, name, filters))
+                self.assertEqual(len(chunks), 8)
+                self.assertTrue(all(len(chunk.columns) <= CHUNK_COLUMNS
+                                    for chunk in chunks))
+                pd.testing.assert_frame_equal(pd.concat(chunks, axis=1),
+                                              expected_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.infrastructure import checkpointStore, modelStore, resultsStore
+
+GROUP = "('FOODS',)"
+
+
+class StubModel:
+    """
+    Stands in for a Keras model: save writes a marker file and there are no
+    layers to export.
+    """
+
+    layers = []
+
+    def __init__(self, marker: str):
+        self.marker = marker
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.marker)
+
+
+class StubScaler:
+    scale_ = np.ones(3)
+    min_ = np.zeros(3)
+
+
+class GroupPathTest(unittest.TestCase):
+
+    def test_rejects_names_leaving_the_store(self):
+        for name in ['../../x', '..', '.', '', 'a/b', 'x\0y']:
+            with self.subTest(name=name):
+                self.assertFalse(resultsStore.is_valid_group_name(name))
+                with self.assertRaises(ValueError):
+                    resultsStore.get_paths(name)
+                with self.assertRaises(ValueError):
+                    modelStore.get_model_dir(name)
+                with self.assertRaises(ValueError):
+                    checkpointStore.get_checkpoint_dir(name)
+
+    def test_accepts_group_names(self):
+        for name in [GROUP, "('FOODS_1', 'CA_1')", 'global']:
+            self.assertTrue(resultsStore.is_valid_group_name(name))
+        self.assertEqual(modelStore.get_model_dir(GROUP),
+                         os.path.join(modelStore.MODELS_DIR, GROUP))
+
+
+class SaveModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.models_dir = os.path.join(self.tmp.name, 'models')
+        patcher = mock.patch.object(modelStore, 'MODELS_DIR', self.models_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def save(self, marker, scaler=StubScaler(), training_key='key'):
+        modelStore.save_model(
+            GROUP, StubModel(marker), scaler, np.zeros((14, 3)),
+            ['d_61'], np.zeros((1, 2)), pd.DataFrame({'id': ['a', 'b']}),
+            training_key=training_key)
+
+    def read_marker(self):
+        with open(os.path.join(modelStore.get_model_dir(GROUP),
+                               'model.keras')) as f:
+            return f.read()
+
+    def test_replaces_the_whole_directory(self):
+        self.save('first', training_key='first')
+        self.save('second', training_key='second')
+        self.assertEqual(self.read_marker(), 'second')
+        self.assertEqual(modelStore.get_training_key(GROUP), 'second')
+        self.assertEqual(os.listdir(self.models_dir), [GROUP])
+
+    def test_failed_save_keeps_the_previous_model(self):
+        self.save('first', training_key='first')
+        # The scaler is written after the model: fail half-way
+        with self.assertRaises(AttributeError):
+            self.save('second', scaler=None, training_key='second')
+        self.assertEqual(self.read_marker(), 'first')
+        self.assertEqual(modelStore.get_training_key(GROUP), 'first')
+        # The next save discards the partial directory
+        self.save('third', training_key='third')
+        self.assertEqual(self.read_marker(), 'third')
+        self.assertEqual(os.listdir(self.models_dir), [GROUP])
+
+
+class PruneOtherLevelsTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.results_dir = tmp.name
+        for module, name, path in [
+                (resultsStore, 'RESULTS_DIR', self.results_dir),
+                (modelStore, 'MODELS_DIR',
+                 os.path.join(self.results_dir, 'models')),
+                (checkpointStore, 'CHECKPOINTS_DIR',
+                 os.path.join(self.results_dir, 'checkpoints'))]:
+            patcher = mock.patch.object(module, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def store_group(self, name):
+        frame = pd.DataFrame({'item_id': ['i'], 'store_id': ['s'],
+                              'd_1': [1.0]})
+        resultsStore.save_results(name, frame, frame, 'key')
+        os.makedirs(modelStore.get_model_dir(name))
+        os.makedirs(checkpointStore.get_checkpoint_dir(name))
+
+    def test_only_the_trained_level_is_kept(self):
+        from src.application import workflow
+
+        level_4 = ["('FOODS',)", "('HOBBIES',)"]
+        level_3 = ["('CA_1',)", "('TX_1',)"]
+        for name in level_4 + level_3[:1]:
+            self.store_group(name)
+        os.makedirs(checkpointStore.get_checkpoint_dir(
+            workflow.GLOBAL_CHECKPOINT))
+
+        resultsStore.save_level(4, level_4)
+        self.assertCountEqual(resultsStore.list_groups(), level_4)
+        self.assertCountEqual(resultsStore.list_groups(all_levels=True),
+                              level_4 + level_3[:1])
+
+        workflow.prune_other_levels(3, level_3)
+        self.assertEqual(resultsStore.load_level()['model_level'], 3)
+        self.assertEqual(resultsStore.list_groups(), level_3[:1])
+        self.assertEqual(resultsStore.list_groups(all_levels=True),
+                         level_3[:1])
+        self.assertEqual(modelStore.list_models(), level_3[:1])
+        self.assertCountEqual(checkpointStore.list_checkpoints(),
+                              level_3[:1] + [workflow.GLOBAL_CHECKPOINT])
+
+
+class GroupKeyEndpointTest(unittest.TestCase):
+
+    def test_invalid_keys_are_not_found(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.application import workflow
+
+        app = FastAPI()
+        app.include_router(workflow.router)
+        client = TestClient(app)
+        key = '../../x'
+        with mock.patch.object(resultsStore, 'load_index') as load_index, \
+                mock.patch.object(modelStore, 'load_model_artifacts') as load:
+            for response in [
+                    client.post('/api/modelData', params={'key': key}),
+                    client.post('/api/forecast', params={'key': key}),
+                    client.get('/api/seriesData', params={
+                        'key': key, 'item_id': 'i', 'store_id': 's'}),
+                    client.get('/api/seriesIndex', params={'key': key})]:
+                self.assertEqual(response.status_code, 404)
+            load_index.assert_not_called()
+            load.assert_not_called()
+
+
+class ForecastHorizonTest(unittest.TestCase):
+
+    def setUp(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.application import workflow
+
+        app = FastAPI()
+        app.include_router(workflow.router)
+        self.client = TestClient(app)
+        patcher = mock.patch.object(modelStore, 'load_model_artifacts',
+                                    return_value=None)
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def forecast(self, n_forecast):
+        return self.client.post('/api/forecast', params={
+            'key': GROUP, 'n_forecast': n_forecast})
+
+    def test_out_of_range_horizons_are_rejected(self):
+        for n_forecast in [0, -1, 29, 10 ** 9]:
+            with self.subTest(n_forecast=n_forecast):
+                self.assertEqual(self.forecast(n_forecast).status_code, 422)
+        self.load.assert_not_called()
+
+    def test_horizon_follows_the_configuration(self):
+        from src.domain import configLoader
+
+        with mock.patch.object(configLoader, 'load_config',
+                               return_value={'max_forecast_days': 56}):
+            self.assertEqual(self.forecast(57).status_code, 422)
+            # Accepted, then not found in the stubbed store
+            self.assertEqual(self.forecast(56).status_code, 404)
+        self.load.assert_called_once_with(GROUP)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+from benchmarks.syntheticData import (generate_calendar, generate_sales,
+                                      get_series_ids)
+from src.domain import calendarFeatures
+from src.domain.preProcessing import MergeExogenousFeatures
+
+N_DAYS = 60
+
+
+def merge_on_day_names(sales_df, calendar_df):
+    """
+    The date-keyed merge MergeExogenousFeatures replaced: the transposed
+    sales joined with the calendar flags on the day names.
+    """
+    calendar_df = calendar_df.copy()
+    calendar_df['event_1_flag'] = calendar_df['event_name_1'].notna(
+    ).astype(int)
+    calendar_df['event_2_flag'] = calendar_df['event_name_2'].notna(
+    ).astype(int)
+    sales_t_df = sales_df[[col for col in sales_df.columns
+                           if col not in calendarFeatures.ID_COLUMNS]
+                          ].T.reset_index().rename(columns={'index': 'd'})
+    merged_df = pd.merge(sales_t_df, calendar_df[
+        ['d'] + calendarFeatures.EXOGENOUS_COLUMNS], on='d',
+        how='left').drop(columns=['d'])
+    merged_df.columns = merged_df.columns.astype(str)
+    return merged_df
+
+
+class MergeExogenousFeaturesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.calendar_df = generate_calendar(N_DAYS, rng)
+        # The synthetic calendar has no second events
+        cls.calendar_df.loc[::9, 'event_name_2'] = 'Easter'
+        # A group: a few rows of the sales, keeping their row labels
+        cls.sales_df = generate_sales(get_series_ids(20), N_DAYS, 0.6,
+                                      rng).iloc[[3, 7, 8, 15]]
+
+    def assert_same_matrix(self, sales_df, calendar_df):
+        expected = merge_on_day_names(sales_df, calendar_df)
+        merged = MergeExogenousFeatures(calendar_df).fit_transform(sales_df)
+        self.assertEqual(list(merged.columns), list(expected.columns))
+        np.testing.assert_array_equal(merged.to_numpy(dtype=float),
+                                      expected.to_numpy(dtype=float))
+
+    def test_same_matrix_as_the_date_keyed_merge(self):
+        self.assert_same_matrix(self.sales_df, self.calendar_df)
+
+    def test_calendar_order_does_not_matter(self):
+        self.assert_same_matrix(self.sales_df,
+                                self.calendar_df.sample(frac=1,
+                                                        random_state=0))
+
+    def test_days_missing_from_the_calendar(self):
+        # The last days have no calendar row: NaN features in both
+        self.assert_same_matrix(self.sales_df, self.calendar_df.iloc[:-5])
+
+    def test_subset_of_the_days(self):
+        day_cols = [f'd_{day}' for day in range(20, 41)]
+        self.assert_same_matrix(
+            self.sales_df[calendarFeatures.ID_COLUMNS + day_cols],
+            self.calendar_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.application import workflow
+from src.domain import configLoader
+from src.infrastructure import resultsStore
+from src.infrastructure.responseCache import ResponseCache, etag_matches
+
+GROUP = "('FOODS',)"
+
+
+class ETagTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResponseCache(max_entries=8, max_bytes=1024 ** 2)
+        for module, name, value in [
+                (resultsStore, 'RESULTS_DIR', tmp.name),
+                (workflow, 'response_cache', self.cache)]:
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.save(2)
+        app = FastAPI()
+        app.include_router(workflow.router)
+        self.client = TestClient(app)
+
+    def save(self, n_rows):
+        valid_df = pd.DataFrame({
+            'id': [f'FOODS_1_{row:03d}_CA_1' for row in range(n_rows)],
+            'd_1': [float(row) for row in range(n_rows)]})
+        resultsStore.save_results(GROUP, valid_df, valid_df, 'key')
+
+    def fetch(self, etag=None, stream_cells=200_000):
+        headers = {} if etag is None else {'If-None-Match': etag}
+        with mock.patch.object(
+                configLoader, 'load_config',
+                return_value={'model_data_stream_cells': stream_cells}):
+            return self.client.post('/api/modelData', params={'key': GROUP},
+                                    headers=headers)
+
+    def test_revalidation_answers_304(self):
+        response = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['etag']
+        revalidated = self.fetch(etag)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+        self.assertEqual(revalidated.headers['etag'], etag)
+        # Rendered once, then answered from the cache
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        # The streamed responses carry the same ETag
+        self.assertEqual(self.fetch(etag, stream_cells=0).status_code, 304)
+
+    def test_rewritten_results_change_the_etag(self):
+        response = self.fetch()
+        etag = response.headers['etag']
+        self.save(3)
+        updated = self.fetch(etag)
+        self.assertEqual(updated.status_code, 200)
+        self.assertNotEqual(updated.headers['etag'], etag)
+        self.assertEqual(len(updated.json()['valid_df']['id']), 3)
+        self.assertEqual(self.fetch(updated.headers['etag']).status_code,
+                         304)
+
+    def test_model_names_revalidation(self):
+        response = self.client.get('/api/modelNames')
+        self.assertEqual(response.json(), [GROUP])
+        revalidated = self.client.get(
+            '/api/modelNames',
+            headers={'If-None-Match': response.headers['etag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+
+    def test_if_none_match_forms(self):
+        etag = '"abc"'
+        for header, expected in [(None, False), ('', False),
+                                 ('"abc"', True), ('W/"abc"', True),
+                                 ('"xyz", "abc"', True), ('*', True),
+                                 ('"xyz"', False)]:
+            with self.subTest(header=header):
+                self.assertEqual(etag_matches(header, etag), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.application import workflow
+from src.infrastructure import resultsStore
+
+GROUP = "('FOODS',)"
+
+
+class SeriesIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(resultsStore, 'RESULTS_DIR', tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.valid_df = pd.DataFrame({
+            'item_id': ['FOODS_1_001', 'FOODS_1_001', 'FOODS_1_002'],
+            'store_id': ['CA_1', 'TX_1', 'CA_1'],
+            'd_1': [1.0, 2.0, 3.0]})
+        # The exogenous rows of the predictions have no series
+        pred_df = pd.concat([self.valid_df, pd.DataFrame({
+            'item_id': [np.nan], 'store_id': [np.nan], 'd_1': [0.0]})],
+            ignore_index=True)
+        resultsStore.save_results(GROUP, self.valid_df, pred_df, 'key')
+        self.expected = {'FOODS_1_001': ['CA_1', 'TX_1'],
+                         'FOODS_1_002': ['CA_1']}
+
+    def test_listed_from_the_index(self):
+        with mock.patch.object(resultsStore, 'select_results') as select:
+            self.assertEqual(resultsStore.list_series(GROUP), self.expected)
+        select.assert_not_called()
+        self.assertIsNone(resultsStore.list_series("('HOBBIES',)"))
+
+    def test_listed_without_an_index(self):
+        _, index_path = resultsStore.get_paths(GROUP)
+        index = resultsStore.load_index(GROUP)
+        del index['series']
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+        self.assertEqual(resultsStore.list_series(GROUP), self.expected)
+
+    def test_endpoint(self):
+        app = FastAPI()
+        app.include_router(workflow.router)
+        client = TestClient(app)
+        response = client.get('/api/seriesIndex', params={'key': GROUP})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.expected)
+        revalidated = client.get(
+            '/api/seriesIndex', params={'key': GROUP},
+            headers={'If-None-Match': response.headers['etag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(client.get('/api/seriesIndex', params={
+            'key': "('HOBBIES',)"}).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
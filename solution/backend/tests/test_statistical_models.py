@@ -0,0 +1,108 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.domain import statisticalModels
+
+N_DAYS = 120
+N_SERIES = 5
+N_FORECAST = 14
+
+
+def naive_seasonal(sales, exogenous, n_forecast):
+    n_train = len(sales) - n_forecast
+    return np.array([sales[n_train + t - statisticalModels.SEASON]
+                     for t in range(n_forecast)], dtype=float)
+
+
+def naive_exponential_smoothing(sales, exogenous, n_forecast):
+    n_train = len(sales) - n_forecast
+    predictions = np.empty((n_forecast, sales.shape[1]))
+    for series in range(sales.shape[1]):
+        best_error = None
+        for alpha in statisticalModels.SMOOTHING_LEVELS:
+            level, error, forecast = float(sales[0, series]), 0.0, []
+            for t in range(1, len(sales)):
+                if t < n_train:
+                    error += (sales[t, series] - level) ** 2
+                else:
+                    forecast.append(level)
+                level += alpha * (sales[t, series] - level)
+            if best_error is None or error < best_error:
+                best_error = error
+                predictions[:, series] = forecast
+    return predictions
+
+
+def naive_ridge(sales, exogenous, n_forecast):
+    n_train = len(sales) - n_forecast
+    lags = statisticalModels.RIDGE_LAGS
+    first_day = max(max(lags),
+                    n_train - statisticalModels.RIDGE_TRAIN_DAYS)
+    exogenous = np.nan_to_num(exogenous.astype(float))
+    predictions = np.empty((n_forecast, sales.shape[1]))
+    for series in range(sales.shape[1]):
+        scale = sales[:n_train, series].mean() + 1e-3
+        scaled = sales[:, series] / scale
+
+        def features(day):
+            return [1.0] + [scaled[day - lag] for lag in lags] + \
+                list(exogenous[day])
+
+        X = np.array([features(day) for day in range(first_day, n_train)])
+        y = scaled[first_day:n_train]
+        weights = np.linalg.solve(
+            X.T @ X + statisticalModels.RIDGE_ALPHA * np.eye(X.shape[1]),
+            X.T @ y)
+        for t, day in enumerate(range(n_train, len(sales))):
+            predictions[t, series] = \
+                max(float(np.dot(features(day), weights)), 0.0) * scale
+    return predictions
+
+
+REFERENCES = {
+    'seasonal_naive': naive_seasonal,
+    'exponential_smoothing': naive_exponential_smoothing,
+    'ridge': naive_ridge,
+}
+
+
+class EnginesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.sales = rng.poisson(
+            rng.gamma(1.5, 2.0, size=N_SERIES), size=(N_DAYS, N_SERIES))
+        cls.exogenous = rng.integers(0, 2, size=(N_DAYS, 3)).astype(float)
+        cls.exogenous[::10, 1] = np.nan
+
+    def test_every_engine_has_a_reference(self):
+        self.assertEqual(set(REFERENCES), set(statisticalModels.ENGINES))
+
+    def test_engines_match_references(self):
+        for model_type, reference in REFERENCES.items():
+            with self.subTest(model_type=model_type):
+                predictions = statisticalModels.predict_validation(
+                    model_type, self.sales, self.exogenous, N_FORECAST)
+                self.assertEqual(predictions.shape, (N_FORECAST, N_SERIES))
+                np.testing.assert_allclose(
+                    predictions,
+                    reference(self.sales, self.exogenous, N_FORECAST),
+                    rtol=1e-6, atol=1e-8)
+
+    def test_ridge_chunks_are_independent(self):
+        with mock.patch.object(statisticalModels, 'RIDGE_CHUNK_SERIES', 2):
+            chunked = statisticalModels.ridge(self.sales, self.exogenous,
+                                              N_FORECAST)
+        np.testing.assert_allclose(
+            chunked, naive_ridge(self.sales, self.exogenous, N_FORECAST),
+            rtol=1e-6, atol=1e-8)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            statisticalModels.predict_validation(
+                'keras', self.sales, self.exogenous, N_FORECAST)
+
+
+if __name__ == '__main__':
+    unittest.main()
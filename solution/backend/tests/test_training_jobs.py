@@ -0,0 +1,155 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.application import trainingJobs, workflow
+from src.infrastructure import checkpointStore, modelStore, resultsStore
+
+# Seconds to wait for a job's thread
+TIMEOUT = 10
+
+
+class TrainingJobsTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.results_dir = tmp.name
+        for module, name, value in [
+                (resultsStore, 'RESULTS_DIR', self.results_dir),
+                (modelStore, 'MODELS_DIR',
+                 os.path.join(self.results_dir, 'models')),
+                (checkpointStore, 'CHECKPOINTS_DIR',
+                 os.path.join(self.results_dir, 'checkpoints')),
+                (trainingJobs, 'jobs', trainingJobs.OrderedDict())]:
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Released by a test to let the stubbed training finish
+        self.release = threading.Event()
+        self.release.set()
+        self.calls = []
+        patcher = mock.patch.object(workflow, 'run_multiple_model',
+                                    self.run_multiple_model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(trainingJobs.router)
+        self.client = TestClient(app)
+
+    def run_multiple_model(self, model_level=None, epochs=None, job=None,
+                           model_type=None, training_mode=None):
+        """
+        Stands in for the training: registers two groups, finishes the
+        first and, unless cancelled meanwhile, the second.
+        """
+        self.calls.append({"model_level": model_level, "epochs": epochs,
+                           "results": sorted(os.listdir(self.results_dir))})
+        job.set_groups(['a', 'b'])
+        job.update_group('a', 'completed')
+        self.assertTrue(self.release.wait(TIMEOUT))
+        job.update_group('b', 'cancelled' if job.is_cancelled() else
+                         'completed')
+
+    def wait_for(self, job_id):
+        job = trainingJobs.jobs[job_id]
+        for _ in range(TIMEOUT * 100):
+            if not job.is_active():
+                return self.client.get(f'/api/trainingJobs/{job_id}').json()
+            time.sleep(0.01)
+        self.fail(f"Training job {job_id} did not finish")
+
+    def test_force_removes_the_stored_results_first(self):
+        open(os.path.join(self.results_dir, 'level.json'), 'w').close()
+        status = self.client.post('/api/trainingJobs', params={
+            'model_level': 3, 'epochs': 1}).json()
+        self.assertFalse(status['force'])
+        self.wait_for(status['job_id'])
+        self.assertEqual(self.calls[-1]['results'], ['level.json'])
+
+        status = self.client.post('/api/trainingJobs', params={
+            'model_level': 3, 'epochs': 1, 'force': True}).json()
+        self.assertTrue(status['force'])
+        self.assertEqual(self.wait_for(status['job_id'])['state'],
+                         'completed')
+        self.assertEqual(self.calls[-1]['results'], [])
+
+    def test_status_endpoints(self):
+        status = self.client.post('/api/trainingJobs', params={
+            'model_level': 3, 'epochs': 2}).json()
+        self.assertEqual((status['model_level'], status['epochs']), (3, 2))
+        job_id = status['job_id']
+        status = self.wait_for(job_id)
+        self.assertEqual(status['state'], 'completed')
+        self.assertEqual(status['progress']['total'], 2)
+        self.assertEqual(status['progress']['completed'], 2)
+        self.assertIsNotNone(status['finished_at'])
+        self.assertEqual(self.calls, [{"model_level": 3, "epochs": 2,
+                                       "results": []}])
+        self.assertEqual(
+            [job['job_id'] for job in
+             self.client.get('/api/trainingJobs').json()], [job_id])
+        groups = self.client.get(f'/api/trainingJobs/{job_id}/groups').json()
+        self.assertEqual({name: group['state']
+                          for name, group in groups.items()},
+                         {'a': 'completed', 'b': 'completed'})
+        for response in [self.client.get('/api/trainingJobs/unknown'),
+                         self.client.delete('/api/trainingJobs/unknown')]:
+            self.assertEqual(response.status_code, 404)
+
+    def test_invalid_parameters(self):
+        for params in [{'epochs': 0}, {'model_level': 99},
+                       {'model_type': 'unknown'}]:
+            with self.subTest(**params):
+                self.assertEqual(self.client.post(
+                    '/api/trainingJobs', params=params).status_code, 422)
+        self.assertEqual(self.calls, [])
+
+    def test_concurrent_start_is_rejected(self):
+        self.release.clear()
+        first = self.client.post('/api/trainingJobs', params={
+            'model_level': 3, 'epochs': 1}).json()
+        response = self.client.post('/api/trainingJobs', params={
+            'model_level': 4, 'epochs': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertIn(first['job_id'], response.json()['detail'])
+        self.release.set()
+        self.assertEqual(self.wait_for(first['job_id'])['state'],
+                         'completed')
+        # Once finished, another job may start
+        second = self.client.post('/api/trainingJobs', params={
+            'model_level': 4, 'epochs': 1})
+        self.assertEqual(second.status_code, 200)
+        self.wait_for(second.json()['job_id'])
+
+    def test_cancellation(self):
+        self.release.clear()
+        job_id = self.client.post('/api/trainingJobs', params={
+            'model_level': 3, 'epochs': 1}).json()['job_id']
+        status = self.client.delete(f'/api/trainingJobs/{job_id}').json()
+        self.assertTrue(status['cancel_requested'])
+        self.release.set()
+        status = self.wait_for(job_id)
+        self.assertEqual(status['state'], 'cancelled')
+        self.assertEqual((status['progress']['completed'],
+                          status['progress']['cancelled']), (1, 1))
+        # Cancelling a finished job changes nothing
+        self.assertEqual(self.client.delete(
+            f'/api/trainingJobs/{job_id}').json()['state'], 'cancelled')
+
+    def test_failure(self):
+        with mock.patch.object(workflow, 'run_multiple_model',
+                               side_effect=ValueError('no sales')):
+            job_id = self.client.post('/api/trainingJobs', params={
+                'model_level': 3, 'epochs': 1}).json()['job_id']
+            status = self.wait_for(job_id)
+        self.assertEqual((status['state'], status['error']),
+                         ('failed', 'no sales'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from benchmarks.syntheticData import (generate_calendar, generate_sales,
+                                      get_series_ids)
+from src.domain import trainingKey
+
+
+class TrainingKeyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.sales_df = generate_sales(get_series_ids(10), 60, 0.6, rng)
+        cls.calendar_digest = trainingKey.get_calendar_digest(
+            generate_calendar(60, rng))
+
+    def setUp(self):
+        # Copies of the preprocessing sources, edited by the tests
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source_files = []
+        for path in trainingKey.PREPROCESSING_SOURCE_FILES:
+            copy = os.path.join(tmp.name, os.path.basename(path))
+            shutil.copyfile(path, copy)
+            self.source_files.append(copy)
+        patcher = mock.patch.object(trainingKey, 'PREPROCESSING_SOURCE_FILES',
+                                    self.source_files)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        trainingKey.get_preprocessing_source.cache_clear()
+        self.addCleanup(trainingKey.get_preprocessing_source.cache_clear)
+
+    def get_key(self, inference_weights='float16'):
+        return trainingKey.get_training_key(
+            self.sales_df, self.calendar_digest, 28, 7, 1, 'keras',
+            inference_weights)
+
+    def test_key_is_stable(self):
+        self.assertEqual(self.get_key(), self.get_key())
+
+    def test_preprocessing_sources_change_the_key(self):
+        for path in self.source_files:
+            with self.subTest(source=os.path.basename(path)):
+                key = self.get_key()
+                with open(path, 'a') as f:
+                    f.write('\n# changed\n')
+                trainingKey.get_preprocessing_source.cache_clear()
+                self.assertNotEqual(self.get_key(), key)
+
+    def test_inference_weights_change_the_key(self):
+        keys = {self.get_key(weights)
+                for weights in ['float32', 'float16', 'int8', None]}
+        self.assertEqual(len(keys), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
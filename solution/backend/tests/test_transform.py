@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from benchmarks.syntheticData import generate_sales, get_series_ids
+from src.domain import transform
+from src.domain.hierarchy import Hierarchy
+from src.domain.models.definitions import model_levels
+
+
+class ModelDetailsPerLevelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.sales_df = generate_sales(get_series_ids(140), 30, 0.6, rng)
+        cls.hierarchy = Hierarchy(cls.sales_df)
+
+    def test_groups_match_the_hierarchy(self):
+        columns = list(self.sales_df.columns)
+        for model_level in model_levels:
+            with self.subTest(level=model_level.LevelId):
+                counts, grouped = transform.get_model_details_per_level(
+                    self.sales_df, model_level)
+                group_rows = transform.get_group_rows(grouped)
+                expected = self.hierarchy.get_group_rows(model_level.LevelId)
+                self.assertEqual([name for name, _ in group_rows],
+                                 [name for name, _ in expected])
+                for (_, rows), (_, expected_rows) in zip(group_rows,
+                                                         expected):
+                    np.testing.assert_array_equal(rows, expected_rows)
+                self.assertEqual(counts.iloc[:, -1].tolist(),
+                                 [len(rows) for _, rows in expected])
+                self.assertEqual(list(self.sales_df.columns), columns)
+
+    def test_level_1_counts_every_series(self):
+        counts, grouped = transform.get_model_details_per_level(
+            self.sales_df, model_levels[0])
+        self.assertEqual(counts.shape, (1, 2))
+        self.assertEqual(counts.iloc[0, -1], len(self.sales_df))
+        _, group_df = next(iter(grouped))
+        self.assertNotIn('for_all', group_df.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
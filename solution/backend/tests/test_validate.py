@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from benchmarks.syntheticData import generate_sales, get_series_ids
+from src.domain.models.definitions import sales
+from src.domain.validate import validate_table
+
+
+class ValidateSalesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sales_df = generate_sales(get_series_ids(70), 30, 0.6,
+                                       np.random.default_rng(0))
+
+    def assert_invalid(self, message):
+        with self.assertRaises(Exception) as context:
+            validate_table(self.sales_df, sales)
+        self.assertIn(message, str(context.exception))
+
+    def test_valid_table(self):
+        validate_table(self.sales_df, sales)
+
+    def test_negative_sales(self):
+        self.sales_df.loc[3, 'd_7'] = -1
+        self.assert_invalid("days: negative values (minimum -1)")
+
+    def test_missing_sales(self):
+        self.sales_df['d_7'] = self.sales_df['d_7'].astype(float)
+        self.sales_df.loc[3, 'd_7'] = np.nan
+        # A missing count turns the column into floats
+        self.assert_invalid("days: dtype float64, expected integer")
+
+    def test_gapped_days(self):
+        self.sales_df = self.sales_df.drop(columns=['d_5'])
+        self.assert_invalid("days: not a contiguous range from 1, column " +
+                            "4 has number 6 instead of 5")
+
+    def test_days_out_of_order(self):
+        columns = list(self.sales_df.columns)
+        first = columns.index('d_1')
+        columns[first], columns[first + 1] = columns[first + 1], \
+            columns[first]
+        self.sales_df = self.sales_df[columns]
+        self.assert_invalid("days: not a contiguous range from 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,9 @@
-
 import os
 import streamlit as st
-from src.infrastructure import pageConfig, backendHealthCheck
+from src.infrastructure import (pageConfig, backendHealthCheck,
+                                backendClient)
 from src.domain import footer
 import requests
-import pandas as pd
 import plotly.graph_objects as go
 
 footer.hide_footer(st)
@@ -12,122 +11,104 @@ pageConfig.set_env_vars()
 backend_url = os.environ['backend']
 
 step_1, step_2, step_3, step_4 = False, False, False, False
+# Longest history that can be plotted and points per plotted line
+MAX_HISTORY_DAYS = 1913
+PLOT_POINTS = 500
 
 # Step 1 Background health check
 # st.write("Let's make sure our backend is running")
 backendHealthCheck.add_health_check_button(st,
                                            backend_url=backend_url)
-step_1 = backendHealthCheck.health_check(backend_url=backend_url)
+# Checked at most once every few seconds, not on every widget interaction
+step_1 = backendClient.is_healthy(backend_url)
 
 if step_1:
     # Fetch the model config
-    config_response = requests.get(backend_url+'modelLevelConfig')
-    # Check if the request was successful
-    if config_response.status_code == 200:
-        # Parse the JSON response
-        config_response_json = config_response.json()
+    try:
+        config_response_json = backendClient.fetch_config(backend_url)
         # Display the response data
         st.write("Current backend running at this config")
 
         st.write(f"Model Level - {config_response_json['model_level']}")
         st.write(f"Training Epochs - {config_response_json['epochs']}")
         step_2 = True
-    else:
+    except requests.HTTPError as e:
         step_2 = False
         st.error(
-            f"""Error: {config_response.status_code}
+            f"""Error: {e.response.status_code}
              - Failed to fetch config from API.""")
 
 # Now let's fetch the model dropdown
 if step_2:
     try:
-        model_names_response = requests.get(backend_url + "modelNames")
-        if model_names_response.status_code == 200:
-            model_names = model_names_response.json()
-            if model_names:
-                selected_model = st.selectbox("Select a model", model_names)
-                step_3 = True
-            else:
-                st.write("No model found")
-                step_3 = False
+        model_names = backendClient.fetch_model_names(backend_url)
+        if model_names:
+            selected_model = st.selectbox("Select a model", model_names)
+            step_3 = True
         else:
-            st.error(
-                "Failed to fetch model names:" +
-                f" {model_names_response.status_code}")
+            st.write("No model found")
             step_3 = False
+    except requests.HTTPError as e:
+        st.error(
+            "Failed to fetch model names:" +
+            f" {e.response.status_code}")
+        step_3 = False
     except Exception as e:
         step_3 = False
         st.error(f"An error occurred: {str(e)}")
 
+# Fetches are cached by model name and series, so changing the dropdowns
+# back and forth never downloads them again
 if step_3 and selected_model:
-    model_data_response = requests.post(
-        backend_url + "modelData", params={'key': selected_model})
-
-    if model_data_response.status_code == 200:
-        model_data = model_data_response.json()
-        # st.write("Model Data:")
-        # st.json(model_data)  # Display the JSON data in a nice format
-        # Convert 'valid_df' to DataFrame
-        valid_df = pd.DataFrame(model_data["valid_df"])
-
-        # Convert 'pred_df' to DataFrame
-        pred_df = pd.read_json(model_data["pred_df"])
-        if 'item_id' in valid_df.columns:
-            item_ids = valid_df['item_id'].unique()
-            selected_item_id = st.selectbox("Select an item ID", item_ids)
+    try:
+        item_stores = backendClient.fetch_item_stores(backend_url,
+                                                      selected_model)
+        if item_stores:
+            selected_item_id = st.selectbox("Select an item ID",
+                                            list(item_stores))
+            selected_store_id = st.selectbox("Select a store ID",
+                                             item_stores[selected_item_id])
+            n_days = st.slider("Days of history", min_value=28,
+                               max_value=MAX_HISTORY_DAYS, value=365)
+            # The backend downsamples long histories to PLOT_POINTS points
+            series = backendClient.fetch_series(
+                backend_url, selected_model, selected_item_id,
+                selected_store_id, n_days, PLOT_POINTS)
+            step_4 = True
         else:
-            st.error("Item ID column not found in the DataFrame.")
-        step_4 = True
-    else:
+            st.error(f"Group {selected_model} has no series.")
+    except requests.HTTPError as e:
         step_4 = False
         st.error(
             f"Failed to fetch data for model {selected_model}:" +
-            f"{model_data_response.status_code}")
-
-
-def plot_item_predictions(item_id, valid_df, pred_df):
-    # Filter for the selected item_id
-    valid_item_df = valid_df[valid_df['item_id'] == item_id]
-    pred_item_df = pred_df[pred_df['item_id'] == item_id]
-
-    # Assuming the structure of your DataFrame is
-    # consistent with the columns provided
-    # Extract date columns (d_XXXX)
-    date_columns = [col for col in valid_item_df if col.startswith('d_')]
+            f"{e.response.status_code}")
 
-    # Convert wide format to long format for easier plotting
-    valid_long = pd.melt(valid_item_df, id_vars=[
-                         'item_id'],
-                         value_vars=date_columns,
-                         var_name='date',
-                         value_name='actual')
-    pred_long = pd.melt(pred_item_df, id_vars=[
-                        'item_id'], value_vars=date_columns,
-                        var_name='date',
-                        value_name='prediction')
 
+def plot_series_predictions(series):
     # Create plot
     fig = go.Figure()
 
     # Add actual sales trace
     fig.add_trace(go.Scatter(
-        x=valid_long['date'], y=valid_long['actual'],
-        mode='lines+markers', name='Actual'))
+        x=series['actual']['dates'], y=series['actual']['values'],
+        mode='lines', name='Actual'))
 
     # Add predicted sales trace
     fig.add_trace(go.Scatter(
-        x=pred_long['date'], y=pred_long['prediction'],
+        x=series['prediction']['dates'], y=series['prediction']['values'],
         mode='lines+markers', name='Prediction'))
 
     # Update layout
-    fig.update_layout(title=f'Actual vs Predicted Sales for Item {item_id}',
-                      xaxis_title='Date', yaxis_title='Sales',
-                      margin=dict(l=20, r=20, t=30, b=20))
+    fig.update_layout(
+        title=f"Actual vs Predicted Sales for Item {series['item_id']}" +
+        f" in Store {series['store_id']}",
+        xaxis_title='Date', yaxis_title='Sales',
+        margin=dict(l=20, r=20, t=30, b=20))
 
     return fig
 
 
 if step_4:
     # Plot and display
-    fig = plot_item_predictions(selected_item_id, valid_df, pred_df)
+    fig = plot_series_predictions(series)
     st.plotly_chart(fig)
@@ -0,0 +1,130 @@
+from typing import Any, Dict, List
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# Seconds a backend answer is reused across reruns before it is fetched
+# again. Results only change when a training job finishes.
+CONFIG_TTL = 60
+MODEL_NAMES_TTL = 30
+MODEL_DATA_TTL = 300
+HEALTH_CHECK_TTL = 10
+# Connections kept open to the backend, shared by every session of the app
+POOL_SIZE = 10
+# Seconds to wait for the backend to connect and to answer
+TIMEOUT = (3, 60)
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    Returns the HTTP session shared by every rerun and every user of the
+    app, so that requests reuse pooled keep-alive connections to the
+    backend.
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                          max_retries=1)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get(backend_url: str, endpoint: str, **params) -> requests.Response:
+    """
+    Sends a GET request to the backend API through the pooled session.
+
+    Raises:
+        requests.HTTPError: If the backend answers with an error status, so
+        that failed answers are never cached.
+    """
+    response = get_session().get(backend_url + endpoint, params=params,
+                                 timeout=TIMEOUT)
+    response.raise_for_status()
+    return response
+
+
+@st.cache_data(ttl=HEALTH_CHECK_TTL, show_spinner=False)
+def is_healthy(backend_url: str) -> bool:
+    """
+    Checks that the backend is up, at most once per HEALTH_CHECK_TTL.
+
+    Args:
+        backend_url (str): Base URL of the backend API.
+
+    Returns:
+        bool: True if the backend answered its health check.
+    """
+    return b'true' in get(backend_url, 'healthCheck').content
+
+
+@st.cache_data(ttl=CONFIG_TTL, show_spinner=False)
+def fetch_config(backend_url: str) -> Dict[str, Any]:
+    """
+    Fetches the model configuration the backend is running with.
+
+    Args:
+        backend_url (str): Base URL of the backend API.
+
+    Returns:
+        Dict[str, Any]: The configuration, including model_level and epochs.
+    """
+    return get(backend_url, 'modelLevelConfig').json()
+
+
+@st.cache_data(ttl=MODEL_NAMES_TTL, show_spinner=False)
+def fetch_model_names(backend_url: str) -> List[str]:
+    """
+    Fetches the names of the model groups with stored results.
+
+    Args:
+        backend_url (str): Base URL of the backend API.
+
+    Returns:
+        List[str]: The group names.
+    """
+    return get(backend_url, 'modelNames').json()
+
+
+@st.cache_data(ttl=MODEL_DATA_TTL, show_spinner=False)
+def fetch_item_stores(backend_url: str,
+                      model_name: str) -> Dict[str, List[str]]:
+    """
+    Fetches the series of a model group from its series index, without any
+    day column.
+
+    Args:
+        backend_url (str): Base URL of the backend API.
+        model_name (str): Name of the model group.
+
+    Returns:
+        Dict[str, List[str]]: The stores of every item, empty if the group
+        has no item_id or store_id column.
+    """
+    return get(backend_url, 'seriesIndex', key=model_name).json()
+
+
+@st.cache_data(ttl=MODEL_DATA_TTL, show_spinner=False)
+def fetch_series(backend_url: str, model_name: str, item_id: str,
+                 store_id: str, n_days: int, points: int) -> Dict[str, Any]:
+    """
+    Fetches the sales history and validation predictions of one series,
+    downsampled by the backend to at most points points per line.
+
+    Args:
+        backend_url (str): Base URL of the backend API.
+        model_name (str): Name of the model group.
+        item_id (str): The item.
+        store_id (str): The store.
+        n_days (int): Most recent days of history.
+        points (int): Points per line.
+
+    Returns:
+        Dict[str, Any]: The 'actual' and 'prediction' lines, each with its
+        dates and values.
+    """
+    return get(backend_url, 'seriesData', key=model_name, item_id=item_id,
+               store_id=store_id, n_days=n_days, points=points).json()
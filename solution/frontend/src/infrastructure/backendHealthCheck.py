@@ -1,8 +1,10 @@
-import requests
+from src.infrastructure import backendClient
 
 
 def health_check(backend_url):
-    r = requests.get(backend_url+'healthCheck')
+    # Uncached, for the button; pages use backendClient.is_healthy
+    r = backendClient.get_session().get(backend_url+'healthCheck',
+                                        timeout=backendClient.TIMEOUT)
     res = r.content
     if b'true' in res:
         return True